@@ -5,7 +5,7 @@ a = Analysis(
     ['batch.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('kaertech_logo60.png', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
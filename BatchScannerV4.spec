@@ -5,7 +5,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('kaertech_logo60.png', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -4,6 +4,8 @@ import pymysql
 import csv
 from datetime import datetime
 import os
+from database import DatabaseManager
+from virtual_table import VirtualTable
 
 class BatchCodeScanner:
     def __init__(self, root):
@@ -12,13 +14,8 @@ class BatchCodeScanner:
         self.root.geometry("900x650")
         self.root.configure(bg="#f0f0f0")
         
-        # Database configuration
-        self.config = {
-            'host': '192.168.1.38',
-            'user': 'testing',
-            'password': 'testing',
-            'database': 'ledtech'
-        }
+        # Database access (pooled connections, see database.py)
+        self.db_manager = DatabaseManager()
         
         # Create main frame
         main_frame = tk.Frame(root, bg="#f0f0f0", padx=20, pady=20)
@@ -107,12 +104,14 @@ class BatchCodeScanner:
             self.tree.column(col, anchor=tk.CENTER, width=200)
         
         # Scrollbar
-        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL)
         
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
+        # Virtualized: only the visible rows become Treeview items
+        self.table = VirtualTable(self.tree, scrollbar, lambda row: row)
+        
         # Status bar
         self.status_label = tk.Label(main_frame, text="Ready to scan...", 
                                      font=("Arial", 10), bg="#f0f0f0", 
@@ -126,15 +125,6 @@ class BatchCodeScanner:
         self.scan_entry.delete(0, tk.END)
         self.scan_entry.focus()
 
-    def get_db_connection(self):
-        """Create and return database connection"""
-        try:
-            db = pymysql.connect(**self.config, cursorclass=pymysql.cursors.DictCursor)
-            return db
-        except pymysql.Error as err:
-            messagebox.showerror("Database Error", f"Failed to connect to database:\n{err}")
-            return None
-    
     def scan_input(self):
         """Handle scanning based on selected mode"""
         input_value = self.scan_entry.get().strip()
@@ -144,71 +134,33 @@ class BatchCodeScanner:
             messagebox.showwarning("Input Required", f"Please enter a {mode.lower()}.")
             return
         
-        db = self.get_db_connection()
-        if not db:
-            return
-        
-        cursor = db.cursor()
-        
         try:
-            if mode == "Serial Number":
-                # === SCAN BY SERIAL NUMBER ===
-                cursor.execute(
-                    "SELECT batch_code, po_num FROM faceware_assembly1 WHERE serial_num = %s", 
-                    (input_value,)
-                )
-                assembly_data = cursor.fetchone()
-                
-                if not assembly_data:
+            # === SINGLE ROUND TRIP: resolve and fetch all serials in batch ===
+            by = "serial" if mode == "Serial Number" else "batch"
+            batch = self.db_manager.get_batch_with_serials(input_value, by=by)
+            
+            if not batch:
+                if by == "serial":
                     messagebox.showwarning("Not Found", 
                                          f"Serial '{input_value}' not found in assembly1 table.")
                     self.status_label.config(text=f"Serial number '{input_value}' not found")
-                    return
-                
-                batch_code = assembly_data["batch_code"]
-                po_num = assembly_data["po_num"]
-                
-            else:  # mode == "Batch Code"
-                # === SCAN BY BATCH CODE ===
-                cursor.execute(
-                    "SELECT batch_code, po_num FROM faceware_assembly1 WHERE batch_code = %s LIMIT 1", 
-                    (input_value,)
-                )
-                assembly_data = cursor.fetchone()
-                
-                if not assembly_data:
+                else:
                     messagebox.showwarning("Not Found", 
                                          f"Batch code '{input_value}' not found.")
                     self.status_label.config(text=f"Batch code '{input_value}' not found")
-                    return
-                
-                batch_code = assembly_data["batch_code"]
-                po_num = assembly_data["po_num"]
+                return
             
-            # === COMMON LOGIC: Fetch all serials in batch ===
-            cursor.execute(
-                """SELECT serial_num, batch_code, po_num 
-                   FROM faceware_assembly1 
-                   WHERE batch_code = %s 
-                   ORDER BY serial_num""", 
-                (batch_code,)
-            )
-            all_serials = cursor.fetchall()
+            batch_code = batch["batch_code"]
+            po_num = batch["po_num"]
+            all_serials = batch["serials"]
             
             # Update UI
             self.batch_label.config(text=batch_code)
             self.po_label.config(text=po_num)
             self.count_label.config(text=str(len(all_serials)))
             
-            # Clear and populate tree
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            for row in all_serials:
-                self.tree.insert("", tk.END, values=(
-                    row["serial_num"], 
-                    row["batch_code"], 
-                    row["po_num"]
-                ))
+            # Show rows (only the visible window is materialized)
+            self.table.set_rows(all_serials)
             
             # Auto-download CSV
             self.auto_download_csv(all_serials, batch_code)
@@ -222,12 +174,12 @@ class BatchCodeScanner:
             self.scan_entry.delete(0, tk.END)
             self.scan_entry.focus()
             
+        except ConnectionError as err:
+            messagebox.showerror("Database Error", f"Failed to connect to database:\n{err}")
+            self.status_label.config(text="Database connection failed")
         except pymysql.Error as err:
             messagebox.showerror("Database Error", f"Error querying database:\n{err}")
             self.status_label.config(text="Error occurred during scan")
-        finally:
-            cursor.close()
-            db.close()
     
     def auto_download_csv(self, data, batch_code):
         """Automatically download CSV file with batch data"""
@@ -244,8 +196,7 @@ class BatchCodeScanner:
             with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
                 writer = csv.writer(csvfile)
                 writer.writerow(["Serial Number", "Batch Code", "PO Number"])
-                for row in data:
-                    writer.writerow([row["serial_num"], row["batch_code"], row["po_num"]])
+                writer.writerows(data)
             
             self.status_label.config(text=f"CSV saved: {filename}")
         except Exception as e:
@@ -254,4 +205,5 @@ class BatchCodeScanner:
 if __name__ == "__main__":
     root = tk.Tk()
     app = BatchCodeScanner(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+    app.db_manager.close()
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+In-memory batch cache for the Batch Code Scanner
+"""
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Optional, Dict, Tuple, Any
+
+from batch_rows import BatchRows
+
+
+class BatchCache:
+    """
+    Size-bounded LRU + TTL cache of full batches
+
+    Batches are stored by batch_code together with a reverse index from
+    every cached serial_num to its batch, so any serial of a cached batch
+    resolves without a query. Entries older than the TTL are not dropped
+    but marked for revalidation: the caller compares their signature
+    (row count, max serial, serial checksum) with a cheap probe before
+    reusing them.
+    """
+
+    def __init__(self, max_rows: int = 200000, max_batches: int = 64, ttl: float = 30.0):
+        """
+        Args:
+            max_rows: Maximum number of serial rows held across all batches
+            max_batches: Maximum number of batches held
+            ttl: Seconds an entry is trusted without revalidation
+        """
+        self.max_rows = max_rows
+        self.max_batches = max_batches
+        self.ttl = ttl
+
+        self._batches: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._serial_index: Dict[str, str] = {}
+        self._rows = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.prefetched = 0
+        self.prefetch_hits = 0
+
+    @staticmethod
+    def signature(rows: BatchRows) -> Tuple[int, Optional[str], int]:
+        """
+        Signature of rows ordered by serial_num
+
+        Returns:
+            Tuple of (row count, max serial, XOR of the CRC32 of every
+            serial), matching DatabaseManager.get_batch_signature
+        """
+        checksum = 0
+        for serial in rows.serials:
+            checksum ^= zlib.crc32(serial.encode("utf-8"))
+        return (len(rows), rows.last_serial, checksum)
+
+    def lookup(self, value: str, by: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the cached entry for a serial number or batch code
+
+        Returns:
+            Entry dictionary with batch_code, rows and
+            "fresh" (False when it must be revalidated), or None on a miss
+        """
+        with self._lock:
+            batch_code = self._serial_index.get(value) if by == "serial" else value
+            entry = self._batches.get(batch_code) if batch_code is not None else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._batches.move_to_end(batch_code)
+            fresh = time.monotonic() - entry["stored"] <= self.ttl
+            if fresh:
+                self.hits += 1
+            if entry["prefetched"]:
+                # First use of a prefetched batch; count it once
+                entry["prefetched"] = False
+                self.prefetch_hits += 1
+            return dict(entry, fresh=fresh)
+
+    def contains(self, value: str, by: str = "batch") -> bool:
+        """True if the batch of a serial or batch code is cached (does not touch LRU order or stats)"""
+        with self._lock:
+            batch_code = self._serial_index.get(value) if by == "serial" else value
+            return batch_code in self._batches
+
+    def put(self, batch_code: str, rows: BatchRows, prefetched: bool = False):
+        """
+        Store (or replace) a batch and index its serials
+
+        Args:
+            batch_code: Batch the rows belong to
+            rows: All rows of the batch ordered by serial_num
+            prefetched: Stored speculatively by the prefetcher (used for
+                the prefetch hit rate)
+        """
+        if len(rows) > self.max_rows:
+            return
+        with self._lock:
+            self._remove(batch_code)
+            self._batches[batch_code] = {
+                "batch_code": batch_code,
+                "rows": rows,
+                "stored": time.monotonic(),
+                "prefetched": prefetched
+            }
+            if prefetched:
+                self.prefetched += 1
+            for serial_num in rows.serials:
+                self._serial_index[serial_num] = batch_code
+            self._rows += len(rows)
+            while self._rows > self.max_rows or len(self._batches) > self.max_batches:
+                oldest = next(iter(self._batches))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def revalidated(self, batch_code: str, unchanged: bool):
+        """
+        Record the outcome of a freshness probe for a stale entry
+
+        Args:
+            batch_code: Batch that was probed
+            unchanged: True to trust the entry for another TTL,
+                False to drop it (counted as a miss)
+        """
+        with self._lock:
+            self.revalidations += 1
+            if unchanged and batch_code in self._batches:
+                self._batches[batch_code]["stored"] = time.monotonic()
+                self.hits += 1
+            else:
+                self._remove(batch_code)
+                self.misses += 1
+
+    def invalidate(self, batch_code: str):
+        """Drop a batch from the cache"""
+        with self._lock:
+            self._remove(batch_code)
+
+    def clear(self):
+        """Drop all cached batches"""
+        with self._lock:
+            self._batches.clear()
+            self._serial_index.clear()
+            self._rows = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return cache counters"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "evictions": self.evictions,
+                "prefetched": self.prefetched,
+                "prefetch_hits": self.prefetch_hits,
+                "batches": len(self._batches),
+                "rows": self._rows,
+            }
+
+    def _remove(self, batch_code: str):
+        entry = self._batches.pop(batch_code, None)
+        if entry is None:
+            return
+        for serial_num in entry["rows"].serials:
+            if self._serial_index.get(serial_num) == batch_code:
+                del self._serial_index[serial_num]
+        self._rows -= len(entry["rows"])
@@ -0,0 +1,130 @@
+"""
+Compact serial rows for the Batch Code Scanner
+
+A serial row is a tuple (serial_num, batch_code, po_num), in the column
+order of the table and the CSV export. Within a batch, batch_code (and
+normally po_num) is the same for every row, so BatchRows stores the
+header once and only a list of serial strings per batch. Rows are
+produced as tuples when indexed or iterated.
+"""
+from itertools import repeat
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Field names of a row tuple, e.g. for JSON output
+ROW_FIELDS = ("serial_num", "batch_code", "po_num")
+
+Row = Tuple[str, str, str]
+
+
+class BatchRows(Sequence):
+    """Serial rows of one batch with the batch header stored once"""
+
+    __slots__ = ("batch_code", "po_num", "serials", "_po_nums")
+
+    def __init__(self, batch_code: str, po_num: str, serials: Optional[List[str]] = None,
+                 po_nums: Optional[List[str]] = None):
+        """
+        Args:
+            batch_code: Batch code of every row
+            po_num: PO number of every row (of the first row if po_nums is given)
+            serials: Serial numbers ordered by serial_num
+            po_nums: Per-row PO numbers, only for batches spanning several POs
+        """
+        self.batch_code = batch_code
+        self.po_num = po_num
+        self.serials: List[str] = serials if serials is not None else []
+        self._po_nums = po_nums
+
+    @classmethod
+    def from_tuples(cls, rows: Iterable[Sequence[str]]) -> "BatchRows":
+        """Build from (serial_num, batch_code, po_num) rows of a single batch"""
+        batch = cls("", "")
+        batch.extend_tuples(rows)
+        return batch
+
+    def extend_tuples(self, rows: Iterable[Sequence[str]]):
+        """Append (serial_num, batch_code, po_num) rows of this batch"""
+        rows = rows if isinstance(rows, (list, tuple)) else list(rows)
+        if not rows:
+            return
+        if not self.serials:
+            self.batch_code, self.po_num = rows[0][1], rows[0][2]
+        start = len(self.serials)
+        self.serials.extend(row[0] for row in rows)
+        po_num = self.po_num
+        if self._po_nums is not None:
+            self._po_nums.extend(row[2] for row in rows)
+        elif any(row[2] != po_num for row in rows):
+            self._po_nums = [po_num] * start + [row[2] for row in rows]
+
+    def extend(self, other: "BatchRows"):
+        """Append the rows of another part of the same batch"""
+        if not other.serials:
+            return
+        if not self.serials:
+            self.batch_code, self.po_num = other.batch_code, other.po_num
+        if self._po_nums is None and other._po_nums is None and other.po_num == self.po_num:
+            self.serials.extend(other.serials)
+        else:
+            self.extend_tuples(list(other))
+
+    def truncate(self, length: int):
+        """Drop all rows from index length on"""
+        del self.serials[length:]
+        if self._po_nums is not None:
+            del self._po_nums[length:]
+
+    def copy(self) -> "BatchRows":
+        """Independent copy (the serial lists are not shared)"""
+        po_nums = list(self._po_nums) if self._po_nums is not None else None
+        return BatchRows(self.batch_code, self.po_num, list(self.serials), po_nums)
+
+    def to_columns(self) -> Dict[str, Any]:
+        """JSON-friendly form with the header once (see from_columns)"""
+        return {
+            "batch_code": self.batch_code,
+            "po_num": self.po_num,
+            "serials": self.serials,
+            "po_nums": self._po_nums
+        }
+
+    @classmethod
+    def from_columns(cls, data: Dict[str, Any]) -> "BatchRows":
+        """Rebuild rows from the output of to_columns"""
+        return cls(data["batch_code"], data["po_num"], list(data["serials"]), data.get("po_nums"))
+
+    @property
+    def last_serial(self) -> Optional[str]:
+        return self.serials[-1] if self.serials else None
+
+    def po_for(self, serial_num: Optional[str]) -> str:
+        """PO number of a serial in this batch (the batch PO if not found or not given)"""
+        if self._po_nums is None or serial_num is None:
+            return self.po_num
+        try:
+            return self._po_nums[self.serials.index(serial_num)]
+        except ValueError:
+            return self.po_num
+
+    def __len__(self) -> int:
+        return len(self.serials)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._rows(range(*index.indices(len(self.serials)))))
+        serial = self.serials[index]
+        po_num = self._po_nums[index] if self._po_nums is not None else self.po_num
+        return (serial, self.batch_code, po_num)
+
+    def __iter__(self) -> Iterator[Row]:
+        if self._po_nums is None:
+            batch_code, po_num = self.batch_code, self.po_num
+            return ((serial, batch_code, po_num) for serial in self.serials)
+        return zip(self.serials, repeat(self.batch_code), self._po_nums)
+
+    def _rows(self, indexes: range) -> Iterator[Row]:
+        for i in indexes:
+            yield self[i]
+
+    def __repr__(self) -> str:
+        return f"BatchRows({self.batch_code!r}, {self.po_num!r}, {len(self.serials)} serials)"
@@ -0,0 +1,217 @@
+"""
+pymysql-compatible stand-in database backed by SQLite
+
+Implements the small part of the pymysql connection/cursor API that
+DatabaseManager uses (pyformat %s parameters with list expansion for
+IN, dict and tuple cursors, buffered and unbuffered fetches, ping), plus
+the MySQL functions our queries rely on (CRC32, CONCAT_WS, BIT_XOR).
+Columns use NOCASE collation to mirror the case-insensitive MySQL
+collation of faceware_assembly1.
+
+Usage:
+    connector = FakeMySQL("/tmp/bench.sqlite3").connect
+    db_manager = DatabaseManager(config={}, connector=connector)
+"""
+import random
+import sqlite3
+import time
+import zlib
+from typing import Any, Iterator, List, Optional, Tuple
+
+import pymysql
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS faceware_assembly1 (
+    id INTEGER PRIMARY KEY,
+    serial_num TEXT COLLATE NOCASE,
+    batch_code TEXT COLLATE NOCASE,
+    po_num TEXT COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS idx_fa1_serial ON faceware_assembly1 (serial_num);
+CREATE INDEX IF NOT EXISTS idx_fa1_batch ON faceware_assembly1 (batch_code, serial_num);
+CREATE INDEX IF NOT EXISTS idx_fa1_po ON faceware_assembly1 (po_num, batch_code);
+"""
+
+
+def synthetic_rows(total: int, batch_size: int = 500, batches_per_po: int = 8,
+                   seed: int = 1) -> Iterator[Tuple[str, str, str]]:
+    """
+    Generate faceware_assembly1-like rows
+
+    Serials are consecutive within a batch (SN + 8 digits), batches hold
+    about batch_size units (+/- 20%) and POs group batches_per_po batches.
+    """
+    rng = random.Random(seed)
+    serial = 100000
+    batch = 0
+    produced = 0
+    while produced < total:
+        batch += 1
+        size = min(total - produced, max(1, int(batch_size * rng.uniform(0.8, 1.2))))
+        batch_code = f"B{batch:06d}"
+        po_num = f"PO{(batch - 1) // batches_per_po + 1:05d}"
+        for _ in range(size):
+            yield (f"SN{serial:08d}", batch_code, po_num)
+            serial += 1
+        produced += size
+
+
+def seed_database(path: str, rows: int, batch_size: int = 500, seed: int = 1):
+    """Create (or replace) a stand-in database with synthetic rows"""
+    db = sqlite3.connect(path)
+    try:
+        db.executescript("DROP TABLE IF EXISTS faceware_assembly1;" + SCHEMA)
+        with db:
+            db.executemany(
+                "INSERT INTO faceware_assembly1 (serial_num, batch_code, po_num) VALUES (?, ?, ?)",
+                synthetic_rows(rows, batch_size=batch_size, seed=seed)
+            )
+        db.execute("ANALYZE")
+    finally:
+        db.close()
+
+
+class _BitXor:
+    def __init__(self):
+        self.value = 0
+
+    def step(self, value):
+        if value is not None:
+            self.value ^= int(value)
+
+    def finalize(self):
+        return self.value
+
+
+def _concat_ws(separator, *parts):
+    return separator.join(str(p) for p in parts if p is not None)
+
+
+def _crc32(value):
+    return None if value is None else zlib.crc32(str(value).encode("utf-8"))
+
+
+def _translate(query: str, args: Any) -> Tuple[str, List[Any]]:
+    """Convert pymysql pyformat (%s, lists for IN) to SQLite qmark style"""
+    if args is None:
+        return query.replace("%%", "%"), []
+    if not isinstance(args, (list, tuple)):
+        args = (args,)
+    pieces = query.replace("%%", "\0").split("%s")
+    if len(pieces) - 1 != len(args):
+        raise pymysql.err.ProgrammingError("not all arguments converted during string formatting")
+    out, params = [pieces[0]], []
+    for arg, piece in zip(args, pieces[1:]):
+        if isinstance(arg, (list, tuple)):
+            out.append("(" + ",".join("?" * len(arg)) + ")")
+            params.extend(arg)
+        else:
+            out.append("?")
+            params.append(arg)
+        out.append(piece)
+    return "".join(out).replace("\0", "%"), params
+
+
+class FakeCursor:
+    """Cursor returning tuples or dicts like pymysql's cursor classes"""
+
+    def __init__(self, connection: "FakeConnection", as_dict: bool):
+        self.connection = connection
+        self.as_dict = as_dict
+        self._cursor: Optional[sqlite3.Cursor] = None
+        self.rowcount = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def execute(self, query: str, args: Any = None) -> int:
+        sql, params = _translate(query, args)
+        if self.connection.latency:
+            time.sleep(self.connection.latency)
+        try:
+            self._cursor = self.connection._db.execute(sql, params)
+        except sqlite3.Error as err:
+            raise pymysql.err.ProgrammingError(str(err)) from err
+        self.rowcount = self._cursor.rowcount
+        return self.rowcount
+
+    def _convert(self, row):
+        if row is None or not self.as_dict:
+            return row
+        return dict(zip((d[0] for d in self._cursor.description), row))
+
+    def fetchone(self):
+        return self._convert(self._cursor.fetchone())
+
+    def fetchmany(self, size: int = 1):
+        return [self._convert(r) for r in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._convert(r) for r in self._cursor.fetchall()]
+
+    def __iter__(self):
+        return (self._convert(r) for r in self._cursor)
+
+    def close(self):
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+
+
+class FakeConnection:
+    """pymysql.connections.Connection look-alike over one SQLite connection"""
+
+    def __init__(self, path: str, cursorclass=pymysql.cursors.Cursor, latency: float = 0.0):
+        self.latency = latency
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.create_function("CRC32", 1, _crc32)
+        self._db.create_function("CONCAT_WS", -1, _concat_ws)
+        self._db.create_aggregate("BIT_XOR", 1, _BitXor)
+        self.cursorclass = cursorclass
+        self.open = True
+
+    def cursor(self, cursor=None) -> FakeCursor:
+        cls = cursor or self.cursorclass
+        return FakeCursor(self, issubclass(cls, pymysql.cursors.DictCursorMixin))
+
+    def ping(self, reconnect: bool = True):
+        if self.latency:
+            time.sleep(self.latency)
+        if not self.open:
+            raise pymysql.err.InterfaceError(0, "connection closed")
+
+    def commit(self):
+        pass
+
+    def close(self):
+        if self.open:
+            self._db.close()
+            self.open = False
+
+
+class FakeMySQL:
+    """Factory for FakeConnection objects sharing one SQLite file"""
+
+    def __init__(self, path: str, latency: float = 0.0, connect_round_trips: int = 3):
+        """
+        Args:
+            path: SQLite file created by seed_database
+            latency: Simulated network round trip per query/ping (seconds)
+            connect_round_trips: Round trips charged for a new connection
+                (TCP + handshake + auth)
+        """
+        self.path = path
+        self.latency = latency
+        self.connect_round_trips = connect_round_trips
+        self.connects = 0
+
+    def connect(self, cursorclass=pymysql.cursors.Cursor, **_ignored) -> FakeConnection:
+        """pymysql.connect-compatible signature (host/user/... are ignored)"""
+        self.connects += 1
+        if self.latency:
+            time.sleep(self.latency * self.connect_round_trips)
+        return FakeConnection(self.path, cursorclass=cursorclass, latency=self.latency)
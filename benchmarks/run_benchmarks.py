@@ -0,0 +1,375 @@
+"""
+Reproducible benchmarks for the Batch Code Scanner
+
+Seeds a local stand-in for faceware_assembly1 with synthetic data, points
+DatabaseManager at it and reports p50/p95/p99 latency of the scan hot
+path. Results are written as JSON so runs can be compared.
+
+Examples:
+    python benchmarks/run_benchmarks.py --rows 100000
+    python benchmarks/run_benchmarks.py --rows 1000000 --latency-ms 1 --label lan
+    python benchmarks/run_benchmarks.py --rows 100000 --compare benchmarks/results/old.json
+
+By default the stand-in is SQLite behind a pymysql-compatible fake
+(benchmarks/fake_mysql.py). Pass --mysql-host etc. to benchmark a local
+MySQL/MariaDB instead; --seed-mysql (re)creates faceware_assembly1 there.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Any
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from config import DB_CONFIG  # noqa: E402
+from csv_exporter import CSVExporter  # noqa: E402
+from database import DatabaseManager  # noqa: E402
+from exporters import EXPORT_FORMATS  # noqa: E402
+from lookup_service import LookupService, RemoteDatabaseManager  # noqa: E402
+from serial_ranges import SerialRanges  # noqa: E402
+from fake_mysql import FakeMySQL, seed_database, synthetic_rows  # noqa: E402
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples_ms)
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def measure(fn: Callable[[Any], Any], inputs: List[Any], warmup: int = 3) -> Dict[str, float]:
+    """Time fn(x) for every input (after a few warm-up calls)"""
+    for value in inputs[:warmup]:
+        fn(value)
+    samples = []
+    for value in inputs:
+        start = time.perf_counter()
+        fn(value)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return summarize(samples)
+
+
+class _TempDirExporter(CSVExporter):
+    """CSVExporter writing to a scratch directory instead of ~/Downloads"""
+
+    def __init__(self, directory: str, fmt: str = "csv"):
+        super().__init__(fmt)
+        self.directory = directory
+
+    def get_downloads_path(self) -> str:
+        return self.directory
+
+
+def sample_values(db_manager: DatabaseManager, column: str, count: int) -> List[str]:
+    """Pick random existing values of a column through the manager's pool"""
+    with db_manager.pool.connection() as db:
+        with db.cursor() as cursor:
+            cursor.execute(f"SELECT DISTINCT {column} FROM faceware_assembly1")
+            values = [row[column] for row in cursor.fetchall()]
+    step = max(1, len(values) // count)
+    picked = values[::step][:count]
+    return (picked * (count // max(1, len(picked)) + 1))[:count]
+
+
+def seed_mysql(config: Dict[str, Any], rows: int, batch_size: int):
+    import pymysql
+    db = pymysql.connect(**config, autocommit=True)
+    try:
+        with db.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS faceware_assembly1")
+            cursor.execute(
+                """CREATE TABLE faceware_assembly1 (
+                       id INT AUTO_INCREMENT PRIMARY KEY,
+                       serial_num VARCHAR(64),
+                       batch_code VARCHAR(64),
+                       po_num VARCHAR(64),
+                       KEY idx_serial (serial_num),
+                       KEY idx_batch (batch_code, serial_num),
+                       KEY idx_po (po_num, batch_code)
+                   )"""
+            )
+            chunk = []
+            for row in synthetic_rows(rows, batch_size=batch_size):
+                chunk.append(row)
+                if len(chunk) == 5000:
+                    cursor.executemany(
+                        "INSERT INTO faceware_assembly1 (serial_num, batch_code, po_num) VALUES (%s, %s, %s)",
+                        chunk
+                    )
+                    chunk = []
+            if chunk:
+                cursor.executemany(
+                    "INSERT INTO faceware_assembly1 (serial_num, batch_code, po_num) VALUES (%s, %s, %s)",
+                    chunk
+                )
+    finally:
+        db.close()
+
+
+def bench_update_table(batches: List[Dict[str, Any]]) -> Optional[Dict[str, float]]:
+    """Time BatchCodeScannerGUI._update_table (None when no display is available)"""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as err:
+        print(f"  skipping update_table: no display ({err})")
+        return None
+    try:
+        root.withdraw()
+        from gui import BatchCodeScannerGUI
+        app = BatchCodeScannerGUI(root)
+
+        def render(batch):
+            app._update_table(batch["serials"])
+            root.update_idletasks()
+
+        return measure(render, batches)
+    finally:
+        root.destroy()
+
+
+def run(args) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix="bcs_bench_")
+
+    if args.mysql_host:
+        config = {
+            "host": args.mysql_host, "port": args.mysql_port,
+            "user": args.mysql_user, "password": args.mysql_password,
+            "database": args.mysql_database,
+        }
+        if args.mysql_host == DB_CONFIG["host"]:
+            raise SystemExit("Refusing to benchmark against the production database host")
+        if args.seed_mysql:
+            print(f"Seeding {args.rows} rows into {args.mysql_host}/{args.mysql_database}...")
+            seed_mysql(config, args.rows, args.batch_size)
+        make_manager = lambda: DatabaseManager(config=config)
+        backend = f"mysql://{args.mysql_host}:{args.mysql_port}/{args.mysql_database}"
+    else:
+        path = args.db_path or os.path.join(workdir, f"stand_in_{args.rows}.sqlite3")
+        if not args.db_path or not os.path.exists(path):
+            print(f"Seeding {args.rows} synthetic rows into {path}...")
+            seed_database(path, args.rows, batch_size=args.batch_size)
+        fake = FakeMySQL(path, latency=args.latency_ms / 1000.0)
+        make_manager = lambda: DatabaseManager(config={}, connector=fake.connect)
+        backend = f"fake_mysql(sqlite, latency={args.latency_ms}ms)"
+
+    results: Dict[str, Any] = {}
+    n = args.iterations
+
+    # Uncached paths measure the database round trips themselves
+    db_manager = make_manager()
+    db_manager.cache = None
+    serials = sample_values(db_manager, "serial_num", n)
+    batch_codes = sample_values(db_manager, "batch_code", n)
+
+    print("serial_scan...")
+    results["serial_scan"] = measure(lambda s: db_manager.get_batch_with_serials(s, "serial"), serials)
+    print("batch_scan...")
+    results["batch_scan"] = measure(lambda b: db_manager.get_batch_with_serials(b, "batch"), batch_codes)
+
+    # Cached path: serials drawn from a few batches, as on the shop floor
+    cached_manager = make_manager()
+    hot_serials = [s for b in batch_codes[:5] for s in
+                   db_manager.get_all_serials_in_batch(b).serials[:max(1, n // 5)]]
+    print("serial_scan_cached...")
+    results["serial_scan_cached"] = measure(
+        lambda s: cached_manager.get_batch_with_serials(s, "serial"), hot_serials
+    )
+    results["serial_scan_cached"]["cache"] = cached_manager.cache_stats()
+
+    print("lookup_service...")
+    results["lookup_service"] = bench_lookup_service(make_manager(), hot_serials, args.stations)
+
+    batches = [db_manager.get_batch_with_serials(b, "batch") for b in batch_codes[:min(n, 50)]]
+    for name in EXPORT_FORMATS:
+        key = "export_" + name.replace(".", "_")
+        print(f"{key}...")
+        results[key] = bench_export(_TempDirExporter(workdir, name), batches)
+
+    print("update_table...")
+    render = bench_update_table(batches)
+    if render is not None:
+        results["update_table"] = render
+
+    print("serial_ranges...")
+    results["serial_ranges"] = measure(lambda b: SerialRanges.from_rows(b["serials"]), batches)
+    ranges = [len(SerialRanges.from_rows(b["serials"])) for b in batches]
+    results["serial_ranges"]["rows_per_range"] = round(
+        sum(len(b["serials"]) for b in batches) / max(1, sum(ranges)), 1
+    )
+
+    print("batch_memory...")
+    results["batch_memory"] = bench_batch_memory(db_manager, batch_codes[0])
+
+    results["pool"] = db_manager.pool_stats()
+    db_manager.close()
+    cached_manager.close()
+
+    return {
+        "meta": {
+            "label": args.label,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "rows": args.rows,
+            "batch_size": args.batch_size,
+            "iterations": n,
+            "backend": backend,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "commit": _git_commit(),
+        },
+        "results": results,
+    }
+
+
+def bench_lookup_service(db_manager: DatabaseManager, serials: List[str], stations: int) -> Dict[str, Any]:
+    """Serial scans of several stations sharing one LookupService (per-scan latency)"""
+    service = LookupService(db_manager, "127.0.0.1", 0)
+    service.start()
+    client = RemoteDatabaseManager(service.url)
+    samples: List[float] = []
+    lock = threading.Lock()
+
+    def station():
+        local: List[float] = []
+        for serial in serials:
+            start = time.perf_counter()
+            client.get_batch_with_serials(serial, "serial")
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            samples.extend(local)
+
+    try:
+        threads = [threading.Thread(target=station) for _ in range(stations)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        service_stats = client.service_stats()
+    finally:
+        service.shutdown()
+        db_manager.close()
+    stats: Dict[str, Any] = summarize(samples)
+    stats["stations"] = stations
+    stats["requests_per_sec"] = service_stats["requests_per_sec"]
+    stats["cache_hit_ratio"] = service_stats["cache_hit_ratio"]
+    stats["db_connections"] = service_stats["pool"].get("new_connects")
+    return stats
+
+
+def bench_export(exporter: CSVExporter, batches: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Write speed of one export format plus its output size per row"""
+    stats: Dict[str, Any] = measure(lambda b: exporter.export(b["serials"], b["batch_code"]), batches)
+    size = rows = 0
+    for batch in batches:
+        buffer = io.BytesIO()
+        rows += exporter.format.write(buffer, batch["serials"])
+        size += len(buffer.getvalue())
+    stats["bytes"] = size
+    stats["bytes_per_row"] = round(size / max(1, rows), 2)
+    return stats
+
+
+def bench_batch_memory(db_manager: DatabaseManager, batch_code: str) -> Dict[str, Any]:
+    """Bytes held by one fetched batch (rows and their strings)"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        rows = db_manager.get_all_serials_in_batch(batch_code)
+        held = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return {"rows": len(rows), "bytes": held, "bytes_per_row": round(held / max(1, len(rows)), 1)}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    print(f"\n{report['meta']['backend']}, {report['meta']['rows']} rows")
+    print(f"{'benchmark':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'vs base p50':>14}")
+    for name, stats in report["results"].items():
+        if "p50_ms" not in stats:
+            continue
+        delta = ""
+        if baseline and name in baseline.get("results", {}):
+            base = baseline["results"][name]["p50_ms"]
+            if base:
+                delta = f"{(stats['p50_ms'] - base) / base * 100:+.1f}%"
+        size = f"  {stats['bytes_per_row']} B/row" if "bytes_per_row" in stats else ""
+        print(f"{name:<22}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}{delta:>14}{size}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="synthetic rows (100 to 1000000)")
+    parser.add_argument("--batch-size", type=int, default=500, help="average units per batch")
+    parser.add_argument("--iterations", type=int, default=200, help="lookups per benchmark")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="simulated network round trip of the fake database")
+    parser.add_argument("--stations", type=int, default=4,
+                        help="concurrent stations in the lookup_service benchmark")
+    parser.add_argument("--db-path", help="reuse (or create) this SQLite stand-in file")
+    parser.add_argument("--mysql-host")
+    parser.add_argument("--mysql-port", type=int, default=3306)
+    parser.add_argument("--mysql-user", default="root")
+    parser.add_argument("--mysql-password", default="")
+    parser.add_argument("--mysql-database", default="bcs_bench")
+    parser.add_argument("--seed-mysql", action="store_true", help="(re)create the table on --mysql-host")
+    parser.add_argument("--label", default="", help="name stored in the result file")
+    parser.add_argument("--output", help="result JSON path (default benchmarks/results/<time>.json)")
+    parser.add_argument("--compare", help="baseline result JSON to compare against")
+    args = parser.parse_args(argv)
+
+    if not 100 <= args.rows <= 1000000:
+        parser.error("--rows must be between 100 and 1000000")
+
+    report = run(args)
+    output = args.output or os.path.join(
+        REPO_ROOT, "benchmarks", "results",
+        time.strftime("%Y%m%d_%H%M%S") + (f"_{args.label}" if args.label else "") + ".json"
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"\nResults written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Headless command-line entry point for the Batch Code Scanner
+
+Also runs as "main.py cli ...". The packaged GUI executables are
+windowed and have no stdin/stdout, so use --file and --output there.
+
+Examples:
+    python cli.py SN000123 SN000124
+    python cli.py --mode batch --file batches.txt --format jsonl -o out.jsonl
+    python cli.py --mode batch B000123 --format csv.gz -o B000123.csv.gz
+    type serials.txt | python cli.py --workers 8 > result.csv
+"""
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Any
+
+import pymysql
+
+from batch_rows import Row
+from config import BULK_CHUNK_SIZE, CLI_WORKERS, EXPORT_FORMAT
+from database import DatabaseManager
+from exporters import EXPORT_FORMATS, get_format
+from serial_list import parse_values, read_value_file
+
+
+def ordered_parallel(fn: Callable[[Any], Any], items: Iterable[Any], workers: int) -> Iterator[Any]:
+    """
+    Apply fn to items on a thread pool and yield results in input order
+
+    At most 2 * workers calls are in flight, so results of a long job are
+    written as they complete instead of being collected first.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending: deque = deque()
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def positive_int(text: str) -> int:
+    """argparse type for counts that must be at least 1"""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {text!r}")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1: {value}")
+    return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="batch_code_scanner",
+        description="Look up serial numbers or batch codes in faceware_assembly1 without the GUI."
+    )
+    parser.add_argument("values", nargs="*", help="serial numbers or batch codes to look up")
+    parser.add_argument("-f", "--file", help="read values from a .txt/.csv file ('-' for stdin)")
+    parser.add_argument("-m", "--mode", choices=["serial", "batch"], default="serial",
+                        help="serial: batch and PO of each serial; batch: all serials of each batch")
+    parser.add_argument("-w", "--workers", type=positive_int, default=CLI_WORKERS,
+                        help=f"parallel database connections (default {CLI_WORKERS})")
+    parser.add_argument("--chunk-size", type=positive_int, default=BULK_CHUNK_SIZE,
+                        help=f"serials per query in serial mode (default {BULK_CHUNK_SIZE})")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default=EXPORT_FORMAT,
+                        help=f"output format (default {EXPORT_FORMAT})")
+    parser.add_argument("-o", "--output", help="output file (default stdout)")
+    return parser
+
+
+def read_input_values(args) -> List[str]:
+    """Collect values from arguments, --file and/or stdin"""
+    values = list(args.values)
+    if args.file == "-":
+        if sys.stdin is None:
+            raise OSError("no standard input (use --file with a path)")
+        values.extend(parse_values(sys.stdin))
+    elif args.file:
+        values.extend(read_value_file(args.file))
+    elif not values and sys.stdin is not None and not sys.stdin.isatty():
+        values.extend(parse_values(sys.stdin))
+    return values
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run a headless lookup job
+
+    Returns:
+        Exit code: 0 if everything was found, 1 if some values were not
+        found, 2 on usage or database errors
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        values = read_input_values(args)
+    except OSError as err:
+        print(f"error: {err}", file=sys.stderr)
+        return 2
+    except UnicodeDecodeError:
+        print(f"error: {args.file}: not a UTF-8 text file", file=sys.stderr)
+        return 2
+    if not values:
+        print("error: no serial numbers or batch codes given", file=sys.stderr)
+        return 2
+    if not args.output and sys.stdout is None:
+        # Windowed build: there is no console to write to
+        return 2
+
+    workers = args.workers
+    db_manager = DatabaseManager()
+    db_manager.pool.max_size = max(db_manager.pool.max_size, workers)
+    fmt = get_format(args.format)
+    not_found: List[str] = []
+
+    def serial_rows() -> Iterator[Row]:
+        unique = list(dict.fromkeys(values))
+        chunks = [unique[i:i + args.chunk_size] for i in range(0, len(unique), args.chunk_size)]
+        resolve = lambda chunk: db_manager.bulk_resolve(chunk, chunk_size=args.chunk_size)
+        for rows, missing in ordered_parallel(resolve, chunks, workers):
+            yield from (row for row in rows if row[1])
+            not_found.extend(missing)
+
+    def batch_code_rows() -> Iterator[Row]:
+        batch_codes = list(dict.fromkeys(values))
+        if workers == 1:
+            # One connection: stream each batch straight from the server
+            fetched = ((code, db_manager.iter_serials_in_batch(code)) for code in batch_codes)
+        else:
+            fetch = lambda code: (code, db_manager.get_all_serials_in_batch(code))
+            fetched = ordered_parallel(fetch, batch_codes, workers)
+        for batch_code, rows in fetched:
+            found = False
+            for row in rows:
+                found = True
+                yield row
+            if not found:
+                not_found.append(batch_code)
+
+    # Rows are written as they arrive; every format writes to a binary stream
+    if args.output:
+        try:
+            out = open(args.output, "wb")
+        except OSError as err:
+            print(f"error: {err}", file=sys.stderr)
+            db_manager.close()
+            return 2
+    else:
+        sys.stdout.flush()
+        out = sys.stdout.buffer
+    completed = False
+    try:
+        fmt.write(out, serial_rows() if args.mode == "serial" else batch_code_rows())
+        completed = True
+    except (ConnectionError, pymysql.Error) as err:
+        print(f"error: {err}", file=sys.stderr)
+        return 2
+    finally:
+        if args.output:
+            out.close()
+            if not completed:
+                # Do not leave a truncated export behind
+                os.remove(args.output)
+        else:
+            out.flush()
+        db_manager.close()
+
+    if not_found:
+        label = "serial" if args.mode == "serial" else "batch code"
+        print(f"{len(not_found)} {label}(s) not found:", file=sys.stderr)
+        for value in not_found:
+            print(f"  {value}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
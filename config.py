@@ -1,6 +1,7 @@
 """
 Configuration settings for the Batch Code Scanner application
 """
+import os
 
 # Database configuration
 DB_CONFIG = {
@@ -10,11 +11,110 @@ DB_CONFIG = {
     'database': 'ledtech'
 }
 
+# Connection pool configuration
+POOL_MAX_SIZE = 4          # maximum open connections per process
+POOL_MAX_IDLE = 300        # seconds before an idle connection is closed
+POOL_ACQUIRE_TIMEOUT = 10  # seconds to wait for a free connection
+POOL_PING_AFTER = 5        # ping reused connections idle longer than this (a dead
+                           # one used more recently is retried on a fresh connection)
+# A socket read/write blocked this long counts as a lost connection, so a
+# dead server cannot hang a scan worker
+DB_READ_TIMEOUT = 30       # seconds
+DB_WRITE_TIMEOUT = 30      # seconds
+
+# Rows read per chunk from unbuffered (streaming) cursors
+STREAM_CHUNK_SIZE = 2000
+
+# Serials per WHERE serial_num IN (...) query when bulk resolving lists
+BULK_CHUNK_SIZE = 1000
+
+# Batches larger than this are opened in the GUI one keyset page at a time;
+# further pages load as the table is scrolled
+BATCH_PAGE_SIZE = 1000
+
+# Batch cache configuration
+CACHE_ENABLED = True
+CACHE_MAX_ROWS = 200000    # serial rows held across all cached batches
+CACHE_MAX_BATCHES = 64
+CACHE_TTL = 30             # seconds a cached batch is reused without a probe
+
+# Predictive prefetch of the other batches of a scanned PO (needs the cache)
+PREFETCH_ENABLED = False
+PREFETCH_MAX_BATCHES = 8   # sibling batches warmed per PO
+PREFETCH_MAX_ROWS = 50000  # rows fetched per PO (memory budget)
+
+# Local replica configuration (SQLite mirror of faceware_assembly1)
+REPLICA_ENABLED = False
+REPLICA_PATH = os.path.join(os.path.expanduser("~"), ".batch_code_scanner", "replica.sqlite3")
+REPLICA_SYNC_INTERVAL = 60  # seconds between incremental syncs
+REPLICA_RECENT_BATCHES = 50  # newest batches checksummed by an incremental sync
+REPLICA_FULL_SYNC_INTERVAL = 6 * 3600  # seconds between whole-table checksums (a full scan)
+REPLICA_MAX_LAG = 300       # serve from the replica only if synced this recently
+                            # (any age is used while MySQL is unreachable)
+
+# Scan pipeline configuration
+SCAN_WORKERS = 2           # background threads resolving scans
+SCAN_POLL_MS = 50          # how often the GUI collects finished scans
+SCAN_DEDUP_WINDOW = 2.0    # seconds a repeated scan of the same value is ignored
+
+# Shared lookup service (lookup_service.py) for several scanner stations
+LOOKUP_SERVICE_URL = None  # e.g. "http://192.168.1.50:8765": the GUI uses the
+                           # service instead of connecting to MySQL itself
+LOOKUP_SERVICE_HOST = "127.0.0.1"  # interface the service listens on
+LOOKUP_SERVICE_PORT = 8765
+LOOKUP_SERVICE_TIMEOUT = 15        # seconds a station waits for a response
+
+# Live refresh of the displayed batch (toggle in the GUI; this is the default)
+LIVE_REFRESH_ENABLED = False
+LIVE_REFRESH_INTERVAL = 5  # seconds between change probes of the displayed batch
+
+# Show batches as runs of consecutive serials ("SN00100000 - SN00103999")
+# by default (toggle next to the table filter)
+COLLAPSE_SERIAL_RANGES = False
+
+# Prefix search suggestions under the scan entry (serial and batch modes)
+SUGGEST_ENABLED = True
+SUGGEST_MIN_CHARS = 3      # typed characters before suggestions are looked up
+SUGGEST_LIMIT = 10         # suggestions per prefix query
+SUGGEST_DEBOUNCE_MS = 250  # typing pause before a query (a scanner's Enter comes first)
+SUGGEST_CACHE_SIZE = 64    # recent prefix results kept client-side
+
+# Headless CLI configuration
+CLI_WORKERS = 4            # parallel database connections for cli.py
+
+# Scan timing instrumentation
+TIMING_ENABLED = True      # per-phase histograms + status bar summary
+TIMING_LOG_ENABLED = False # also append one JSON line per scan to TIMING_LOG_PATH
+TIMING_LOG_PATH = os.path.join(os.path.expanduser("~"), ".batch_code_scanner", "scan_timings.log")
+TIMING_LOG_MAX_BYTES = 1_000_000
+TIMING_LOG_BACKUPS = 3
+
+# Export configuration
+# File format of batch exports: "csv", "csv.gz", "jsonl", "columnar"
+# (compact binary) or "ranges" (one line per run of consecutive serials),
+# see exporters.py
+EXPORT_FORMAT = "csv"
+# Keep one file per batch and append only new rows on rescans (with a
+# <file>.manifest.json sidecar) instead of writing a new timestamped file
+EXPORT_INCREMENTAL = False
+# Remembers the last exported file and content hash per batch so
+# unchanged batches are not written again
+EXPORT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".batch_code_scanner", "exports.json")
+
 # GUI configuration
 WINDOW_TITLE = "Batch Code Scanner"
 WINDOW_SIZE = "900x650"
 WINDOW_BG = "#000000"
 TEXT_COLOR1 = "#FFFFFF"
+# Logo: pre-sized 60px PNG shipped with the app (loaded by Tk without PIL);
+# the 512px source is only resized if the small one is missing
+LOGO_FILE = "kaertech_logo60.png"
+LOGO_SOURCE_FILE = "kaertech_logo512.png"
+LOGO_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".batch_code_scanner", "logo60.png")
+
+# Start-up timing report (one JSON line per start)
+STARTUP_LOG_PATH = os.path.join(os.path.expanduser("~"), ".batch_code_scanner", "startup.log")
+
 # Colors
 PRIMARY_COLOR = "#4CAF50"
 TEXT_COLOR = "#333"
@@ -0,0 +1,226 @@
+"""
+Bounded MySQL connection pool for the Batch Code Scanner
+
+Idle connections are closed max_idle seconds after their last use by a
+timer thread, so a quiet station does not keep server connections open.
+
+A reused connection is pinged first only if it sat idle longer than
+ping_after; one used moments ago skips that round trip. Callers of
+checkout() retry their query on a fresh connection if a reused one
+turns out to be dead (see DatabaseManager._connection and _retry_stale
+in database.py); acquire(verify=True) and connection() always ping, for
+work that cannot simply be retried.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+
+class ConnectionPool:
+    """Keeps a bounded set of warm database connections for reuse"""
+
+    def __init__(self, connect: Callable[[], Any], max_size: int = 4,
+                 max_idle: float = 300.0, acquire_timeout: float = 10.0,
+                 ping_after: float = 0.0):
+        """
+        Args:
+            connect: Factory that opens a new database connection
+            max_size: Maximum number of open connections (idle + in use)
+            max_idle: Seconds an idle connection may sit before it is closed
+            acquire_timeout: Seconds to wait for a free connection
+            ping_after: Reused connections idle longer than this are pinged
+                first (0: every reused connection is pinged)
+        """
+        self._connect = connect
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.acquire_timeout = acquire_timeout
+        self.ping_after = ping_after
+
+        self._idle: List[Tuple[Any, float]] = []
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._prune_timer: Optional[threading.Timer] = None
+
+        self.hits = 0
+        self.new_connects = 0
+        self.waits = 0
+        self.stale_replaced = 0
+        self.pruned = 0
+
+    def acquire(self, verify: bool = False):
+        """
+        Take a live connection from the pool, opening one if needed
+
+        Args:
+            verify: Ping a reused connection however recently it was used
+
+        Raises:
+            ConnectionError: If the pool is closed, exhausted or the
+                connection cannot be established
+        """
+        return self.checkout(verify)[0]
+
+    def checkout(self, verify: bool = False) -> Tuple[Any, bool]:
+        """
+        Like acquire(), but also tells whether the connection is unchecked
+
+        Returns:
+            Tuple of (connection, unchecked): unchecked is True for a
+            reused connection handed out without a ping (used within
+            ping_after), which may have died since
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise ConnectionError("Connection pool is closed")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._in_use < self.max_size:
+                    conn = None
+                    self._in_use += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ConnectionError(
+                        f"Timed out waiting for a database connection "
+                        f"({self.max_size} in use)"
+                    )
+                self.waits += 1
+                self._cond.wait(remaining)
+
+        # Network I/O happens outside the lock
+        try:
+            if conn is not None:
+                idle_for = time.monotonic() - last_used
+                ping = verify or idle_for > self.ping_after
+                if idle_for > self.max_idle or (ping and not self._is_alive(conn)):
+                    self._close_quietly(conn)
+                    conn = None
+                    with self._cond:
+                        self.stale_replaced += 1
+                else:
+                    with self._cond:
+                        self.hits += 1
+                    return conn, not ping
+
+            conn = self._connect()
+            with self._cond:
+                self.new_connects += 1
+            return conn, False
+        except BaseException:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn, discard: bool = False):
+        """
+        Return a connection to the pool
+
+        Args:
+            conn: Connection previously obtained from acquire()
+            discard: Close the connection instead of keeping it
+                (e.g. after an error left it in an unknown state)
+        """
+        with self._cond:
+            self._in_use -= 1
+            if not discard and not self._closed:
+                self._idle.append((conn, time.monotonic()))
+                conn = None
+                self._schedule_prune(self.max_idle)
+            self._cond.notify()
+        if conn is not None:
+            self._close_quietly(conn)
+
+    @contextmanager
+    def connection(self):
+        """Context manager that acquires (always pinged) and releases a connection"""
+        conn = self.acquire(verify=True)
+        try:
+            yield conn
+        except BaseException:
+            self.release(conn, discard=True)
+            raise
+        else:
+            self.release(conn)
+
+    def prune(self):
+        """Close idle connections that exceeded max_idle (runs on the prune timer)"""
+        now = time.monotonic()
+        with self._cond:
+            expired = [c for c, t in self._idle if now - t > self.max_idle]
+            self._idle = [(c, t) for c, t in self._idle if now - t <= self.max_idle]
+            self.pruned += len(expired)
+            if self._idle:
+                oldest = min(t for _, t in self._idle)
+                self._schedule_prune(oldest + self.max_idle - now)
+        for conn in expired:
+            self._close_quietly(conn)
+
+    def discard_idle(self):
+        """Close every idle connection, e.g. after one of them turned out to be dead"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self.stale_replaced += len(idle)
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def close(self):
+        """Close all idle connections and refuse further use"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            timer, self._prune_timer = self._prune_timer, None
+            self._cond.notify_all()
+        if timer is not None:
+            timer.cancel()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self) -> Dict[str, int]:
+        """Return pool counters"""
+        with self._cond:
+            return {
+                "hits": self.hits,
+                "new_connects": self.new_connects,
+                "waits": self.waits,
+                "stale_replaced": self.stale_replaced,
+                "pruned": self.pruned,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+            }
+
+    def _schedule_prune(self, delay: float):
+        """Run prune() after delay seconds unless already scheduled (lock held)"""
+        if self._prune_timer is None and not self._closed:
+            # A moment late, so the connection it is due for has expired
+            self._prune_timer = threading.Timer(max(delay, 0.0) + 1.0, self._on_prune_timer)
+            self._prune_timer.daemon = True
+            self._prune_timer.start()
+
+    def _on_prune_timer(self):
+        with self._cond:
+            self._prune_timer = None
+        self.prune()
+
+    @staticmethod
+    def _is_alive(conn) -> bool:
+        """Check liveness without reconnecting behind the pool's back"""
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
@@ -1,14 +1,24 @@
 """
 CSV export functionality for batch data
 """
-import csv
 import os
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Iterable, Optional
+
+from batch_rows import Row
+from config import EXPORT_FORMAT
+from exporters import get_format
 
 
 class CSVExporter:
-    """Handles CSV file generation and export"""
+    """Handles export file generation (CSV by default, see exporters.py)"""
+    
+    def __init__(self, fmt: Optional[str] = None):
+        """
+        Args:
+            fmt: Export format name (defaults to config.EXPORT_FORMAT)
+        """
+        self.format = get_format(fmt or EXPORT_FORMAT)
     
     @staticmethod
     def get_downloads_path() -> str:
@@ -19,41 +29,62 @@ class CSVExporter:
         return downloads_path
     
     @staticmethod
-    def generate_filename(batch_code: str) -> str:
+    def generate_filename(batch_code: str, extension: str = "csv") -> str:
         """Generate filename with timestamp"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return f"batch_{batch_code}_{timestamp}.csv"
+        return f"batch_{batch_code}_{timestamp}.{extension}"
     
-    def export_to_csv(self, data: List[Dict[str, Any]], batch_code: str) -> str:
+    def export(self, data: Iterable[Row], batch_code: str) -> str:
         """
-        Export batch data to CSV file
+        Export batch data to a file in the configured format
+        
+        Rows are written as they are consumed, so data may be a
+        generator such as DatabaseManager.iter_serials_in_batch and the
+        file fills while the rows are still arriving.
         
         Args:
-            data: List of dictionaries containing serial numbers and batch info
+            data: Iterable of (serial_num, batch_code, po_num) rows, e.g. BatchRows
             batch_code: The batch code for filename generation
             
         Returns:
-            Full path to the saved CSV file
+            Full path to the saved file
             
         Raises:
             Exception: If file writing fails
         """
-        filename = self.generate_filename(batch_code)
+        filename = self.generate_filename(batch_code, self.format.extension)
         downloads_path = self.get_downloads_path()
         filepath = os.path.join(downloads_path, filename)
         
-        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            
-            # Write headers
-            writer.writerow(["Serial Number", "Batch Code", "PO Number"])
-            
-            # Write data
-            for row in data:
-                writer.writerow([
-                    row["serial_num"],
-                    row["batch_code"],
-                    row["po_num"]
-                ])
+        try:
+            self.write_file(filepath, data)
+        except BaseException:
+            # e.g. the database connection dropped while rows were streaming
+            if os.path.exists(filepath):
+                os.remove(filepath)
+            raise
         
-        return filepath
\ No newline at end of file
+        return filepath
+    
+    def batch_path(self, batch_code: str) -> str:
+        """Path of the single, growing export file of a batch (incremental exports)"""
+        return os.path.join(self.get_downloads_path(), f"batch_{batch_code}.{self.format.extension}")
+    
+    def write_file(self, filepath: str, data: Iterable[Row], append: bool = False) -> int:
+        """
+        Write rows to a file in the configured format
+        
+        Args:
+            filepath: Target file
+            data: Iterable of (serial_num, batch_code, po_num) rows
+            append: Add the rows to an existing export of the same format
+            
+        Returns:
+            Number of rows written
+        """
+        with open(filepath, 'ab' if append else 'wb') as f:
+            return self.format.write(f, data, header=not append)
+    
+    def export_to_csv(self, data: Iterable[Row], batch_code: str) -> str:
+        """Export batch data (in the configured format, CSV by default)"""
+        return self.export(data, batch_code)
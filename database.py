@@ -1,27 +1,190 @@
 """
 Database operations for the Batch Code Scanner
+
+pymysql is imported on first use rather than at module load, so the GUI
+can show its window before paying for the import (see prewarm()).
+
+A pooled connection that dies (server restarted, network dropped, read
+timeout) surfaces from pymysql as OperationalError/InterfaceError. Such
+errors discard the connection and are raised as ConnectionError, the
+same as a failed connect, so callers fall back to the replica and the
+GUI reports a database connection problem. Connections used moments
+ago are handed out without a ping (POOL_PING_AFTER); if such a one turns
+out to be dead, the query is run once more on a fresh connection.
 """
-import pymysql
-from typing import Optional, List, Dict, Any
-from config import DB_CONFIG
+import functools
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Tuple, Iterator, Iterable, Callable, Any
+from config import DB_CONFIG, POOL_MAX_SIZE, POOL_MAX_IDLE, POOL_ACQUIRE_TIMEOUT, POOL_PING_AFTER
+from config import DB_READ_TIMEOUT, DB_WRITE_TIMEOUT
+from config import CACHE_ENABLED, CACHE_MAX_ROWS, CACHE_MAX_BATCHES, CACHE_TTL
+from config import PREFETCH_ENABLED, PREFETCH_MAX_BATCHES, PREFETCH_MAX_ROWS
+from config import REPLICA_ENABLED, REPLICA_PATH, REPLICA_SYNC_INTERVAL, REPLICA_MAX_LAG
+from config import REPLICA_RECENT_BATCHES, REPLICA_FULL_SYNC_INTERVAL
+from config import STREAM_CHUNK_SIZE, BULK_CHUNK_SIZE, BATCH_PAGE_SIZE, SUGGEST_LIMIT
+from connection_pool import ConnectionPool
+from batch_cache import BatchCache
+from replica import LocalReplica, ReplicaSyncer
+from prefetcher import BatchPrefetcher
+from paged_rows import PagedRows
+from batch_rows import BatchRows, Row
+from instrumentation import INSTRUMENTATION
+
+# MySQL client error codes meaning the connection itself is gone: can't
+# connect (2002, 2003), server has gone away (2006), lost connection or
+# read timeout (2013), lost connection before sending (2055)
+CONNECTION_LOST_CODES = frozenset({2002, 2003, 2006, 2013, 2055})
+
+
+def is_connection_lost(err: BaseException) -> bool:
+    """True for pymysql errors caused by a dead connection rather than by the query"""
+    import pymysql
+    if isinstance(err, pymysql.err.InterfaceError):
+        return True
+    return (isinstance(err, pymysql.err.OperationalError)
+            and bool(err.args) and err.args[0] in CONNECTION_LOST_CODES)
+
+
+class _StaleConnection(ConnectionError):
+    """A pooled connection handed out without a ping had died since its last use"""
+
+
+def _retry_stale(method):
+    """Run a query method once more on a fresh connection after _StaleConnection"""
+    @functools.wraps(method)
+    def retrying(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except _StaleConnection:
+            # Whatever killed it (server restart, network drop) most
+            # likely killed the other idle connections too
+            self.pool.discard_idle()
+            return method(self, *args, **kwargs)
+    return retrying
+
+
+def like_prefix(prefix: str) -> str:
+    """LIKE pattern matching values that start with prefix ('!' is the escape character)"""
+    escaped = prefix.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+    return escaped + "%"
+
 
 class DatabaseManager:
     """Handles all database operations"""
     
-    def __init__(self):
-        self.config = DB_CONFIG
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 connector: Optional[Callable[..., Any]] = None):
+        """
+        Args:
+            config: Connection settings (defaults to config.DB_CONFIG)
+            connector: pymysql.connect-compatible factory, e.g. a local
+                stand-in database for benchmarks (defaults to pymysql.connect)
+        """
+        self.config = config if config is not None else DB_CONFIG
+        self.connector = connector
+        self.pool = ConnectionPool(
+            self.get_connection,
+            max_size=POOL_MAX_SIZE,
+            max_idle=POOL_MAX_IDLE,
+            acquire_timeout=POOL_ACQUIRE_TIMEOUT,
+            ping_after=POOL_PING_AFTER
+        )
+        self.cache = BatchCache(
+            max_rows=CACHE_MAX_ROWS,
+            max_batches=CACHE_MAX_BATCHES,
+            ttl=CACHE_TTL
+        ) if CACHE_ENABLED else None
+        self.replica = LocalReplica(
+            REPLICA_PATH,
+            self.pool,
+            recent_batches=REPLICA_RECENT_BATCHES,
+            full_interval=REPLICA_FULL_SYNC_INTERVAL
+        ) if REPLICA_ENABLED else None
+        self._syncer = None
+        self.prefetcher = BatchPrefetcher(
+            self,
+            max_batches=PREFETCH_MAX_BATCHES,
+            max_rows=PREFETCH_MAX_ROWS,
+            repeat_after=CACHE_TTL
+        ) if PREFETCH_ENABLED and self.cache is not None else None
+    
+    def start_replica_sync(self):
+        """Start keeping the local replica up to date in the background"""
+        if self.replica is not None and self._syncer is None:
+            self._syncer = ReplicaSyncer(self.replica, interval=REPLICA_SYNC_INTERVAL)
+            self._syncer.start()
     
-    def get_connection(self) -> Optional[pymysql.connections.Connection]:
-        """Create and return database connection"""
+    def prewarm(self):
+        """
+        Import pymysql and open one pooled connection ahead of the first scan
+        
+        Meant to run on a background thread right after start-up; errors are
+        left for the first real scan to report.
+        """
         try:
-            db = pymysql.connect(
-                **self.config, 
-                cursorclass=pymysql.cursors.DictCursor
+            with self.pool.connection():
+                pass
+        except Exception:
+            pass
+    
+    def prefetch_siblings(self, batch_code: str, po_num: str):
+        """Warm the cache with the other batches of a scanned PO in the background"""
+        if self.prefetcher is not None:
+            self.prefetcher.on_scan(batch_code, po_num)
+    
+    def replica_lag(self) -> Optional[float]:
+        """Seconds since the replica last synced (None if disabled or never synced)"""
+        return self.replica.lag() if self.replica is not None else None
+    
+    def get_connection(self):
+        """Create and return a new (unpooled) database connection"""
+        import pymysql
+        connector = self.connector or pymysql.connect
+        settings = {"read_timeout": DB_READ_TIMEOUT, "write_timeout": DB_WRITE_TIMEOUT}
+        settings.update(self.config)
+        try:
+            db = connector(
+                **settings, 
+                cursorclass=pymysql.cursors.DictCursor,
+                # Pooled connections are reused, so never leave a read
+                # transaction (and its snapshot) open between scans
+                autocommit=True
             )
             return db
         except pymysql.Error as err:
             raise ConnectionError(f"Failed to connect to database: {err}")
     
+    @contextmanager
+    def _connection(self, timed: bool = False, verify: bool = False):
+        """
+        Check out a pooled connection for the duration of a with block
+        
+        On any error the connection is discarded; errors meaning the
+        connection is gone are re-raised as ConnectionError (as
+        _StaleConnection for an unchecked connection, which methods
+        decorated with _retry_stale retry).
+        
+        Args:
+            timed: Record the checkout as the scan's "connect" phase
+            verify: Ping the connection even if it was used moments ago
+                (for work that cannot be retried, e.g. streaming)
+        """
+        if timed:
+            with INSTRUMENTATION.phase("connect"):
+                db, unchecked = self.pool.checkout(verify)
+        else:
+            db, unchecked = self.pool.checkout(verify)
+        try:
+            yield db
+        except BaseException as err:
+            self.pool.release(db, discard=True)
+            if is_connection_lost(err):
+                lost = _StaleConnection if unchecked else ConnectionError
+                raise lost(f"Lost connection to database: {err}") from err
+            raise
+        self.pool.release(db)
+    
+    @_retry_stale
     def get_batch_info(self, serial_num: str) -> Optional[Dict[str, Any]]:
         """
         Get batch_code and po_num for a given serial number
@@ -32,21 +195,16 @@ class DatabaseManager:
         Returns:
             Dictionary with batch_code and po_num, or None if not found
         """
-        db = self.get_connection()
-        cursor = db.cursor()
-        
-        try:
-            cursor.execute(
-                "SELECT batch_code, po_num FROM faceware_assembly1 WHERE serial_num = %s",
-                (serial_num,)
-            )
-            result = cursor.fetchone()
-            return result
-        finally:
-            cursor.close()
-            db.close()
+        with self._connection() as db:
+            with db.cursor() as cursor:
+                cursor.execute(
+                    "SELECT batch_code, po_num FROM faceware_assembly1 WHERE serial_num = %s",
+                    (serial_num,)
+                )
+                return cursor.fetchone()
     
-    def get_all_serials_in_batch(self, batch_code: str) -> List[Dict[str, Any]]:
+    @_retry_stale
+    def get_all_serials_in_batch(self, batch_code: str) -> BatchRows:
         """
         Get all serial numbers with the same batch_code
         
@@ -54,36 +212,445 @@ class DatabaseManager:
             batch_code: The batch code to search for
             
         Returns:
-            List of dictionaries containing serial_num, batch_code, and po_num
+            BatchRows of (serial_num, batch_code, po_num) rows (empty if not found)
+        """
+        import pymysql
+        with self._connection() as db:
+            with db.cursor(pymysql.cursors.Cursor) as cursor:
+                cursor.execute(
+                    """SELECT serial_num, batch_code, po_num 
+                       FROM faceware_assembly1 
+                       WHERE batch_code = %s 
+                       ORDER BY serial_num""",
+                    (batch_code,)
+                )
+                return BatchRows.from_tuples(cursor.fetchall())
+    def iter_serials_in_batch(self, batch_code: str,
+                              chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Row]:
         """
-        db = self.get_connection()
-        cursor = db.cursor()
+        Stream all serial numbers with the same batch_code
         
-        try:
-            cursor.execute(
-                """SELECT serial_num, batch_code, po_num 
-                   FROM faceware_assembly1 
-                   WHERE batch_code = %s 
-                   ORDER BY serial_num""",
-                (batch_code,)
-            )
-            results = cursor.fetchall()
-            return results
-        finally:
-            cursor.close()
-            db.close()
+        Uses an unbuffered server-side cursor, so rows are yielded while
+        the server is still sending them and only one chunk is held in
+        memory at a time. The connection is busy until the generator is
+        exhausted; if it is closed early, the connection is discarded
+        rather than returned to the pool with an unread result.
+        
+        Args:
+            batch_code: The batch code to search for
+            chunk_size: Rows fetched from the socket per read
+            
+        Yields:
+            (serial_num, batch_code, po_num) tuples
+        """
+        import pymysql
+        # Rows may already be consumed when the connection fails, so no retry
+        with self._connection(verify=True) as db:
+            with db.cursor(pymysql.cursors.SSCursor) as cursor:
+                cursor.execute(
+                    """SELECT serial_num, batch_code, po_num 
+                       FROM faceware_assembly1 
+                       WHERE batch_code = %s 
+                       ORDER BY serial_num""",
+                    (batch_code,)
+                )
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield from rows
+
+    @_retry_stale
+    def get_serials_page(self, batch_code: str, after_serial: Optional[str] = None,
+                         limit: Optional[int] = BATCH_PAGE_SIZE) -> BatchRows:
+        """
+        Fetch one page of a batch using keyset pagination on serial_num
+        
+        Args:
+            batch_code: The batch code to page through
+            after_serial: Last serial of the previous page (None for the first page)
+            limit: Maximum rows in the page (None for all remaining rows)
+            
+        Returns:
+            BatchRows ordered by serial_num
+        """
+        import pymysql
+        sql = """SELECT serial_num, batch_code, po_num
+                 FROM faceware_assembly1
+                 WHERE batch_code = %s"""
+        params: List[Any] = [batch_code]
+        if after_serial is not None:
+            sql += " AND serial_num > %s"
+            params.append(after_serial)
+        sql += " ORDER BY serial_num"
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(limit)
+        with self._connection() as db:
+            with db.cursor(pymysql.cursors.Cursor) as cursor:
+                cursor.execute(sql, params)
+                return BatchRows.from_tuples(cursor.fetchall())
+
+    @_retry_stale
+    def count_serials_in_batch(self, batch_code: str) -> int:
+        """Number of serials in a batch (index-only count, no rows transferred)"""
+        with self._connection() as db:
+            with db.cursor() as cursor:
+                cursor.execute(
+                    "SELECT COUNT(*) AS row_count FROM faceware_assembly1 WHERE batch_code = %s",
+                    (batch_code,)
+                )
+                return int(cursor.fetchone()["row_count"])
+
+    @_retry_stale
     def get_batch_info_by_batch(self, batch_code: str) -> Optional[Dict[str, Any]]:
         """Get batch_code and po_num for a given batch_code (any row in the batch)"""
-        db = self.get_connection()
-        cursor = db.cursor()
+        with self._connection() as db:
+            with db.cursor() as cursor:
+                cursor.execute(
+                    "SELECT batch_code, po_num FROM faceware_assembly1 WHERE batch_code = %s LIMIT 1",
+                    (batch_code,)
+                )
+                return cursor.fetchone()
+
+    def get_batch_with_serials(self, value: str, by: str = "serial") -> Optional[Dict[str, Any]]:
+        """
+        Resolve a serial number or batch code and fetch the whole batch
+        in a single round trip
+        
+        Batches already in the cache are returned without any query while
+        fresh, and after a cheap signature probe once their TTL expired.
+        With the local replica enabled, lookups are served from SQLite
+        while it is recent enough and whenever MySQL is unreachable.
+        
+        Args:
+            value: The serial number or batch code that was scanned
+            by: "serial" to look up the batch of a serial number,
+                "batch" to look up a batch code directly
+            
+        Returns:
+            Dictionary with batch_code, po_num and serials (BatchRows as
+            returned by get_all_serials_in_batch), or None if nothing matched
+        """
+        serial_num = value if by == "serial" else None
+        if self.cache is not None:
+            with INSTRUMENTATION.phase("cache"):
+                entry = self.cache.lookup(value, by)
+                if entry is not None and not entry["fresh"]:
+                    try:
+                        probe = self.get_batch_signature(entry["batch_code"])
+                        unchanged = probe == BatchCache.signature(entry["rows"])
+                    except ConnectionError:
+                        # Server unreachable: the cached copy beats no answer
+                        unchanged = True
+                    else:
+                        self.cache.revalidated(entry["batch_code"], unchanged)
+                    entry["fresh"] = unchanged
+            if entry is not None and entry["fresh"]:
+                return self._batch_result(entry["rows"], serial_num)
+        
+        if self.replica is not None and self.replica.ready:
+            lag = self.replica.lag()
+            if lag is not None and lag <= REPLICA_MAX_LAG:
+                with INSTRUMENTATION.phase("replica"):
+                    rows = self.replica.get_batch_rows(value, by)
+                if rows:
+                    return self._batch_result(rows, serial_num)
+                # Not replicated yet (e.g. a unit built since the last sync)
         
         try:
-            cursor.execute(
-                "SELECT batch_code, po_num FROM faceware_assembly1 WHERE batch_code = %s LIMIT 1",
-                (batch_code,)
-            )
-            result = cursor.fetchone()
+            rows = self._fetch_batch_rows(value, by)
+        except ConnectionError:
+            # Server unreachable: fall back to the replica however old it is
+            if self.replica is None or not self.replica.ready:
+                raise
+            with INSTRUMENTATION.phase("replica"):
+                rows = self.replica.get_batch_rows(value, by)
+            return self._batch_result(rows, serial_num) if rows else None
+        if not rows:
+            return None
+        result = self._batch_result(rows, serial_num)
+        if self.cache is not None:
+            self.cache.put(result["batch_code"], rows)
+        return result
+
+    def open_batch(self, value: str, by: str = "serial",
+                   page_size: int = BATCH_PAGE_SIZE) -> Optional[Dict[str, Any]]:
+        """
+        Like get_batch_with_serials, but fetches at most one page of a large batch
+        
+        Batches that are cached, served by the replica or no larger than
+        page_size come back whole. Otherwise "serials" is a PagedRows
+        holding the first page; the rest is fetched on demand with
+        get_serials_page, and a count query gives the batch size up front.
+        The full batch is cached once it has been loaded completely.
+        
+        Args:
+            value: The serial number or batch code that was scanned
+            by: "serial" or "batch"
+            page_size: Rows in the first page and minimum rows per later page
+            
+        Returns:
+            Dictionary with batch_code, po_num and serials, or None if nothing matched
+        """
+        lag = self.replica_lag()
+        cached = self.cache is not None and self.cache.contains(value, by)
+        replica_usable = self.replica is not None and self.replica.ready and lag is not None and lag <= REPLICA_MAX_LAG
+        if cached or replica_usable:
+            return self.get_batch_with_serials(value, by)
+        
+        try:
+            rows = self._fetch_batch_rows(value, by, limit=page_size + 1)
+        except ConnectionError:
+            if self.replica is None or not self.replica.ready:
+                raise
+            return self.get_batch_with_serials(value, by)
+        if not rows:
+            return None
+        if len(rows) <= page_size:
+            result = self._batch_result(rows, value if by == "serial" else None)
+            if self.cache is not None:
+                self.cache.put(result["batch_code"], rows)
             return result
-        finally:
-            cursor.close()
-            db.close()
\ No newline at end of file
+        
+        rows.truncate(page_size)
+        batch_code = rows.batch_code
+        with INSTRUMENTATION.phase("count"):
+            total = self.count_serials_in_batch(batch_code)
+        result = self._batch_result(rows, value if by == "serial" else None)
+        result["serials"] = PagedRows(
+            lambda after, limit: self.get_serials_page(batch_code, after, limit),
+            total=total,
+            first_page=rows,
+            page_size=page_size,
+            placeholder=("Loading...", batch_code, ""),
+            on_complete=(lambda all_rows: self.cache.put(batch_code, all_rows)) if self.cache is not None else None
+        )
+        return result
+
+    @_retry_stale
+    def _fetch_batch_rows(self, value: str, by: str, limit: Optional[int] = None) -> BatchRows:
+        """Fetch every row (or the first limit rows) of the batch identified by a serial or batch code"""
+        if by == "serial":
+            where = """batch_code = (
+                           SELECT batch_code FROM faceware_assembly1
+                           WHERE serial_num = %s LIMIT 1)"""
+        elif by == "batch":
+            where = "batch_code = %s"
+        else:
+            raise ValueError(f"Unknown lookup type: {by}")
+        
+        import pymysql
+        with self._connection(timed=True) as db:
+            # Plain tuples: no per-row dict, the header is kept once in BatchRows
+            with db.cursor(pymysql.cursors.Cursor) as cursor:
+                with INSTRUMENTATION.phase("query"):
+                    cursor.execute(
+                        f"""SELECT serial_num, batch_code, po_num 
+                            FROM faceware_assembly1 
+                            WHERE {where} 
+                            ORDER BY serial_num"""
+                        + (" LIMIT %s" if limit is not None else ""),
+                        (value,) if limit is None else (value, limit)
+                    )
+                with INSTRUMENTATION.phase("fetch"):
+                    return BatchRows.from_tuples(cursor.fetchall())
+
+    @_retry_stale
+    def search_prefix(self, prefix: str, by: str = "serial",
+                      limit: int = SUGGEST_LIMIT) -> List[str]:
+        """
+        Serial numbers or batch codes starting with a prefix (e.g. from a
+        damaged label)
+        
+        Uses an anchored LIKE 'prefix%' (wildcards in the prefix are
+        escaped), which MySQL answers with a range scan of the serial_num
+        or batch_code index, and stops after limit values.
+        
+        Args:
+            prefix: Beginning of the serial number or batch code
+            by: "serial" or "batch"
+            limit: Maximum number of values returned
+            
+        Returns:
+            Matching values in index order (at most limit)
+        """
+        column = {"serial": "serial_num", "batch": "batch_code"}.get(by)
+        if column is None:
+            raise ValueError(f"Unknown lookup type: {by}")
+        pattern = like_prefix(prefix)
+        import pymysql
+        with self._connection() as db:
+            with db.cursor(pymysql.cursors.Cursor) as cursor:
+                cursor.execute(
+                    f"""SELECT DISTINCT {column}
+                        FROM faceware_assembly1
+                        WHERE {column} LIKE %s ESCAPE '!'
+                        ORDER BY {column}
+                        LIMIT %s""",
+                    (pattern, limit)
+                )
+                return [row[0] for row in cursor.fetchall()]
+
+    @_retry_stale
+    def get_batch_signature(self, batch_code: str) -> Tuple[int, Optional[str], int]:
+        """
+        Cheap change probe for a batch
+        
+        The checksum catches changes that keep the row count and the
+        max serial, e.g. one serial removed and another inserted.
+        
+        Returns:
+            Tuple of (row count, max serial_num, XOR of CRC32(serial_num)),
+            matching BatchCache.signature for the same rows
+        """
+        with self._connection() as db:
+            with db.cursor() as cursor:
+                cursor.execute(
+                    """SELECT COUNT(*) AS row_count, MAX(serial_num) AS max_serial,
+                              BIT_XOR(CRC32(serial_num)) AS checksum
+                       FROM faceware_assembly1
+                       WHERE batch_code = %s""",
+                    (batch_code,)
+                )
+                row = cursor.fetchone()
+        return (int(row["row_count"]), row["max_serial"], int(row["checksum"] or 0))
+
+    @staticmethod
+    def _batch_result(rows: BatchRows, serial_num: Optional[str] = None) -> Dict[str, Any]:
+        """Build the batch header from fetched rows (PO of the scanned serial if given)"""
+        return {
+            "batch_code": rows.batch_code,
+            "po_num": rows.po_for(serial_num),
+            "serials": rows
+        }
+
+    @_retry_stale
+    def get_po_summary(self, po_num: str) -> List[Dict[str, Any]]:
+        """
+        Summarize how a PO is distributed across batches
+        
+        The aggregation runs on the server, so only one small row per batch
+        is transferred instead of every serial of the PO.
+        
+        Args:
+            po_num: The PO number to summarize
+            
+        Returns:
+            List of dictionaries with batch_code, row_count, first_serial and
+            last_serial, ordered by batch_code (empty if the PO is unknown)
+        """
+        with self._connection(timed=True) as db:
+            with db.cursor() as cursor:
+                with INSTRUMENTATION.phase("query"):
+                    cursor.execute(
+                        """SELECT batch_code,
+                                  COUNT(*) AS row_count,
+                                  MIN(serial_num) AS first_serial,
+                                  MAX(serial_num) AS last_serial
+                           FROM faceware_assembly1
+                           WHERE po_num = %s
+                           GROUP BY batch_code
+                           ORDER BY batch_code""",
+                        (po_num,)
+                    )
+                with INSTRUMENTATION.phase("fetch"):
+                    return list(cursor.fetchall())
+
+    @_retry_stale
+    def get_serials_in_batches(self, batch_codes: List[str]) -> Dict[str, BatchRows]:
+        """
+        Fetch several whole batches in one round trip
+        
+        Returns:
+            Dictionary of batch_code -> BatchRows ordered by serial_num
+        """
+        import pymysql
+        grouped: Dict[str, List[Row]] = {code: [] for code in batch_codes}
+        if not batch_codes:
+            return {}
+        with self._connection() as db:
+            with db.cursor(pymysql.cursors.Cursor) as cursor:
+                cursor.execute(
+                    """SELECT serial_num, batch_code, po_num
+                       FROM faceware_assembly1
+                       WHERE batch_code IN %s
+                       ORDER BY batch_code, serial_num""",
+                    (list(batch_codes),)
+                )
+                for row in cursor.fetchall():
+                    grouped.setdefault(row[1], []).append(row)
+        return {code: BatchRows.from_tuples(rows) for code, rows in grouped.items()}
+
+    def bulk_resolve(self, serials: Iterable[str], chunk_size: int = BULK_CHUNK_SIZE,
+                     progress: Optional[Callable[[int, int], None]] = None
+                     ) -> Tuple[List[Row], List[str]]:
+        """
+        Resolve batch_code and po_num for many serial numbers
+        
+        Serials are looked up with chunked WHERE serial_num IN (...)
+        queries, one round trip per chunk. A chunk that hits a stale
+        connection is retried on its own, so earlier chunks are neither
+        queried nor reported to progress twice.
+        
+        Args:
+            serials: Serial numbers to resolve (duplicates are resolved once)
+            chunk_size: Serials per query
+            progress: Called as progress(done, total) after each chunk
+            
+        Returns:
+            Tuple of (rows, not_found): one (serial_num, batch_code, po_num)
+            row per distinct serial in input order, with empty batch_code
+            and po_num for serials that were not found, and the list of
+            serials that were not found
+        """
+        unique = list(dict.fromkeys(s for s in serials if s))
+        found: Dict[str, Row] = {}
+        
+        for start in range(0, len(unique), chunk_size):
+            for row in self._resolve_chunk(unique[start:start + chunk_size]):
+                # Collation is case-insensitive, so match the same way
+                found.setdefault(row[0].casefold(), row)
+            if progress is not None:
+                progress(min(start + chunk_size, len(unique)), len(unique))
+        
+        rows, not_found = [], []
+        for serial_num in unique:
+            row = found.get(serial_num.casefold())
+            if row is None:
+                not_found.append(serial_num)
+                row = (serial_num, "", "")
+            rows.append(row)
+        return rows, not_found
+
+    @_retry_stale
+    def _resolve_chunk(self, chunk: List[str]) -> List[Row]:
+        """(serial_num, batch_code, po_num) rows of the serials in one bulk_resolve chunk"""
+        import pymysql
+        with self._connection() as db:
+            with db.cursor(pymysql.cursors.Cursor) as cursor:
+                cursor.execute(
+                    """SELECT serial_num, batch_code, po_num
+                       FROM faceware_assembly1
+                       WHERE serial_num IN %s""",
+                    (chunk,)
+                )
+                return cursor.fetchall()
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Return connection pool counters (hits, new connects, waits, ...)"""
+        return self.pool.stats()
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Return batch cache counters (hits, misses, evictions, ...)"""
+        return self.cache.stats() if self.cache is not None else {}
+
+    def close(self):
+        """Stop replica sync and prefetching and close all pooled connections"""
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+        if self._syncer is not None:
+            self._syncer.stop(timeout=5)
+        if self.replica is not None:
+            self.replica.close()
+        self.pool.close()
\ No newline at end of file
@@ -0,0 +1,292 @@
+"""
+Background CSV export writer for the Batch Code Scanner
+
+Exports are queued from the Tk thread and written by a single writer
+thread. Every batch's rows are fingerprinted; when a batch is exported
+again with identical content and the previous file still exists, that
+file is reused instead of writing a new timestamped copy.
+
+Rows can also be streamed (e.g. DatabaseManager.iter_serials_in_batch
+for a batch too large to hold): they are fingerprinted while the file is
+written. A streamed export can come with the batch's change signature
+(DatabaseManager.get_batch_signature); when it matches the signature
+recorded with the last export, the stream is not opened at all.
+Otherwise a new file that turns out to be unchanged is removed again.
+
+In incremental mode each batch has one export file (batch_<code>.<ext>)
+with a sidecar manifest (<file>.manifest.json) recording the row count,
+last serial, fingerprint, signature and size of what was written. A rescan of a
+growing batch appends only the rows after that prefix; if the prefix
+changed (rows removed or inserted before the end) or the file was
+modified, the file is rewritten.
+"""
+import hashlib
+import json
+import os
+import queue
+import threading
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union, Any
+
+from batch_rows import Row
+from instrumentation import INSTRUMENTATION
+
+
+def _row_line(row: Row) -> bytes:
+    """A row as fingerprinted (tab-separated, one line)"""
+    return f'{row[0]}\t{row[1]}\t{row[2]}\n'.encode("utf-8")
+
+
+class _Tally:
+    """Fingerprints and counts rows while they pass through to a writer"""
+
+    def __init__(self):
+        self.digest = hashlib.sha1()
+        self.rows = 0
+        self.last_serial: Optional[str] = None
+
+    def feed(self, rows: Iterable[Row]) -> Iterator[Row]:
+        for row in rows:
+            self.digest.update(_row_line(row))
+            self.rows += 1
+            self.last_serial = row[0]
+            yield row
+
+    def hexdigest(self) -> str:
+        return self.digest.hexdigest()
+
+
+class ExportWriter:
+    """Writes batch exports on a background thread with content deduplication"""
+
+    def __init__(self, exporter, index_path: Optional[str] = None, incremental: bool = False):
+        """
+        Args:
+            exporter: CSVExporter (or an object with the same export,
+                batch_path, write_file and format attributes)
+            index_path: JSON file remembering the last fingerprint and file
+                per batch across restarts (None keeps it in memory only)
+            incremental: Append new rows to one file per batch instead of
+                writing a new timestamped file when a batch changed
+        """
+        self.exporter = exporter
+        self.index_path = index_path
+        self.incremental = incremental
+        self._index: Dict[str, Dict[str, str]] = self._load_index()
+        self._jobs: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._results: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="export-writer", daemon=True)
+        self._thread.start()
+
+        self.written = 0
+        self.reused = 0
+        self.appended = 0
+
+    @staticmethod
+    def fingerprint(rows: Iterable[Row]) -> str:
+        """Content hash of a batch's rows (order-sensitive)"""
+        digest = hashlib.sha1()
+        for row in rows:
+            digest.update(_row_line(row))
+        return digest.hexdigest()
+
+    def submit(self, rows: Union[Sequence[Row], Callable[[], Iterable[Row]]],
+               batch_code: str, timings=None, incremental: Optional[bool] = None,
+               signature: Optional[Callable[[], Sequence[Any]]] = None):
+        """
+        Queue a batch for export and return immediately
+
+        Args:
+            rows: Rows to export, or a function called on the writer
+                thread that returns them, either as a sequence or as a
+                stream (e.g. DatabaseManager.iter_serials_in_batch); an
+                incremental export may call it twice
+            batch_code: The batch code for filename generation
+            timings: ScanTimings of the scan, returned with the result
+                after the export phase has been added to it
+            incremental: Override the writer's incremental mode for this
+                export (e.g. False for ad-hoc lists that are not batches)
+            signature: Function called on the writer thread, before rows,
+                that returns the batch's change signature (e.g. a call to
+                DatabaseManager.get_batch_signature); an unchanged
+                signature skips the export without reading the rows
+        """
+        self._jobs.put({
+            "rows": rows,
+            "batch_code": batch_code,
+            "timings": timings,
+            "incremental": self.incremental if incremental is None else incremental,
+            "signature": signature
+        })
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """
+        Collect finished exports without blocking
+
+        Each result has batch_code, rows (count), timings and either path
+        and reused (True if an identical earlier file was kept) or error.
+        Incremental exports also report appended (rows added to the file,
+        None if the file was written from scratch).
+        """
+        finished = []
+        while True:
+            try:
+                finished.append(self._results.get_nowait())
+            except queue.Empty:
+                return finished
+
+    @property
+    def pending(self) -> int:
+        """Number of exports waiting to be written"""
+        return self._jobs.qsize()
+
+    def close(self, timeout: Optional[float] = None):
+        """Write all pending exports, then stop the writer thread"""
+        self._jobs.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            with INSTRUMENTATION.phase("export", job["timings"]):
+                result = self._export(job["rows"], job["batch_code"], job["incremental"], job["signature"])
+            result["timings"] = job["timings"]
+            self._results.put(result)
+
+    @staticmethod
+    def _open(source) -> Iterable[Row]:
+        return source() if callable(source) else source
+
+    def _export(self, source, batch_code: str, incremental: bool = False,
+                signature: Optional[Callable[[], Sequence[Any]]] = None) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"batch_code": batch_code, "rows": 0}
+        try:
+            # Taken before the rows are read: a change while they stream
+            # makes the next export compare unequal
+            current = list(signature()) if signature is not None else None
+            if incremental:
+                result.update(self._export_incremental(source, batch_code, current))
+                return result
+            fmt = self.exporter.format.name
+            previous = self._index.get(batch_code)
+            if (current is not None and previous and previous.get("signature") == current
+                    and previous.get("format", "csv") == fmt and os.path.exists(previous["path"])):
+                self.reused += 1
+                result.update(rows=current[0], path=previous["path"], reused=True)
+                return result
+            rows = self._open(source)
+            if isinstance(rows, Sequence):
+                result["rows"] = len(rows)
+                fingerprint = self.fingerprint(rows)
+                path = None
+            else:
+                # Streamed: fingerprint while writing
+                tally = _Tally()
+                path = self.exporter.export(tally.feed(rows), batch_code)
+                result["rows"] = tally.rows
+                fingerprint = tally.hexdigest()
+            if (previous and previous["fingerprint"] == fingerprint
+                    and previous.get("format", "csv") == fmt and os.path.exists(previous["path"])):
+                if path is not None and path != previous["path"]:
+                    os.remove(path)
+                if current is not None and previous.get("signature") != current:
+                    previous["signature"] = current
+                    self._save_index()
+                self.reused += 1
+                result.update(path=previous["path"], reused=True)
+                return result
+
+            if path is None:
+                path = self.exporter.export(rows, batch_code)
+            self._index[batch_code] = {"fingerprint": fingerprint, "path": path, "format": fmt}
+            if current is not None:
+                self._index[batch_code]["signature"] = current
+            self._save_index()
+            self.written += 1
+            result.update(path=path, reused=False)
+        except Exception as err:
+            result["error"] = err
+        return result
+
+    def _export_incremental(self, source, batch_code: str,
+                            signature: Optional[List[Any]] = None) -> Dict[str, Any]:
+        path = self.exporter.batch_path(batch_code)
+        manifest_path = path + ".manifest.json"
+        fmt = self.exporter.format.name
+        manifest = self._read_json(manifest_path)
+
+        # Rows already in the file, if the file is the one the manifest describes
+        exported = None
+        if (manifest and manifest.get("format") == fmt and os.path.exists(path)
+                and os.path.getsize(path) == manifest.get("bytes")):
+            exported = manifest.get("rows", 0)
+            if signature is not None and manifest.get("signature") == signature:
+                self.reused += 1
+                return {"path": path, "reused": True, "appended": 0, "rows": exported}
+
+        # One pass over the rows: hash the already-exported prefix, then
+        # append whatever follows it
+        tally = _Tally()
+        outcome = None
+        if exported is not None:
+            rows = iter(self._open(source))
+            for _ in tally.feed(islice(rows, exported)):
+                pass
+            if tally.rows == exported and tally.hexdigest() == manifest.get("fingerprint"):
+                first = next(rows, None)
+                if first is None:
+                    self.reused += 1
+                    outcome = {"path": path, "reused": True, "appended": 0}
+                else:
+                    appended = self.exporter.write_file(path, tally.feed(chain([first], rows)), append=True)
+                    self.appended += 1
+                    outcome = {"path": path, "reused": False, "appended": appended}
+        if outcome is None:
+            # Prefix changed (or no usable export yet): rewrite from the start
+            tally = _Tally()
+            self.exporter.write_file(path, tally.feed(self._open(source)))
+            self.written += 1
+            outcome = {"path": path, "reused": False, "appended": None}
+
+        self._write_json(manifest_path, {
+            "batch_code": batch_code,
+            "format": fmt,
+            "rows": tally.rows,
+            "last_serial": tally.last_serial,
+            "fingerprint": tally.hexdigest(),
+            "signature": signature,
+            "bytes": os.path.getsize(path),
+        })
+        outcome["rows"] = tally.rows
+        return outcome
+
+    def _load_index(self) -> Dict[str, Dict[str, str]]:
+        if not self.index_path:
+            return {}
+        return self._read_json(self.index_path) or {}
+
+    def _save_index(self):
+        if self.index_path:
+            self._write_json(self.index_path, self._index)
+
+    @staticmethod
+    def _read_json(path: str) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_json(path: str, data: Dict[str, Any]):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
@@ -0,0 +1,239 @@
+"""
+Export formats for the Batch Code Scanner
+
+Every format writes (serial_num, batch_code, po_num) rows to a binary
+file object and returns the number of rows written. Formats are looked
+up by name in EXPORT_FORMATS (see config.EXPORT_FORMAT and the CLI's
+--format option):
+
+    csv       plain CSV with a header row
+    csv.gz    the same CSV, gzip-compressed
+    jsonl     one JSON object per row
+    columnar  compact binary format storing batch_code and po_num once
+              per run of rows and the serial column zlib-compressed
+    ranges    CSV with one line per run of consecutive serials
+              (first, last, units, batch code, PO; see serial_ranges.py)
+
+Columnar layout: the magic line b"BCS1\\n", then blocks of
+
+    >I  row count
+    >H  batch_code length, batch_code (UTF-8)
+    >H  po_num length, po_num (UTF-8)
+    >I  compressed length, zlib("\\n".join(serials))
+
+A block holds consecutive rows sharing batch_code and po_num (at most
+COLUMNAR_BLOCK_ROWS). read_columnar() turns a file back into rows, and
+read_ranges() does the same for a ranges export.
+
+Every format can append to an existing export: write(..., header=False)
+omits the CSV header / columnar magic, and csv.gz appends a new gzip
+member (concatenated members read back as one stream).
+"""
+import csv
+import gzip
+import io
+import json
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Dict, Iterable, Iterator, List, TextIO
+
+from batch_rows import ROW_FIELDS, Row
+from serial_ranges import expand, iter_ranges, parse_serial, SerialRange
+
+CSV_HEADER = ["Serial Number", "Batch Code", "PO Number"]
+RANGES_HEADER = ["First Serial", "Last Serial", "Units", "Batch Code", "PO Number"]
+
+COLUMNAR_MAGIC = b"BCS1\n"
+COLUMNAR_BLOCK_ROWS = 65536
+
+
+class ExportFormat(ABC):
+    """Base class: writes rows to a binary file object"""
+
+    name = ""
+    extension = ""
+
+    @abstractmethod
+    def write(self, fileobj: BinaryIO, rows: Iterable[Row], header: bool = True) -> int:
+        """
+        Write an export to fileobj (which is left open)
+
+        Args:
+            fileobj: Binary file object (file, sys.stdout.buffer)
+            rows: Iterable of (serial_num, batch_code, po_num) rows; may be
+                a generator, rows are written as they are consumed
+            header: Start a new file (False when appending to an export
+                written earlier in the same format)
+
+        Returns:
+            Number of rows written
+        """
+
+
+class _TextFormat(ExportFormat):
+    """Text format written through a UTF-8 wrapper around the binary stream"""
+
+    def write(self, fileobj: BinaryIO, rows: Iterable[Row], header: bool = True) -> int:
+        text = io.TextIOWrapper(fileobj, encoding="utf-8", newline="")
+        try:
+            return self.write_text(text, rows, header)
+        finally:
+            text.flush()
+            text.detach()
+
+    @abstractmethod
+    def write_text(self, stream: TextIO, rows: Iterable[Row], header: bool = True) -> int:
+        """Write an export to a UTF-8 text stream (see ExportFormat.write)"""
+
+
+class CSVFormat(_TextFormat):
+    name = "csv"
+    extension = "csv"
+
+    def write_text(self, stream: TextIO, rows: Iterable[Row], header: bool = True) -> int:
+        return write_csv_rows(stream, rows, header)
+
+
+class GzipCSVFormat(ExportFormat):
+    name = "csv.gz"
+    extension = "csv.gz"
+
+    def __init__(self, compresslevel: int = 6):
+        self.compresslevel = compresslevel
+
+    def write(self, fileobj: BinaryIO, rows: Iterable[Row], header: bool = True) -> int:
+        # mtime=0 keeps identical batches byte-identical
+        with gzip.GzipFile(filename="", mode="wb", fileobj=fileobj,
+                           compresslevel=self.compresslevel, mtime=0) as gz:
+            return CSVFormat().write(gz, rows, header)
+
+
+class JSONLFormat(_TextFormat):
+    name = "jsonl"
+    extension = "jsonl"
+
+    def write_text(self, stream: TextIO, rows: Iterable[Row], header: bool = True) -> int:
+        return write_jsonl_rows(stream, rows)
+
+
+class RangesFormat(_TextFormat):
+    name = "ranges"
+    extension = "ranges.csv"
+
+    def write_text(self, stream: TextIO, rows: Iterable[Row], header: bool = True) -> int:
+        writer = csv.writer(stream)
+        if header:
+            writer.writerow(RANGES_HEADER)
+        count = 0
+        for serial_range, batch_code, po_num in iter_ranges(rows):
+            writer.writerow([serial_range.first, serial_range.last, serial_range.count, batch_code, po_num])
+            count += serial_range.count
+        return count
+
+
+class ColumnarFormat(ExportFormat):
+    name = "columnar"
+    extension = "bcs"
+
+    def __init__(self, block_rows: int = COLUMNAR_BLOCK_ROWS, compresslevel: int = 6):
+        self.block_rows = block_rows
+        self.compresslevel = compresslevel
+
+    def write(self, fileobj: BinaryIO, rows: Iterable[Row], header: bool = True) -> int:
+        if header:
+            fileobj.write(COLUMNAR_MAGIC)
+        count = 0
+        key = None
+        serials: List[str] = []
+        for serial_num, batch_code, po_num in rows:
+            if (batch_code, po_num) != key or len(serials) >= self.block_rows:
+                if serials:
+                    self._write_block(fileobj, key, serials)
+                key, serials = (batch_code, po_num), []
+            serials.append(serial_num)
+            count += 1
+        if serials:
+            self._write_block(fileobj, key, serials)
+        return count
+
+    def _write_block(self, fileobj: BinaryIO, key, serials: List[str]):
+        batch_code, po_num = (_encode(value) for value in key)
+        column = zlib.compress("\n".join(serials).encode("utf-8"), self.compresslevel)
+        fileobj.write(struct.pack(">IH", len(serials), len(batch_code)) + batch_code)
+        fileobj.write(struct.pack(">H", len(po_num)) + po_num)
+        fileobj.write(struct.pack(">I", len(column)) + column)
+
+
+def _encode(value) -> bytes:
+    return ("" if value is None else str(value)).encode("utf-8")
+
+
+def read_columnar(fileobj: BinaryIO) -> Iterator[Row]:
+    """Read rows back from a columnar export"""
+    if fileobj.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError("not a columnar batch export")
+    while True:
+        head = fileobj.read(6)
+        if not head:
+            return
+        count, batch_len = struct.unpack(">IH", head)
+        batch_code = fileobj.read(batch_len).decode("utf-8")
+        (po_len,) = struct.unpack(">H", fileobj.read(2))
+        po_num = fileobj.read(po_len).decode("utf-8")
+        (column_len,) = struct.unpack(">I", fileobj.read(4))
+        serials = zlib.decompress(fileobj.read(column_len)).decode("utf-8").split("\n")
+        if len(serials) != count:
+            raise ValueError("corrupt columnar block")
+        for serial_num in serials:
+            yield (serial_num, batch_code, po_num)
+
+
+def read_ranges(stream: TextIO) -> Iterator[Row]:
+    """Read rows back from a ranges export (text stream)"""
+    reader = csv.reader(stream)
+    if next(reader, None) != RANGES_HEADER:
+        raise ValueError("not a serial ranges export")
+    for first, last, units, batch_code, po_num in reader:
+        prefix, start, width = parse_serial(first)
+        serial_range = SerialRange(prefix, start, start + int(units) - 1, width)
+        if serial_range.last != last:
+            raise ValueError(f"corrupt range {first} - {last}")
+        yield from expand([(serial_range, batch_code, po_num)])
+
+
+def write_csv_rows(stream: TextIO, rows: Iterable[Row], header: bool = True) -> int:
+    """Write the CSV header (optionally) and rows to a text stream"""
+    writer = csv.writer(stream)
+    if header:
+        writer.writerow(CSV_HEADER)
+    # Rows are already in column order
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl_rows(stream: TextIO, rows: Iterable[Row]) -> int:
+    """Write rows as JSON Lines (one object per row) to a text stream"""
+    count = 0
+    for row in rows:
+        stream.write(json.dumps(dict(zip(ROW_FIELDS, row))) + "\n")
+        count += 1
+    return count
+
+
+EXPORT_FORMATS: Dict[str, ExportFormat] = {
+    fmt.name: fmt for fmt in (CSVFormat(), GzipCSVFormat(), JSONLFormat(), ColumnarFormat(), RangesFormat())
+}
+
+
+def get_format(name: str) -> ExportFormat:
+    """Look up an export format by name"""
+    try:
+        return EXPORT_FORMATS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown export format '{name}' (choose from {', '.join(EXPORT_FORMATS)})"
+        ) from None
@@ -1,25 +1,107 @@
 """
 GUI components for the Batch Code Scanner
 """
+import queue
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
+from tkinter import ttk, messagebox, filedialog
 import os
+import sys
 from typing import Optional
 from database import DatabaseManager
 from csv_exporter import CSVExporter
+from scan_worker import ScanWorker
+from export_writer import ExportWriter
+from serial_list import read_value_file
+from instrumentation import INSTRUMENTATION
+from startup import STARTUP
+from virtual_table import VirtualTable
+from paged_rows import PagedRows
+from scan_debounce import ScanDebouncer
+from live_refresh import LiveRefresher
+from serial_index import SerialIndex, FilteredRows
+from serial_ranges import SerialRanges
+from prefix_search import PrefixSuggester
+from batch_rows import BatchRows
 from config import WINDOW_TITLE, WINDOW_SIZE, WINDOW_BG, PRIMARY_COLOR, TEXT_COLOR, INFO_COLOR, STATUS_COLOR, TEXT_COLOR1
+from config import SCAN_WORKERS, SCAN_POLL_MS, SCAN_DEDUP_WINDOW
+from config import EXPORT_INDEX_PATH, EXPORT_INCREMENTAL
+from config import LOOKUP_SERVICE_URL, LIVE_REFRESH_ENABLED, LIVE_REFRESH_INTERVAL, COLLAPSE_SERIAL_RANGES
+from config import SUGGEST_ENABLED, SUGGEST_MIN_CHARS, SUGGEST_LIMIT, SUGGEST_DEBOUNCE_MS, SUGGEST_CACHE_SIZE
+from config import CACHE_TTL
+from config import LOGO_FILE, LOGO_SOURCE_FILE, LOGO_CACHE_PATH
+
+
+def resource_path(name: str) -> str:
+    """Path of a file shipped next to the app (or inside the PyInstaller bundle)"""
+    base = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base, name)
+
+
+# Scan mode dropdown entry -> lookup type passed to the scan workers
+SCAN_MODES = {
+    "Serial Number": "serial",
+    "Batch Code": "batch",
+    "PO Number": "po",
+}
+
+SERIAL_COLUMNS = ("Serial Number", "Batch Code", "PO Number")
+PO_SUMMARY_COLUMNS = ("Batch Code", "Units", "First Serial", "Last Serial")
+RANGE_COLUMNS = ("Serial Numbers", "Units", "Batch Code", "PO Number")
+
 
 class BatchCodeScannerGUI:
     """Main GUI class for the Batch Code Scanner application"""
     
     def __init__(self, root):
         self.root = root
-        self.db_manager = DatabaseManager()
+        # Stations sharing a lookup service do not connect to MySQL themselves
+        # (imported only then: http.server/http.client cost start-up time)
+        if LOOKUP_SERVICE_URL:
+            from lookup_service import RemoteDatabaseManager
+            self.db_manager = RemoteDatabaseManager(LOOKUP_SERVICE_URL)
+        else:
+            self.db_manager = DatabaseManager()
         self.csv_exporter = CSVExporter()
+        self.export_writer = ExportWriter(
+            self.csv_exporter, index_path=EXPORT_INDEX_PATH, incremental=EXPORT_INCREMENTAL
+        )
+        self.scan_worker = ScanWorker(self._resolve_scan, workers=SCAN_WORKERS)
+        self._displayed_seq = 0
+        self._displayed_batch = None
+        self.scan_debouncer = ScanDebouncer(window=SCAN_DEDUP_WINDOW)
+        self.live_refresher = LiveRefresher(self.db_manager, interval=LIVE_REFRESH_INTERVAL)
+        self.live_var = tk.BooleanVar(value=LIVE_REFRESH_ENABLED)
+        self._serial_index = None
+        self._serial_index_rows = None
+        self._serial_ranges = None
+        self.suggester = PrefixSuggester(
+            self.db_manager.search_prefix, limit=SUGGEST_LIMIT, cache_size=SUGGEST_CACHE_SIZE, ttl=CACHE_TTL
+        )
+        self._suggest_after = None
+        self._bulk_events = queue.Queue()
         
         self._setup_window()
         self._create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.root.after(SCAN_POLL_MS, self._poll_scan_results)
+        STARTUP.mark("window built")
+        self._map_binding = self.root.bind("<Map>", self._on_first_map, add="+")
+    
+    def _on_first_map(self, event=None):
+        """Once the window is on screen, start the background start-up work"""
+        if event is not None and event.widget is not self.root:
+            return
+        self.root.unbind("<Map>", self._map_binding)
+        STARTUP.mark("window mapped")
+        threading.Thread(target=self._prewarm, name="prewarm", daemon=True).start()
+        self.db_manager.start_replica_sync()
+    
+    def _prewarm(self):
+        """Import pymysql and open the first pooled connection in the background"""
+        self.db_manager.prewarm()
+        STARTUP.mark("db prewarm")
+        STARTUP.write_report()
     
     def _setup_window(self):
         """Configure the main window"""
@@ -27,6 +109,18 @@ class BatchCodeScannerGUI:
         self.root.geometry(WINDOW_SIZE)
         self.root.configure(bg=WINDOW_BG)
     
+    def _on_close(self):
+        """Stop the scan workers, flush pending exports, release pooled connections and close the window"""
+        self.scan_worker.close()
+        self.live_refresher.close()
+        self.suggester.close()
+        self.status_label.config(text="Saving pending CSV exports...")
+        self.root.update_idletasks()
+        self.export_writer.close()
+        INSTRUMENTATION.log_report()
+        self.db_manager.close()
+        self.root.destroy()
+    
     def _create_widgets(self):
         """Create all GUI widgets"""
         # Main frame
@@ -87,7 +181,7 @@ class BatchCodeScannerGUI:
         mode_dropdown = ttk.Combobox(
             input_frame,
             textvariable=self.scan_mode,
-            values=["Serial Number", "Batch Code"],
+            values=list(SCAN_MODES),
             state="readonly",
             width=15,
             font=("Arial", 11)
@@ -108,9 +202,18 @@ class BatchCodeScannerGUI:
         # === INPUT ENTRY ===
         self.scan_entry = tk.Entry(input_frame, font=("Arial", 12), width=30)
         self.scan_entry.pack(side=tk.LEFT, padx=(0, 10))
-        self.scan_entry.bind('<Return>', lambda e: self.scan_input())
+        self.scan_entry.bind('<Return>', self._on_scan_return)
+        self.scan_entry.bind('<KeyRelease>', self._on_entry_key_release)
+        self.scan_entry.bind('<Down>', self._focus_suggestions)
+        self.scan_entry.bind('<Escape>', lambda e: self._cancel_suggestions())
         self.scan_entry.focus()
 
+        # === PREFIX SUGGESTIONS (shown under the entry while typing) ===
+        self.suggest_box = tk.Listbox(self.root, font=("Arial", 11), activestyle="dotbox")
+        self.suggest_box.bind('<Return>', self._pick_suggestion)
+        self.suggest_box.bind('<Double-1>', self._pick_suggestion)
+        self.suggest_box.bind('<Escape>', lambda e: self._cancel_suggestions(refocus=True))
+
         # === SCAN BUTTON ===
         scan_btn = tk.Button(
             input_frame,
@@ -125,105 +228,480 @@ class BatchCodeScannerGUI:
         )
         scan_btn.pack(side=tk.LEFT)
 
+        # === IMPORT LIST BUTTON ===
+        self.import_btn = tk.Button(
+            input_frame,
+            text="Import List",
+            font=("Arial", 11, "bold"),
+            bg=INFO_COLOR,
+            fg="white",
+            padx=10,
+            pady=5,
+            command=self.import_serial_list,
+            cursor="hand2"
+        )
+        self.import_btn.pack(side=tk.LEFT, padx=(10, 0))
+
 
     def _on_mode_change(self, event=None):
         """Update input label when scan mode changes"""
-        mode = self.scan_mode.get()
-        label_text = "Serial Number:" if mode == "Serial Number" else "Batch Code:"
-        self.input_label.config(text=label_text)
+        self.input_label.config(text=f"{self.scan_mode.get()}:")
+        self._cancel_suggestions()
+        self.scan_entry.delete(0, tk.END)
+        self.scan_entry.focus()
+
+    def _on_entry_key_release(self, event):
+        """Look up suggestions once typing pauses (a scanner's Enter scans first)"""
+        if event.keysym in ("Return", "KP_Enter", "Escape", "Up", "Down", "Tab"):
+            return
+        if self._suggest_after is not None:
+            self.root.after_cancel(self._suggest_after)
+        self._suggest_after = self.root.after(SUGGEST_DEBOUNCE_MS, self._request_suggestions)
+
+    def _request_suggestions(self):
+        """Ask for values starting with the entry text (serial and batch modes)"""
+        self._suggest_after = None
+        by = SCAN_MODES[self.scan_mode.get()]
+        prefix = self.scan_entry.get().strip()
+        if not SUGGEST_ENABLED or by == "po" or len(prefix) < SUGGEST_MIN_CHARS:
+            self.suggester.cancel()
+            self.suggest_box.place_forget()
+            return
+        self.suggester.request(by, prefix)
+
+    def _show_suggestions(self, result):
+        """Fill the suggestion list under the entry with a prefix search result"""
+        values = result.get("values")
+        if not values or result["prefix"] != self.scan_entry.get().strip():
+            self.suggest_box.place_forget()
+            return
+        self.suggest_box.delete(0, tk.END)
+        for value in values:
+            self.suggest_box.insert(tk.END, value)
+        self.suggest_box.configure(height=min(len(values), 8))
+        self.suggest_box.place(in_=self.scan_entry, x=0, rely=1.0, relwidth=1.0)
+        self.suggest_box.lift()
+
+    def _focus_suggestions(self, event=None):
+        """Down arrow in the entry: move into the suggestion list"""
+        if self.suggest_box.winfo_ismapped():
+            self.suggest_box.focus_set()
+            self.suggest_box.selection_clear(0, tk.END)
+            self.suggest_box.selection_set(0)
+            self.suggest_box.activate(0)
+        return "break"
+
+    def _pick_suggestion(self, event=None):
+        """Scan the chosen suggestion"""
+        selection = self.suggest_box.curselection()
+        if not selection:
+            return "break"
+        value = self.suggest_box.get(selection[0])
         self.scan_entry.delete(0, tk.END)
+        self.scan_entry.insert(0, value)
         self.scan_entry.focus()
+        self.scan_input()
+        return "break"
+
+    def _cancel_suggestions(self, refocus: bool = False):
+        """Drop pending suggestion lookups and hide the list"""
+        if self._suggest_after is not None:
+            self.root.after_cancel(self._suggest_after)
+            self._suggest_after = None
+        self.suggester.cancel()
+        self.suggest_box.place_forget()
+        if refocus:
+            self.scan_entry.focus()
+
 
+    def _on_scan_return(self, event=None):
+        """
+        Scan the entry at once
+        
+        Tk delivers a barcode wedge's keystrokes before its Return, so the
+        entry holds the whole barcode; it is read and cleared right here,
+        before a double-fired scan can type into it again.
+        """
+        self.scan_input()
+        return "break"
 
     def scan_input(self):
-        """Handle scanning based on selected mode (Serial or Batch Code)"""
+        """Queue a scan based on selected mode (Serial or Batch Code)"""
         input_value = self.scan_entry.get().strip()
         mode = self.scan_mode.get()
 
         if not input_value:
-            messagebox.showwarning("Input Required", f"Please enter a {mode.lower()}.")
+            # A double-fired Enter arrives after the entry was cleared
+            if not self.scan_debouncer.empty_repeat():
+                messagebox.showwarning("Input Required", f"Please enter a {mode.lower()}.")
+            self._update_queue_status()
+            return
+
+        by = SCAN_MODES[mode]
+        self._cancel_suggestions()
+        self.scan_entry.delete(0, tk.END)
+        self.scan_entry.focus()
+        if not self.scan_debouncer.accept(by, input_value):
+            self._show_repeated_scan(by, input_value)
+            self._update_queue_status()
             return
 
+        # Hand the lookup to the scan workers and accept the next scan at once
+        self.scan_worker.submit(input_value, by)
+        self._update_queue_status()
+
+    def _resolve_scan(self, value, by):
+        """Look up one scan (runs on a scan worker thread)"""
+        if by == "po":
+            batches = self.db_manager.get_po_summary(value)
+            return {"po_num": value, "batches": batches} if batches else None
+        # Large batches come back as their first page; the rest loads on scroll
+        return self.db_manager.open_batch(value, by)
+
+    def _poll_scan_results(self):
+        """Apply finished scans from the workers (runs on the Tk thread)"""
         try:
-            if mode == "Serial Number":
-                # === SCAN BY SERIAL NUMBER ===
-                assembly_data = self.db_manager.get_batch_info(input_value)
-                if not assembly_data:
-                    messagebox.showwarning(
-                        "Not Found",
-                        f"Serial '{input_value}' not found in assembly1 table."
-                    )
-                    self.status_label.config(text=f"Serial '{input_value}' not found")
-                    return
-                batch_code = assembly_data["batch_code"]
-                po_num = assembly_data["po_num"]
-
-            else:  # mode == "Batch Code"
-                # === SCAN BY BATCH CODE ===
-                assembly_data = self.db_manager.get_batch_info_by_batch(input_value)
-                if not assembly_data:
-                    messagebox.showwarning(
-                        "Not Found",
-                        f"Batch code '{input_value}' not found."
-                    )
-                    self.status_label.config(text=f"Batch '{input_value}' not found")
-                    return
-                batch_code = assembly_data["batch_code"]
-                po_num = assembly_data["po_num"]
-
-            # === COMMON: Fetch all serials in batch ===
-            all_serials = self.db_manager.get_all_serials_in_batch(batch_code)
+            for job in self.scan_worker.poll():
+                self._handle_scan_result(job)
+            for export in self.export_writer.poll():
+                self._handle_export_result(export)
+            while not self._bulk_events.empty():
+                self._handle_bulk_event(self._bulk_events.get_nowait())
+            rows = self._batch_rows()
+            if isinstance(rows, PagedRows) and rows.take_update():
+                if self._view_transformed():
+                    self._apply_view(keep_position=True)
+                else:
+                    self.table.render()
+            for update in self.live_refresher.poll():
+                self._apply_live_update(update)
+            suggestions = self.suggester.poll()
+            if suggestions is not None:
+                self._show_suggestions(suggestions)
+        finally:
+            self._update_queue_status()
+            # Rescheduled only after handling, so a message box cannot
+            # re-enter this method from its nested event loop
+            self.root.after(SCAN_POLL_MS, self._poll_scan_results)
 
-            # Update UI
-            self.batch_label.config(text=batch_code)
-            self.po_label.config(text=po_num)
-            self.count_label.config(text=str(len(all_serials)))
-            self._update_table(all_serials)
+    def _handle_scan_result(self, job):
+        """Show the outcome of one scan"""
+        input_value = job["value"]
+        err = job.get("error")
+        if err is not None or not job.get("result"):
+            # Let the operator retry at once instead of being suppressed
+            self.scan_debouncer.forget(job["by"], input_value)
+        else:
+            self.scan_debouncer.remember(job["by"], input_value, job["result"])
+        if isinstance(err, ConnectionError):
+            messagebox.showerror("Database Error", str(err))
+            self.status_label.config(text="Database connection failed")
+            return
+        if err is not None:
+            messagebox.showerror("Error", f"An error occurred: {err}")
+            self.status_label.config(text="Error occurred during scan")
+            return
 
-            # Export CSV
-            filepath = self.csv_exporter.export_to_csv(all_serials, batch_code)
+        batch = job["result"]
+        if not batch:
+            INSTRUMENTATION.finish(job.get("timings"), found=False)
+            if job["by"] == "serial":
+                messagebox.showwarning(
+                    "Not Found",
+                    f"Serial '{input_value}' not found in assembly1 table."
+                )
+                self.status_label.config(text=f"Serial '{input_value}' not found")
+            elif job["by"] == "po":
+                messagebox.showwarning(
+                    "Not Found",
+                    f"PO number '{input_value}' not found."
+                )
+                self.status_label.config(text=f"PO '{input_value}' not found")
+            else:
+                messagebox.showwarning(
+                    "Not Found",
+                    f"Batch code '{input_value}' not found."
+                )
+                self.status_label.config(text=f"Batch '{input_value}' not found")
+            self._suggest_after_miss(input_value, job["by"])
+            return
+        if job["by"] == "po":
+            self._show_po_summary(job, batch)
+            return
+
+        batch_code = batch["batch_code"]
+        po_num = batch["po_num"]
+        all_serials = batch["serials"]
+
+        timings = job.get("timings")
+        try:
+            # Workers may finish out of order; never replace a newer scan
+            if job["seq"] > self._displayed_seq:
+                self._displayed_seq = job["seq"]
+                with INSTRUMENTATION.phase("render", timings):
+                    self._show_batch(batch)
+
+            # Export CSV in the background (unchanged batches are not rewritten);
+            # a paged batch is streamed from the server by the writer thread
+            # instead of being loaded into the table's rows, and only if its
+            # signature changed since the last export
+            if isinstance(all_serials, PagedRows):
+                stream = lambda: self.db_manager.iter_serials_in_batch(batch_code)
+                signature = lambda: self.db_manager.get_batch_signature(batch_code)
+                self.export_writer.submit(stream, batch_code, timings, signature=signature)
+            else:
+                self.export_writer.submit(all_serials, batch_code, timings)
+
+            # Operators usually scan the next batch of the same PO
+            self.db_manager.prefetch_siblings(batch_code, po_num)
 
             # Update status
             self.status_label.config(
-                text=f"Found {len(all_serials)} serials in batch '{batch_code}' - CSV downloaded"
+                text=f"Found {len(all_serials)} serials in batch '{batch_code}' - saving CSV..."
             )
-
-            # Clear and refocus
-            self.scan_entry.delete(0, tk.END)
-            self.scan_entry.focus()
-
-        except ConnectionError as err:
-            messagebox.showerror("Database Error", str(err))
-            self.status_label.config(text="Database connection failed")
         except Exception as err:
             messagebox.showerror("Error", f"An error occurred: {err}")
             self.status_label.config(text="Error occurred during scan")
+
+    def _suggest_after_miss(self, value, by):
+        """Offer values starting with a scan that was not found (e.g. a partial label)"""
+        if by == "po" or SCAN_MODES[self.scan_mode.get()] != by or self.scan_entry.get():
+            return  # the operator has moved on
+        self.scan_entry.insert(0, value)
+        self.scan_entry.select_range(0, tk.END)
+        self._request_suggestions()
+
+    def _show_batch(self, batch):
+        """Fill the info panel and table with a resolved batch"""
+        self._displayed_batch = batch
+        self.batch_label.config(text=batch["batch_code"])
+        self.po_label.config(text=batch["po_num"])
+        self.count_label.config(text=str(len(batch["serials"])))
+        self._update_table(batch["serials"])
+        if self.live_var.get():
+            self.live_refresher.watch(batch["batch_code"], batch["serials"])
+        self.root.update_idletasks()
+
+    def _on_live_toggle(self):
+        """Start or stop live refresh of the displayed batch"""
+        batch = self._displayed_batch
+        if self.live_var.get() and batch is not None:
+            self.live_refresher.watch(batch["batch_code"], batch["serials"])
+        else:
+            self.live_refresher.stop_watching()
+        self._update_queue_status()
+
+    def _apply_live_update(self, update):
+        """Apply added/removed serials of the displayed batch in place"""
+        batch = self._displayed_batch
+        if batch is None or update["base"] is not batch["serials"]:
+            return  # another batch was opened in the meantime
+        rows = update["rows"]
+        # Shared with the duplicate-scan memory, so a repeat shows the new rows
+        batch["serials"] = rows
+        if self._view_transformed():
+            self._apply_view(keep_position=True)
+        else:
+            self.table.apply_diff(rows, update["removed"], update["inserted"])
+        self.count_label.config(text=str(len(rows)))
+        self.status_label.config(
+            text=f"Live: +{len(update['inserted'])} / -{len(update['removed'])} serials in batch '{update['batch_code']}'"
+        )
+
+    def _show_repeated_scan(self, by, value):
+        """Show the result of a suppressed repeat without querying or exporting again"""
+        batch = self.scan_debouncer.recent_result(by, value)
+        if by != "po" and batch is not None and batch is not self._displayed_batch:
+            self._show_batch(batch)
+        self.status_label.config(text=f"Repeated scan of '{value}' ignored")
+
+    def _show_po_summary(self, job, summary):
+        """Show the per-batch breakdown of a PO (nothing is exported)"""
+        batches = summary["batches"]
+        total = sum(int(b["row_count"]) for b in batches)
+        timings = job.get("timings")
+        if job["seq"] > self._displayed_seq:
+            self._displayed_seq = job["seq"]
+            with INSTRUMENTATION.phase("render", timings):
+                self.batch_label.config(text=f"{len(batches)} batches")
+                self.po_label.config(text=summary["po_num"])
+                self.count_label.config(text=str(total))
+                self.table_frame.config(text="Batches in PO (double-click to open)")
+                self._displayed_batch = None
+                self.live_refresher.stop_watching()
+                self.filter_var.set("")
+                self.table.set_columns(PO_SUMMARY_COLUMNS, self._summary_values)
+                self.table.set_rows(batches)
+                self.root.update_idletasks()
+        INSTRUMENTATION.finish(timings, found=True, batches=len(batches), rows=total)
+        text = f"PO '{summary['po_num']}': {total} serials in {len(batches)} batches"
+        if timings is not None:
+            text += f" ({timings.summary()})"
+        self.status_label.config(text=text)
+
+    def _on_table_double_click(self, event):
+        """Open the batch under the pointer while a PO summary is shown"""
+        if self.table.row_values != self._summary_values:
+            return
+        index = self.table.row_at(event.y)
+        if index is None:
+            return
+        batch_code = self.table.rows[index]["batch_code"]
+        self.scan_worker.submit(batch_code, "batch")
+        self.status_label.config(text=f"Opening batch '{batch_code}'...")
+        self._update_queue_status()
+
+    def import_serial_list(self):
+        """Resolve batch and PO for a text/CSV list of serials in the background"""
+        path = filedialog.askopenfilename(
+            title="Import Serial List",
+            filetypes=[("Serial lists", "*.txt *.csv"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            serials = read_value_file(path)
+        except (OSError, UnicodeDecodeError) as err:
+            messagebox.showerror("Import Error", f"Failed to read list:\n{err}")
+            return
+        if not serials:
+            messagebox.showwarning("Import List", "The selected file contains no serial numbers.")
+            return
+
+        self.import_btn.config(state=tk.DISABLED)
+        self.status_label.config(text=f"Resolving {len(serials)} serials...")
+        threading.Thread(
+            target=self._run_bulk_resolve, args=(serials,), name="bulk-resolve", daemon=True
+        ).start()
+
+    def _run_bulk_resolve(self, serials):
+        """Bulk resolve on a background thread; results go to _bulk_events"""
+        try:
+            rows, not_found = self.db_manager.bulk_resolve(
+                serials,
+                progress=lambda done, total: self._bulk_events.put(("progress", done, total))
+            )
+            self._bulk_events.put(("done", rows, not_found))
+        except Exception as err:
+            self._bulk_events.put(("error", err, None))
+
+    def _handle_bulk_event(self, event):
+        """Show bulk resolve progress and results (runs on the Tk thread)"""
+        kind, first, second = event
+        if kind == "progress":
+            self.status_label.config(text=f"Resolving serials... {first}/{second}")
+            return
+        self.import_btn.config(state=tk.NORMAL)
+        if kind == "error":
+            title = "Database Error" if isinstance(first, ConnectionError) else "Error"
+            messagebox.showerror(title, f"Bulk resolve failed: {first}")
+            self.status_label.config(text="Bulk resolve failed")
+            return
+
+        rows, not_found = first, second
+        self.export_writer.submit(rows, "bulk_resolve", incremental=False)
+        self.status_label.config(
+            text=f"Resolved {len(rows) - len(not_found)} of {len(rows)} serials - saving CSV..."
+        )
+        if not_found:
+            preview = "\n".join(not_found[:10])
+            more = f"\n... and {len(not_found) - 10} more" if len(not_found) > 10 else ""
+            messagebox.showwarning(
+                "Not Found",
+                f"{len(not_found)} serial(s) were not found in assembly1 table:\n{preview}{more}"
+            )
+
+    def _handle_export_result(self, export):
+        """Show where a finished export was saved"""
+        if "error" in export:
+            messagebox.showerror("Export Error", f"Failed to save CSV:\n{export['error']}")
+            self.status_label.config(text=f"CSV export failed for batch '{export['batch_code']}'")
+            return
+        if export["reused"]:
+            text = f"Batch '{export['batch_code']}' unchanged - CSV already saved: {export['path']}"
+        elif export.get("appended"):
+            text = f"Added {export['appended']} new serials to batch '{export['batch_code']}' CSV: {export['path']}"
+        else:
+            text = f"Found {export['rows']} serials in batch '{export['batch_code']}' - CSV saved: {export['path']}"
+        timings = export.get("timings")
+        if timings is not None:
+            INSTRUMENTATION.finish(
+                timings, batch_code=export["batch_code"], rows=export["rows"], reused=export["reused"]
+            )
+            text += f" ({timings.summary()})"
+        self.status_label.config(text=text)
+
+    def _update_queue_status(self):
+        """Show how many scans are waiting and being resolved"""
+        queued = self.scan_worker.queued
+        in_flight = self.scan_worker.in_flight
+        if queued or in_flight:
+            text = f"Scanning... {in_flight} in flight, {queued} queued"
+        else:
+            text = "Idle"
+        if self.export_writer.pending:
+            text += f" | {self.export_writer.pending} CSV pending"
+        if self.scan_debouncer.suppressed:
+            text += f" | {self.scan_debouncer.suppressed} repeats ignored"
+        if self.live_refresher.watching:
+            text += " | live" + (" (probe failed)" if self.live_refresher.last_error else "")
+        rows = self._batch_rows()
+        if isinstance(rows, PagedRows) and not rows.complete:
+            text += f" | {rows.loaded}/{len(rows)} rows loaded"
+        if self.db_manager.replica is not None:
+            lag = self.db_manager.replica_lag()
+            text += " | replica " + ("not synced" if lag is None else f"lag {lag:.0f}s")
+        if self.db_manager.prefetcher is not None:
+            prefetch = self.db_manager.prefetcher.stats()
+            if prefetch["prefetched"]:
+                text += f" | prefetch hits {prefetch['prefetch_hits']}/{prefetch['prefetched']}"
+        self.queue_label.config(text=text)
     
     def _add_logo(self, parent):
         """Add company logo"""
         try:
-            # Load and resize the logo
-            logo_path = r"C:\Users\cadetautomation\Desktop\batch_code\kaertech_logo512.png"
+            photo = self._load_logo()
+            if photo is None:
+                print(f"Logo file not found: {LOGO_FILE}")
+                return
             
-            if os.path.exists(logo_path):
-                image = Image.open(logo_path)
-                # Resize to fit nicely next to title
-                image = image.resize((60, 60), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(image)
-                
-                # Create label to display the logo
-                logo_label = tk.Label(
-                    parent,
-                    image=photo,
-                    bg="white"
-                )
-                logo_label.image = photo  # Keep a reference!
-                logo_label.pack(side=tk.LEFT)
-            else:
-                print(f"Logo file not found at: {logo_path}")
+            # Create label to display the logo
+            logo_label = tk.Label(
+                parent,
+                image=photo,
+                bg="white"
+            )
+            logo_label.image = photo  # Keep a reference!
+            logo_label.pack(side=tk.LEFT)
         except Exception as e:
             # If logo fails to load, just skip it silently
             print(f"Logo not loaded: {e}")
+        STARTUP.mark("logo")
+    
+    def _load_logo(self) -> Optional[tk.PhotoImage]:
+        """
+        Load the 60px logo
+        
+        The pre-sized PNG shipped with the app is read by Tk directly, so
+        PIL is not needed at start-up. Without it, the large logo is
+        resized once with PIL and the result cached for later starts.
+        """
+        logo_path = resource_path(LOGO_FILE)
+        if os.path.exists(logo_path):
+            return tk.PhotoImage(file=logo_path)
+        if os.path.exists(LOGO_CACHE_PATH):
+            return tk.PhotoImage(file=LOGO_CACHE_PATH)
+        
+        source_path = resource_path(LOGO_SOURCE_FILE)
+        if not os.path.exists(source_path):
+            return None
+        from PIL import Image
+        image = Image.open(source_path)
+        # Resize to fit nicely next to title
+        image = image.resize((60, 60), Image.Resampling.LANCZOS)
+        os.makedirs(os.path.dirname(LOGO_CACHE_PATH), exist_ok=True)
+        image.save(LOGO_CACHE_PATH)
+        return tk.PhotoImage(file=LOGO_CACHE_PATH)
     
     def _create_info_section(self, parent):
         """Create information display section"""
@@ -246,6 +724,20 @@ class BatchCodeScannerGUI:
         
         # Count
         self._create_info_row(info_frame, "Total Serial Numbers:", "count_label", default="0")
+        
+        # Live refresh toggle (re-reads the displayed batch while it is being assembled)
+        tk.Checkbutton(
+            info_frame,
+            text=f"Live refresh (every {LIVE_REFRESH_INTERVAL:g}s)",
+            variable=self.live_var,
+            command=self._on_live_toggle,
+            font=("Arial", 10),
+            bg=WINDOW_BG,
+            fg=TEXT_COLOR1,
+            selectcolor=WINDOW_BG,
+            activebackground=WINDOW_BG,
+            activeforeground=TEXT_COLOR1
+        ).pack(anchor=tk.W, pady=(5, 0))
     
     def _create_info_row(self, parent, label_text: str, attr_name: str, default: str = "N/A"):
         """Helper method to create info row"""
@@ -273,7 +765,7 @@ class BatchCodeScannerGUI:
     
     def _create_table_section(self, parent):
         """Create table section with treeview"""
-        table_frame = tk.LabelFrame(
+        self.table_frame = table_frame = tk.LabelFrame(
             parent,
             text="Serial Numbers in Batch",
             font=("Arial", 12, "bold"),
@@ -284,8 +776,51 @@ class BatchCodeScannerGUI:
         )
         table_frame.pack(fill=tk.BOTH, expand=True)
         
+        # Filter box: narrows the table as you type (Enter jumps to an exact serial)
+        filter_frame = tk.Frame(table_frame, bg=WINDOW_BG)
+        filter_frame.pack(side=tk.TOP, fill=tk.X, pady=(0, 8))
+        
+        tk.Label(
+            filter_frame,
+            text="Filter:",
+            font=("Arial", 11),
+            bg=WINDOW_BG,
+            fg=TEXT_COLOR1
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.filter_var = tk.StringVar()
+        self.filter_entry = tk.Entry(filter_frame, textvariable=self.filter_var, font=("Arial", 11), width=30)
+        self.filter_entry.pack(side=tk.LEFT)
+        self.filter_entry.bind("<Return>", self._locate_serial)
+        self.filter_entry.bind("<Escape>", lambda e: self.filter_var.set(""))
+        
+        self.filter_count_label = tk.Label(
+            filter_frame,
+            text="",
+            font=("Arial", 10),
+            bg=WINDOW_BG,
+            fg=STATUS_COLOR
+        )
+        self.filter_count_label.pack(side=tk.LEFT, padx=(10, 0))
+        self.filter_var.trace_add("write", lambda *args: self._apply_view())
+        
+        # Collapse runs of consecutive serials into one row each
+        self.collapse_var = tk.BooleanVar(value=COLLAPSE_SERIAL_RANGES)
+        tk.Checkbutton(
+            filter_frame,
+            text="Collapse ranges",
+            variable=self.collapse_var,
+            command=self._apply_view,
+            font=("Arial", 10),
+            bg=WINDOW_BG,
+            fg=TEXT_COLOR1,
+            selectcolor=WINDOW_BG,
+            activebackground=WINDOW_BG,
+            activeforeground=TEXT_COLOR1
+        ).pack(side=tk.RIGHT)
+        
         # Create Treeview
-        columns = ("Serial Number", "Batch Code", "PO Number")
+        columns = SERIAL_COLUMNS
         self.tree = ttk.Treeview(
             table_frame,
             columns=columns,
@@ -301,25 +836,41 @@ class BatchCodeScannerGUI:
         # Scrollbar
         scrollbar = ttk.Scrollbar(
             table_frame,
-            orient=tk.VERTICAL,
-            command=self.tree.yview
+            orient=tk.VERTICAL
         )
-        self.tree.configure(yscrollcommand=scrollbar.set)
         
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # Only the visible rows are materialized as Treeview items
+        self.table = VirtualTable(self.tree, scrollbar, self._row_values)
+        self.tree.bind("<Double-1>", self._on_table_double_click)
     
     def _create_status_bar(self, parent):
         """Create status bar"""
+        status_frame = tk.Frame(parent, bg=WINDOW_BG)
+        status_frame.pack(fill=tk.X, pady=(10, 0))
+        
         self.status_label = tk.Label(
-            parent,
+            status_frame,
             text="Ready to scan...",
             font=("Arial", 10),
             bg=WINDOW_BG,
             fg=STATUS_COLOR,
             anchor=tk.W
         )
-        self.status_label.pack(fill=tk.X, pady=(10, 0))
+        self.status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        # Scan queue indicator
+        self.queue_label = tk.Label(
+            status_frame,
+            text="Idle",
+            font=("Arial", 10),
+            bg=WINDOW_BG,
+            fg=STATUS_COLOR,
+            anchor=tk.E
+        )
+        self.queue_label.pack(side=tk.RIGHT)
     
     def scan_serial(self):
         """Main function to scan serial number and retrieve batch data"""
@@ -376,16 +927,110 @@ class BatchCodeScannerGUI:
             messagebox.showerror("Error", f"An error occurred: {err}")
             self.status_label.config(text="Error occurred during scan")
     
+    @staticmethod
+    def _row_values(row):
+        """Treeview column values for a serial row (already in column order)"""
+        return row
+    
+    @staticmethod
+    def _summary_values(row):
+        """Treeview column values for a PO summary row"""
+        return (row["batch_code"], row["row_count"], row["first_serial"], row["last_serial"])
+    
     def _update_table(self, data):
         """Update the treeview table with data"""
-        # Clear existing data
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Insert new data
-        for row in data:
-            self.tree.insert("", tk.END, values=(
-                row["serial_num"],
-                row["batch_code"],
-                row["po_num"]
-            ))
\ No newline at end of file
+        self.table_frame.config(text="Serial Numbers in Batch")
+        self.table.set_columns(SERIAL_COLUMNS, self._row_values)
+        self.table.set_rows(data)
+        # A new batch starts unfiltered (and collapsed if that is switched on)
+        if self.filter_var.get():
+            self.filter_var.set("")
+        elif self.collapse_var.get():
+            self._apply_view()
+
+    def _batch_rows(self):
+        """Full rows of the displayed batch (None while a PO summary is shown)"""
+        batch = self._displayed_batch
+        return batch["serials"] if batch is not None else None
+
+    def _view_transformed(self) -> bool:
+        """True if the table shows the batch filtered or collapsed rather than as is"""
+        return bool(self.filter_var.get().strip()) or self.collapse_var.get()
+
+    @staticmethod
+    def _loaded_count(rows) -> int:
+        return rows.loaded if isinstance(rows, PagedRows) and not rows.complete else len(rows)
+
+    def _get_serial_index(self, rows) -> SerialIndex:
+        """Search index of the displayed rows, built once per batch (and per loaded page)"""
+        count = self._loaded_count(rows)
+        if self._serial_index_rows is not rows or self._serial_index.size != count:
+            if isinstance(rows, BatchRows):
+                serials = rows.serials
+            else:
+                serials = [row[0] for row in rows[0:count]]
+            self._serial_index = SerialIndex(serials)
+            self._serial_index_rows = rows
+        return self._serial_index
+
+    def _get_serial_ranges(self, rows, query: str, view) -> SerialRanges:
+        """Collapsed form of the (filtered) rows, built once per batch and filter text"""
+        count = self._loaded_count(rows)
+        cached = self._serial_ranges
+        if cached is None or cached[0] is not rows or cached[1:3] != (query, count):
+            if view is rows and count < len(rows):
+                view = FilteredRows(rows, range(count))
+            self._serial_ranges = (rows, query, count, SerialRanges.from_rows(view))
+        return self._serial_ranges[3]
+
+    def _apply_view(self, keep_position: bool = False):
+        """Show the displayed batch narrowed by the filter text and/or collapsed into ranges (no query)"""
+        rows = self._batch_rows()
+        if rows is None:
+            self.filter_count_label.config(text="")
+            return
+        query = self.filter_var.get().strip()
+        view, text = rows, ""
+        if query:
+            index = self._get_serial_index(rows)
+            view = FilteredRows(rows, index.prefix(query))
+            text = f"{len(view)} of {index.size}"
+        if self.collapse_var.get():
+            view = self._get_serial_ranges(rows, query, view)
+            text = f"{view.units} units in {len(view)} ranges" + (f" ({text})" if text else "")
+            self.table.set_columns(RANGE_COLUMNS, self._range_values)
+        else:
+            self.table.set_columns(SERIAL_COLUMNS, self._row_values)
+        if (query or self.collapse_var.get()) and isinstance(rows, PagedRows) and not rows.complete:
+            # Cover the whole batch once the remaining pages are in
+            rows.request(len(rows))
+            text += f", {rows.loaded} of {len(rows)} rows loaded"
+        if keep_position:
+            self.table.rows = view
+            self.table.render()
+        elif self.table.rows is not view:
+            self.table.set_rows(view)
+        self.filter_count_label.config(text=text)
+
+    @staticmethod
+    def _range_values(item):
+        """Table values of a collapsed (SerialRange, batch_code, po_num) row"""
+        serial_range, batch_code, po_num = item
+        return (serial_range.label(), serial_range.count, batch_code, po_num)
+
+    def _locate_serial(self, event=None):
+        """Enter in the filter box: show the whole batch scrolled to an exact serial"""
+        rows = self._batch_rows()
+        query = self.filter_var.get().strip()
+        if rows is None or not query:
+            return "break"
+        position = self._get_serial_index(rows).find(query)
+        if position is None:
+            self.status_label.config(text=f"Serial '{query}' is not in this batch")
+            return "break"
+        self.filter_var.set("")
+        if self.collapse_var.get():
+            position = self._get_serial_ranges(rows, "", rows).range_index(position)
+        self.table.selected_index = position
+        self.table.see(position)
+        return "break"
\ No newline at end of file
@@ -0,0 +1,254 @@
+"""
+Scan timing instrumentation for the Batch Code Scanner
+
+Each scan carries a ScanTimings record. Code on the hot path wraps its
+work in INSTRUMENTATION.phase("name"), which adds the elapsed time to
+the current scan (thread-local, or passed explicitly when a scan moves
+between threads) and to a process-wide latency histogram. Work outside
+a scan (prefetching, bulk exports, live refresh probes) is not timed, so
+the histograms only describe scan latency. Finished scans can be
+appended as JSON lines to a rotating log file.
+
+When disabled, or outside a scan, phase() returns a shared no-op
+context manager, so the cost on the hot path is a single attribute check.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Any
+
+from config import TIMING_ENABLED, TIMING_LOG_ENABLED, TIMING_LOG_PATH
+from config import TIMING_LOG_MAX_BYTES, TIMING_LOG_BACKUPS
+
+
+# Phase name -> status bar group
+PHASE_GROUPS = {
+    "connect": "db",
+    "cache": "db",
+    "replica": "db",
+    "query": "db",
+    "fetch": "db",
+    "count": "db",
+    "render": "ui",
+    "export": "csv",
+}
+
+
+class LatencyHistogram:
+    """Fixed log-scale latency histogram (milliseconds)"""
+
+    BOUNDS_MS = [0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float):
+        self.counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the given percentile (capped at max)"""
+        if not self.count:
+            return 0.0
+        target = pct / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(self.BOUNDS_MS[i], self.max_ms) if i < len(self.BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+class ScanTimings:
+    """Per-phase timings of one scan"""
+
+    __slots__ = ("label", "phases", "started")
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.phases: Dict[str, float] = {}
+        self.started = time.time()
+
+    def add(self, phase: str, ms: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + ms
+
+    def groups(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for phase, ms in self.phases.items():
+            group = PHASE_GROUPS.get(phase, phase)
+            totals[group] = totals.get(group, 0.0) + ms
+        return totals
+
+    def summary(self) -> str:
+        """Compact form for the status bar, e.g. "db 42ms / ui 310ms / csv 18ms" """
+        return " / ".join(f"{group} {ms:.0f}ms" for group, ms in self.groups().items())
+
+
+class _NullContext:
+    """Shared no-op context manager for phases that are not timed"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullContext()
+
+
+class _Phase:
+    __slots__ = ("owner", "name", "scan", "start")
+
+    def __init__(self, owner: "Instrumentation", name: str, scan: ScanTimings):
+        self.owner = owner
+        self.name = name
+        self.scan = scan
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ms = (time.perf_counter() - self.start) * 1000.0
+        self.owner.record(self.name, ms, self.scan)
+        return False
+
+
+class _ScanScope:
+    __slots__ = ("owner", "timings", "previous")
+
+    def __init__(self, owner: "Instrumentation", timings: ScanTimings):
+        self.owner = owner
+        self.timings = timings
+
+    def __enter__(self) -> ScanTimings:
+        self.previous = getattr(self.owner._local, "scan", None)
+        self.owner._local.scan = self.timings
+        return self.timings
+
+    def __exit__(self, *exc):
+        self.owner._local.scan = self.previous
+        return False
+
+
+class Instrumentation:
+    """Collects phase timings into histograms and an optional rotating log"""
+
+    def __init__(self, enabled: bool = True, log_path: Optional[str] = None,
+                 max_bytes: int = 1_000_000, backups: int = 3):
+        self.enabled = enabled
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._logger = None
+        if enabled and log_path:
+            self._logger = self._make_logger(log_path, max_bytes, backups)
+
+    @staticmethod
+    def _make_logger(path: str, max_bytes: int, backups: int):
+        # Imported here so start-up does not pay for logging unless it is used
+        import logging
+        import logging.handlers
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        logger = logging.getLogger("batch_code_scanner.timings")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        if not logger.handlers:
+            handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+        return logger
+
+    def scan(self, label: str = ""):
+        """
+        Context manager starting a scan on the current thread
+
+        Yields the ScanTimings (None while disabled); phases entered on
+        this thread inside the block are attributed to it.
+        """
+        if not self.enabled:
+            return _NULL
+        return _ScanScope(self, ScanTimings(label))
+
+    def phase(self, name: str, scan: Optional[ScanTimings] = None):
+        """
+        Context manager timing one phase
+
+        Args:
+            name: Phase name (connect, query, fetch, count, render, export, ...)
+            scan: Scan to attribute the time to (default: the scan started
+                on this thread; without one the phase is not timed)
+        """
+        if not self.enabled:
+            return _NULL
+        if scan is None:
+            scan = getattr(self._local, "scan", None)
+            if scan is None:
+                return _NULL
+        return _Phase(self, name, scan)
+
+    def record(self, name: str, ms: float, scan: Optional[ScanTimings] = None):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.add(ms)
+        if scan is not None:
+            scan.add(name, ms)
+
+    def finish(self, scan: Optional[ScanTimings], **fields: Any):
+        """Record a completed scan's total and append it to the log"""
+        if not self.enabled or scan is None:
+            return
+        total = sum(scan.phases.values())
+        self.record("total", total)
+        if self._logger is not None:
+            entry = {
+                "ts": round(scan.started, 3),
+                "scan": scan.label,
+                "total_ms": round(total, 2),
+                "phases_ms": {k: round(v, 2) for k, v in scan.phases.items()},
+            }
+            entry.update(fields)
+            self._logger.info(json.dumps(entry))
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Histogram summaries per phase"""
+        with self._lock:
+            return {name: h.summary() for name, h in self.histograms.items()}
+
+    def log_report(self):
+        """Append the histogram summaries to the log (e.g. on exit)"""
+        if self._logger is not None and self.histograms:
+            self._logger.info(json.dumps({"ts": round(time.time(), 3), "histograms": self.report()}))
+
+
+INSTRUMENTATION = Instrumentation(
+    enabled=TIMING_ENABLED,
+    log_path=TIMING_LOG_PATH if TIMING_LOG_ENABLED else None,
+    max_bytes=TIMING_LOG_MAX_BYTES,
+    backups=TIMING_LOG_BACKUPS
+)
@@ -0,0 +1,197 @@
+"""
+Live refresh of the displayed batch for the Batch Code Scanner
+
+While a batch is still being assembled its serial list on screen goes
+stale. LiveRefresher probes the displayed batch every few seconds on a
+background thread with the same cheap (row count, max serial, serial
+checksum) signature the batch cache uses, so a removal plus an insertion
+that keep the count and the max serial are caught as well. Only when it
+changed are rows fetched:
+
+- rows were only added at the end (the usual case on the line): just the
+  rows after the last loaded serial, with a keyset query
+- anything else (rows removed or inserted in between): the batch is
+  fetched again and compared with what is displayed
+
+Large batches shown as PagedRows are watched while they are still paging
+in; their first update completes them into a BatchRows.
+
+Each change is reported as the updated rows plus the positions of the
+removed and inserted rows, which VirtualTable.apply_diff applies without
+losing the scroll position or selection.
+"""
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+from batch_cache import BatchCache
+from paged_rows import PagedRows
+
+
+class LiveRefresher:
+    """Polls the displayed batch for changes on a background thread"""
+
+    def __init__(self, db_manager, interval: float = 5.0):
+        """
+        Args:
+            db_manager: DatabaseManager (or RemoteDatabaseManager) to probe
+            interval: Seconds between change probes
+        """
+        self.db_manager = db_manager
+        self.interval = interval
+
+        self._lock = threading.Lock()
+        self._watched: Optional[tuple] = None
+        self._wake = threading.Event()
+        self._closed = False
+        # (rows, row count, signature) of the last rows checksummed
+        self._signed: Optional[tuple] = None
+        # (paged rows, first probe) of a batch that is not fully loaded
+        self._baseline: Optional[tuple] = None
+        self._results: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="live-refresh", daemon=True)
+        self._thread.start()
+
+        self.probes = 0
+        self.refreshes = 0
+        self.rows_fetched = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def watching(self) -> Optional[str]:
+        """Batch code being watched (None if none)"""
+        watched = self._watched
+        return watched[0] if watched is not None else None
+
+    def watch(self, batch_code: str, rows: Sequence[Any]):
+        """Watch a batch as currently displayed (BatchRows or PagedRows)"""
+        with self._lock:
+            self._watched = (batch_code, rows)
+
+    def stop_watching(self):
+        with self._lock:
+            self._watched = None
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """
+        Collect changes found since the last call without blocking
+
+        Each update has batch_code, base (the rows it was computed
+        against), rows (BatchRows after the change), removed and inserted
+        (ascending row indexes in base and rows) and fetched (rows read).
+        """
+        updates = []
+        while True:
+            try:
+                updates.append(self._results.get_nowait())
+            except queue.Empty:
+                return updates
+
+    def close(self):
+        """Stop the background thread"""
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=self.interval + 1)
+
+    def check(self, batch_code: str, rows: Sequence[Any]) -> Optional[Dict[str, Any]]:
+        """
+        Probe a batch once and work out what changed
+
+        A PagedRows that is not fully loaded is compared with the probe it
+        got on its first check, since its unloaded rows are unknown; those
+        rows are read fresh when the table pages them in anyway. Once it
+        changed, everything after the last loaded serial is fetched and
+        the update carries the whole batch.
+
+        Returns:
+            Update dictionary (see poll), or None if the batch is unchanged
+        """
+        self.probes += 1
+        probe = self.db_manager.get_batch_signature(batch_code)
+        if isinstance(rows, PagedRows) and not rows.complete:
+            current, shown = rows.snapshot()
+            baseline = self._baseline
+            if baseline is None or baseline[0] is not rows:
+                # First probe: the batch is as opened if the row count matches
+                self._baseline = (rows, probe)
+                if probe[0] == shown:
+                    return None
+            elif probe == baseline[1]:
+                return None
+        else:
+            current = rows.load_all() if isinstance(rows, PagedRows) else rows
+            shown = len(current)
+            if probe == self._signature(current):
+                return None
+        count, max_serial = probe[0], probe[1]
+
+        updated = None
+        fetched = 0
+        if count > len(current) and current.last_serial is not None:
+            added = self.db_manager.get_serials_page(batch_code, current.last_serial, None)
+            fetched = len(added)
+            if len(current) + len(added) == count and added.last_serial == max_serial:
+                updated = current.copy()
+                updated.extend(added)
+                if self._signature(updated) == probe:
+                    # Rows not loaded yet are interchangeable, so the change
+                    # is the difference in length at the end
+                    removed: List[int] = list(range(count, shown))
+                    inserted = list(range(shown, count))
+                else:
+                    # Rows also changed before the last loaded serial
+                    updated = None
+        if updated is None:
+            # Not a pure append: compare with the whole batch
+            updated = self.db_manager.get_serials_page(batch_code, None, None)
+            fetched += len(updated)
+            old_serials = set(current.serials)
+            new_serials = set(updated.serials)
+            removed = [i for i, serial in enumerate(current.serials) if serial not in new_serials]
+            # Placeholders of rows that were not loaded are replaced as well
+            removed.extend(range(len(current), shown))
+            inserted = [i for i, serial in enumerate(updated.serials) if serial not in old_serials]
+
+        self.refreshes += 1
+        self.rows_fetched += fetched
+        if getattr(self.db_manager, "cache", None) is not None and len(updated):
+            self.db_manager.cache.put(batch_code, updated)
+        return {
+            "batch_code": batch_code,
+            "base": rows,
+            "rows": updated,
+            "removed": removed,
+            "inserted": inserted,
+            "fetched": fetched
+        }
+
+    def _signature(self, rows) -> tuple:
+        """BatchCache.signature of rows, reused while they are unchanged"""
+        signed = self._signed
+        if signed is None or signed[0] is not rows or signed[1] != len(rows):
+            signed = (rows, len(rows), BatchCache.signature(rows))
+            self._signed = signed
+        return signed[2]
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            if self._closed:
+                return
+            watched = self._watched
+            if watched is None:
+                continue
+            try:
+                update = self.check(*watched)
+                self.last_error = None
+            except Exception as err:
+                self.last_error = str(err)
+                continue
+            if update is None:
+                continue
+            with self._lock:
+                # The next probe compares against the updated rows, unless
+                # another batch was opened in the meantime
+                if self._watched is watched:
+                    self._watched = (watched[0], update["rows"])
+            self._results.put(update)
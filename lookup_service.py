@@ -0,0 +1,438 @@
+"""
+Shared lookup service for the Batch Code Scanner
+
+Several scanner stations can share one DatabaseManager - one connection
+pool, one batch cache and one prefetcher - instead of each opening its
+own MySQL connections. LookupService serves the lookups the GUI needs as
+HTTP/JSON; RemoteDatabaseManager is a drop-in replacement for
+DatabaseManager that calls the service (set config.LOOKUP_SERVICE_URL).
+
+Run the service:
+    python lookup_service.py --host 0.0.0.0 --port 8765
+
+Endpoints (GET unless noted, parameters in the query string):
+    /batch      value, by          whole batch of a serial or batch code
+    /open       value, by, limit   first page of a large batch plus its row count
+    /page       batch_code, after, limit   keyset page of a batch
+    /count      batch_code
+    /signature  batch_code         (row count, max serial, checksum) change probe
+    /po         po_num             per-batch summary of a PO
+    /info       serial             batch_code and po_num of a serial
+    /suggest    value, by, limit   serials or batch codes starting with value
+    /resolve    POST {"serials": [...]}  bulk resolve
+    /stats      request counters, request rate, cache hit ratio, pool counters
+
+Batches are sent as BatchRows.to_columns() (header once, serial list).
+Errors come back as {"error": message} with status 503 when the
+database is unreachable and 400 for bad requests.
+"""
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Any
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from batch_rows import BatchRows, Row
+from config import BATCH_PAGE_SIZE, BULK_CHUNK_SIZE, STREAM_CHUNK_SIZE, SUGGEST_LIMIT
+from config import LOOKUP_SERVICE_HOST, LOOKUP_SERVICE_PORT, LOOKUP_SERVICE_TIMEOUT
+from paged_rows import PagedRows
+
+# Window for the requests-per-second figure in /stats
+RATE_WINDOW = 60.0
+
+# Errors of a kept-alive connection the service already closed (retried once)
+KEEPALIVE_CLOSED = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class LookupService:
+    """HTTP/JSON front end sharing one DatabaseManager between stations"""
+
+    def __init__(self, db_manager, host: str = LOOKUP_SERVICE_HOST, port: int = LOOKUP_SERVICE_PORT):
+        """
+        Args:
+            db_manager: DatabaseManager doing the actual lookups (its cache
+                and prefetcher are shared by every client)
+            host: Interface to listen on ("0.0.0.0" for the LAN)
+            port: TCP port (0 picks a free one, see address)
+        """
+        self.db_manager = db_manager
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._recent: deque = deque()
+        self.requests = 0
+        self.errors = 0
+        self.by_endpoint: Dict[str, int] = {}
+        self._routes: Dict[str, Callable[[Dict[str, str], Any], Any]] = {
+            "/batch": self._batch,
+            "/open": self._open,
+            "/page": self._page,
+            "/count": lambda q, body: self.db_manager.count_serials_in_batch(q["batch_code"]),
+            "/signature": lambda q, body: list(self.db_manager.get_batch_signature(q["batch_code"])),
+            "/po": lambda q, body: self.db_manager.get_po_summary(q["po_num"]),
+            "/info": lambda q, body: self.db_manager.get_batch_info(q["serial"]),
+            "/suggest": lambda q, body: self.db_manager.search_prefix(
+                q["value"], q.get("by", "serial"), int(q.get("limit", SUGGEST_LIMIT))
+            ),
+            "/resolve": self._resolve,
+            "/stats": lambda q, body: self.stats(),
+        }
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+        self.closed = False
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """(host, port) the service is listening on"""
+        return self._server.server_address[:2]
+
+    @property
+    def url(self) -> str:
+        host, port = self.address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve requests on a background thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="lookup-service", daemon=True)
+            self._thread.start()
+
+    def serve_forever(self):
+        """Serve requests on the calling thread until shutdown()"""
+        self._server.serve_forever()
+
+    def shutdown(self):
+        """Stop serving and close the listening socket (the DatabaseManager is left open)"""
+        # Kept-alive connections are answered with 503 and closed from now on
+        self.closed = True
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Request counters, recent request rate, cache hit ratio and pool counters"""
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            window = min(RATE_WINDOW, max(now - self._started, 1e-9))
+            stats: Dict[str, Any] = {
+                "uptime": round(now - self._started, 1),
+                "requests": self.requests,
+                "errors": self.errors,
+                "requests_per_sec": round(len(self._recent) / window, 2),
+                "by_endpoint": dict(self.by_endpoint),
+            }
+        cache = self.db_manager.cache_stats()
+        lookups = cache.get("hits", 0) + cache.get("misses", 0)
+        stats["cache"] = cache
+        stats["cache_hit_ratio"] = round(cache["hits"] / lookups, 3) if lookups else None
+        stats["pool"] = self.db_manager.pool_stats()
+        return stats
+
+    def handle(self, method: str, target: str, body: Optional[bytes]) -> Tuple[int, Any]:
+        """Dispatch one request and return (HTTP status, JSON-able payload)"""
+        parts = urlsplit(target)
+        if self.closed:
+            return 503, {"error": "Lookup service is shutting down"}
+        route = self._routes.get(parts.path)
+        if route is None or (method == "POST") != (parts.path == "/resolve"):
+            return self._count("other", 404, {"error": f"No such endpoint: {method} {parts.path}"})
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        try:
+            payload = json.loads(body) if body else None
+            return self._count(parts.path, 200, route(query, payload))
+        except ConnectionError as err:
+            return self._count(parts.path, 503, {"error": str(err)})
+        except (KeyError, ValueError, TypeError) as err:
+            return self._count(parts.path, 400, {"error": f"Bad request: {err}"})
+        except Exception as err:
+            return self._count(parts.path, 500, {"error": str(err)})
+
+    def _count(self, path: str, status: int, payload: Any) -> Tuple[int, Any]:
+        now = time.monotonic()
+        with self._lock:
+            self.requests += 1
+            if status != 200:
+                self.errors += 1
+            self.by_endpoint[path] = self.by_endpoint.get(path, 0) + 1
+            self._recent.append(now)
+            self._trim(now)
+        return status, payload
+
+    def _trim(self, now: float):
+        while self._recent and now - self._recent[0] > RATE_WINDOW:
+            self._recent.popleft()
+
+    def _batch(self, query: Dict[str, str], body: Any) -> Optional[Dict[str, Any]]:
+        batch = self.db_manager.get_batch_with_serials(query["value"], query.get("by", "serial"))
+        return self._batch_payload(batch, None)
+
+    def _open(self, query: Dict[str, str], body: Any) -> Optional[Dict[str, Any]]:
+        limit = int(query.get("limit", BATCH_PAGE_SIZE))
+        batch = self.db_manager.open_batch(query["value"], query.get("by", "serial"), limit)
+        if batch is None or not isinstance(batch["serials"], PagedRows):
+            return self._batch_payload(batch, None)
+        # Only the first page was fetched; the client pages the rest with /page
+        paged = batch["serials"]
+        first_page = BatchRows.from_tuples(paged[0:paged.loaded])
+        return self._batch_payload(dict(batch, serials=first_page), len(paged))
+
+    def _batch_payload(self, batch: Optional[Dict[str, Any]], total: Optional[int]) -> Optional[Dict[str, Any]]:
+        if batch is None:
+            return None
+        # Stations usually scan the next batch of the PO: warm the shared cache
+        self.db_manager.prefetch_siblings(batch["batch_code"], batch["po_num"])
+        rows = batch["serials"]
+        return {
+            "batch_code": batch["batch_code"],
+            "po_num": batch["po_num"],
+            "rows": rows.to_columns(),
+            "total": len(rows) if total is None else total
+        }
+
+    def _page(self, query: Dict[str, str], body: Any) -> Dict[str, Any]:
+        limit = query.get("limit")
+        rows = self.db_manager.get_serials_page(
+            query["batch_code"], query.get("after"), int(limit) if limit else None
+        )
+        return rows.to_columns()
+
+    def _resolve(self, query: Dict[str, str], body: Any) -> Dict[str, Any]:
+        rows, not_found = self.db_manager.bulk_resolve(body["serials"])
+        return {"rows": rows, "not_found": not_found}
+
+    def _handler_class(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive: a station reuses one connection per thread
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without this every
+            # response waits for the client's delayed ACK
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                self._reply(*service.handle("GET", self.path, None))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self._reply(*service.handle("POST", self.path, self.rfile.read(length)))
+
+            def _reply(self, status: int, payload: Any):
+                if service.closed:
+                    self.close_connection = True
+                data = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class RemoteDatabaseManager:
+    """DatabaseManager look-alike that forwards lookups to a LookupService"""
+
+    def __init__(self, url: str, timeout: float = LOOKUP_SERVICE_TIMEOUT):
+        """
+        Args:
+            url: Service address, e.g. "http://192.168.1.50:8765"
+            timeout: Seconds to wait for a response
+        """
+        parts = urlsplit(url if "//" in url else "http://" + url)
+        self.url = url
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or LOOKUP_SERVICE_PORT
+        self.timeout = timeout
+        self._local = threading.local()
+        # The service owns the cache, replica and prefetcher
+        self.cache = None
+        self.replica = None
+        self.prefetcher = None
+
+    def start_replica_sync(self):
+        """No-op: the service keeps its own replica in sync"""
+
+    def prewarm(self):
+        """
+        No-op: connections to the service are per thread, so one opened
+        here would not serve any scan worker (each opens its own on its
+        first request)
+        """
+
+    def prefetch_siblings(self, batch_code: str, po_num: str):
+        """No-op: the service prefetches the PO's batches when it serves a batch"""
+
+    def replica_lag(self) -> Optional[float]:
+        return None
+
+    def get_batch_info(self, serial_num: str) -> Optional[Dict[str, Any]]:
+        """Get batch_code and po_num for a given serial number (None if not found)"""
+        return self._request("GET", "/info", {"serial": serial_num})
+
+    def get_all_serials_in_batch(self, batch_code: str) -> BatchRows:
+        """Get all rows of a batch (empty if not found)"""
+        batch = self._request("GET", "/batch", {"value": batch_code, "by": "batch"})
+        return BatchRows.from_columns(batch["rows"]) if batch else BatchRows("", "")
+
+    def iter_serials_in_batch(self, batch_code: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterable[Row]:
+        """Rows of a batch (fetched in one response; chunk_size is ignored)"""
+        return iter(self.get_all_serials_in_batch(batch_code))
+
+    def get_serials_page(self, batch_code: str, after_serial: Optional[str] = None,
+                         limit: Optional[int] = BATCH_PAGE_SIZE) -> BatchRows:
+        """Fetch one keyset page of a batch (see DatabaseManager.get_serials_page)"""
+        params: Dict[str, Any] = {"batch_code": batch_code}
+        if after_serial is not None:
+            params["after"] = after_serial
+        if limit is not None:
+            params["limit"] = limit
+        return BatchRows.from_columns(self._request("GET", "/page", params))
+
+    def count_serials_in_batch(self, batch_code: str) -> int:
+        return self._request("GET", "/count", {"batch_code": batch_code})
+
+    def get_batch_signature(self, batch_code: str) -> Tuple[int, Optional[str], int]:
+        count, max_serial, checksum = self._request("GET", "/signature", {"batch_code": batch_code})
+        return (count, max_serial, checksum)
+
+    def get_batch_with_serials(self, value: str, by: str = "serial") -> Optional[Dict[str, Any]]:
+        """Resolve a serial number or batch code and fetch the whole batch"""
+        batch = self._request("GET", "/batch", {"value": value, "by": by})
+        if batch is None:
+            return None
+        return {"batch_code": batch["batch_code"], "po_num": batch["po_num"],
+                "serials": BatchRows.from_columns(batch["rows"])}
+
+    def open_batch(self, value: str, by: str = "serial",
+                   page_size: int = BATCH_PAGE_SIZE) -> Optional[Dict[str, Any]]:
+        """
+        Like get_batch_with_serials, but a large batch comes back as PagedRows
+        whose further pages are fetched from the service on demand
+        """
+        batch = self._request("GET", "/open", {"value": value, "by": by, "limit": page_size})
+        if batch is None:
+            return None
+        rows = BatchRows.from_columns(batch["rows"])
+        result = {"batch_code": batch["batch_code"], "po_num": batch["po_num"], "serials": rows}
+        if batch["total"] > len(rows):
+            batch_code = batch["batch_code"]
+            result["serials"] = PagedRows(
+                lambda after, limit: self.get_serials_page(batch_code, after, limit),
+                total=batch["total"],
+                first_page=rows,
+                page_size=page_size,
+                placeholder=("Loading...", batch_code, "")
+            )
+        return result
+
+    def get_po_summary(self, po_num: str) -> List[Dict[str, Any]]:
+        return self._request("GET", "/po", {"po_num": po_num})
+
+    def search_prefix(self, prefix: str, by: str = "serial", limit: int = SUGGEST_LIMIT) -> List[str]:
+        """Serial numbers or batch codes starting with a prefix (see DatabaseManager.search_prefix)"""
+        return self._request("GET", "/suggest", {"value": prefix, "by": by, "limit": limit})
+
+    def bulk_resolve(self, serials: Iterable[str], chunk_size: int = BULK_CHUNK_SIZE,
+                     progress: Optional[Callable[[int, int], None]] = None
+                     ) -> Tuple[List[Row], List[str]]:
+        """Resolve many serial numbers, one service request per chunk (see DatabaseManager.bulk_resolve)"""
+        unique = list(dict.fromkeys(s for s in serials if s))
+        rows: List[Row] = []
+        not_found: List[str] = []
+        for start in range(0, len(unique), chunk_size):
+            chunk = unique[start:start + chunk_size]
+            result = self._request("POST", "/resolve", body={"serials": chunk})
+            rows.extend(tuple(row) for row in result["rows"])
+            not_found.extend(result["not_found"])
+            if progress is not None:
+                progress(min(start + chunk_size, len(unique)), len(unique))
+        return rows, not_found
+
+    def service_stats(self) -> Dict[str, Any]:
+        """The service's /stats (request rate, cache hit ratio, pool counters)"""
+        return self._request("GET", "/stats")
+
+    def pool_stats(self) -> Dict[str, int]:
+        return self.service_stats()["pool"]
+
+    def cache_stats(self) -> Dict[str, int]:
+        return self.service_stats()["cache"]
+
+    def close(self):
+        """Close this thread's connection (other threads' close when they exit)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                 body: Optional[Dict[str, Any]] = None) -> Any:
+        target = path + ("?" + urlencode(params) if params else "")
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        for attempt in (1, 2):
+            conn = getattr(self._local, "conn", None)
+            reused = conn is not None
+            if conn is None:
+                conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                conn.request(method, target, body=data, headers=headers)
+                response = conn.getresponse()
+                status, payload = response.status, response.read()
+                break
+            except (OSError, http.client.HTTPException) as err:
+                conn.close()
+                self._local.conn = None
+                # A kept-alive connection may have been closed by the
+                # service; retry that once on a fresh one, but not a
+                # timeout or refused connection, which would only wait again
+                if attempt == 2 or not (reused and isinstance(err, KEEPALIVE_CLOSED)):
+                    raise ConnectionError(f"Lookup service {self.url} unreachable: {err}") from None
+        result = json.loads(payload) if payload else None
+        if status == 200:
+            return result
+        message = result.get("error") if isinstance(result, dict) else f"HTTP {status}"
+        if status == 503:
+            raise ConnectionError(message)
+        if status in (400, 404):
+            raise ValueError(message)
+        raise RuntimeError(message)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Shared batch lookup service for several scanner stations")
+    parser.add_argument("--host", default=LOOKUP_SERVICE_HOST,
+                        help=f"interface to listen on (default {LOOKUP_SERVICE_HOST}, 0.0.0.0 for the LAN)")
+    parser.add_argument("--port", type=int, default=LOOKUP_SERVICE_PORT,
+                        help=f"TCP port (default {LOOKUP_SERVICE_PORT})")
+    args = parser.parse_args(argv)
+
+    from database import DatabaseManager
+    db_manager = DatabaseManager()
+    db_manager.start_replica_sync()
+    service = LookupService(db_manager, args.host, args.port)
+    print(f"Lookup service listening on {service.url}", file=sys.stderr)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.shutdown()
+        db_manager.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,26 @@
 """
 Batch Code Scanner Application
 Main entry point for the application
+
+Starts the GUI. "main.py cli ..." runs the headless command-line mode
+instead (see cli.py, e.g. "main.py cli --help"); other arguments, such as
+a file dropped on the windowed executable, are ignored.
 """
-import tkinter as tk
-from gui import BatchCodeScannerGUI
+import sys
+
+from startup import STARTUP
 
 
 def main():
     """Initialize and run the application"""
+    if len(sys.argv) > 1 and sys.argv[1] == "cli":
+        from cli import main as cli_main
+        sys.exit(cli_main(sys.argv[2:]))
+
+    import tkinter as tk
+    from gui import BatchCodeScannerGUI
+    STARTUP.mark("imports")
+
     root = tk.Tk()
     app = BatchCodeScannerGUI(root)
     root.mainloop()
@@ -0,0 +1,133 @@
+"""
+Lazily loaded batch rows for the Batch Code Scanner
+
+PagedRows looks like a list of a batch's rows to VirtualTable, but starts
+with only the first page. Rows further down are fetched with keyset
+pagination (serial_num > last loaded serial) on a background thread when
+the table asks for them; until they arrive a placeholder row is shown.
+The GUI re-renders when take_update() reports that new rows arrived.
+"""
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from batch_rows import BatchRows, Row
+
+# fetch_page(after_serial, limit) -> rows ordered by serial_num (limit None = all remaining)
+FetchPage = Callable[[Optional[str], Optional[int]], BatchRows]
+
+
+class PagedRows:
+    """Sequence over a batch that loads keyset pages on demand"""
+
+    def __init__(self, fetch_page: FetchPage, total: int, first_page: BatchRows,
+                 page_size: int, placeholder: Row,
+                 on_complete: Optional[Callable[[BatchRows], None]] = None,
+                 retry_after: float = 5.0):
+        """
+        Args:
+            fetch_page: Loads the rows after a serial number
+            total: Row count of the batch (from a count query)
+            first_page: Rows already fetched, ordered by serial_num (extended in place)
+            page_size: Minimum rows fetched per page
+            placeholder: Row shown for rows that are not loaded yet
+            on_complete: Called with the whole batch once everything is loaded
+            retry_after: Seconds to wait before retrying after a failed fetch
+        """
+        self.fetch_page = fetch_page
+        self.total = total
+        self.page_size = page_size
+        self.placeholder = placeholder
+        self.on_complete = on_complete
+        self.retry_after = retry_after
+
+        self._rows = first_page
+        self._complete = len(self._rows) >= total
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._loading = False
+        self._updated = False
+        self._failed_at = float("-inf")
+        self.error: Optional[Exception] = None
+
+    @property
+    def loaded(self) -> int:
+        """Number of rows fetched so far"""
+        return len(self._rows)
+
+    @property
+    def complete(self) -> bool:
+        return self._complete
+
+    def __len__(self) -> int:
+        return len(self._rows) if self._complete else max(self.total, len(self._rows))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            self.request(stop)
+            with self._lock:
+                rows = self._rows[start:stop:step]
+            missing = len(range(start, stop, step)) - len(rows)
+            return rows + [self.placeholder] * max(0, missing)
+        index = key if key >= 0 else len(self) + key
+        if not 0 <= index < len(self):
+            raise IndexError("row index out of range")
+        self.request(index + 1)
+        with self._lock:
+            return self._rows[index] if index < len(self._rows) else self.placeholder
+
+    def request(self, stop: int):
+        """Start loading in the background until at least stop rows are available"""
+        with self._lock:
+            if (self._complete or self._loading or stop <= len(self._rows)
+                    or time.monotonic() - self._failed_at < self.retry_after):
+                return
+            self._loading = True
+        threading.Thread(target=self._load, args=(stop,), name="page-loader", daemon=True).start()
+
+    def take_update(self) -> bool:
+        """True once after new rows arrived (poll from the Tk thread)"""
+        with self._lock:
+            updated, self._updated = self._updated, False
+            return updated
+
+    def snapshot(self) -> Tuple[BatchRows, int]:
+        """Copy of the rows loaded so far and the number of rows shown"""
+        with self._lock:
+            return self._rows.copy(), len(self)
+
+    def load_all(self) -> BatchRows:
+        """Fetch every remaining row on the calling thread and return the whole batch"""
+        self._fetch(None)
+        return self._rows
+
+    def _load(self, stop: int):
+        try:
+            # One query covers the gap to the requested row, however far
+            # the user jumped, plus a page of read-ahead
+            self._fetch(max(self.page_size, stop - len(self._rows) + self.page_size))
+            self.error = None
+        except Exception as err:
+            self.error = err
+            self._failed_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._loading = False
+                self._updated = True
+
+    def _fetch(self, limit: Optional[int]):
+        with self._fetch_lock:
+            if self._complete:
+                return
+            after = self._rows.last_serial
+            page = self.fetch_page(after, limit)
+            with self._lock:
+                self._rows.extend(page)
+                if limit is None or len(page) < limit:
+                    self._complete = True
+                    self.total = len(self._rows)
+                self._updated = True
+                complete = self._complete
+            if complete and self.on_complete is not None:
+                self.on_complete(self._rows)
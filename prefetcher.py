@@ -0,0 +1,119 @@
+"""
+Predictive prefetch of sibling batches for the Batch Code Scanner
+
+Operators usually work through a PO batch by batch. After a scan
+resolves, the prefetcher looks up the other batches of the same po_num
+and warms them into the DatabaseManager's batch cache in the background,
+so the next scan in that PO is served without a query.
+
+Each PO costs at most two queries: one GROUP BY listing the PO's batches
+with their sizes, and one fetch of the chosen batches together. Batches
+are chosen nearest-first after the scanned batch, within a batch count
+and row budget.
+"""
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Any
+
+
+class BatchPrefetcher:
+    """Warms the batch cache with other batches of the PO just scanned"""
+
+    def __init__(self, db_manager, max_batches: int = 8, max_rows: int = 50000,
+                 repeat_after: float = 30.0):
+        """
+        Args:
+            db_manager: DatabaseManager whose cache is warmed (must have a cache)
+            max_batches: Most sibling batches fetched per PO
+            max_rows: Most rows fetched per PO (memory budget)
+            repeat_after: Seconds before the same PO is prefetched again
+        """
+        self.db_manager = db_manager
+        self.max_batches = max_batches
+        self.max_rows = max_rows
+        self.repeat_after = repeat_after
+
+        self._recent: Dict[str, float] = {}
+        self._jobs: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="prefetcher", daemon=True)
+        self._thread.start()
+
+        self.queries = 0
+        self.rows_fetched = 0
+        self.last_error: Optional[str] = None
+
+    def on_scan(self, batch_code: str, po_num: str):
+        """Schedule a prefetch for the PO of a resolved scan (non-blocking)"""
+        if not po_num or self.db_manager.cache is None:
+            return
+        now = time.monotonic()
+        # Forget POs whose repeat window has passed, so the dict only
+        # holds recent POs however long the station runs
+        for expired in [po for po, at in self._recent.items() if now - at >= self.repeat_after]:
+            del self._recent[expired]
+        if po_num in self._recent:
+            return
+        self._recent[po_num] = now
+        self._jobs.put((batch_code, po_num))
+
+    def choose(self, batch_code: str, sizes: List[Dict[str, Any]]) -> List[str]:
+        """Pick sibling batches to warm: next ones first, then previous ones"""
+        codes = [row["batch_code"] for row in sizes]
+        count = {row["batch_code"]: int(row["row_count"]) for row in sizes}
+        after = [c for c in codes if c > batch_code]
+        before = [c for c in reversed(codes) if c < batch_code]
+        ordered = after + before
+
+        chosen, rows = [], 0
+        for code in ordered:
+            if len(chosen) >= self.max_batches:
+                break
+            if self.db_manager.cache.contains(code):
+                continue
+            if rows + count[code] > self.max_rows:
+                continue
+            chosen.append(code)
+            rows += count[code]
+        return chosen
+
+    def stats(self) -> Dict[str, Any]:
+        """Prefetch counters, including the hit rate of warmed batches"""
+        cache = self.db_manager.cache_stats()
+        prefetched = cache.get("prefetched", 0)
+        hits = cache.get("prefetch_hits", 0)
+        return {
+            "queries": self.queries,
+            "rows_fetched": self.rows_fetched,
+            "prefetched": prefetched,
+            "prefetch_hits": hits,
+            "hit_rate": hits / prefetched if prefetched else 0.0,
+        }
+
+    def close(self):
+        self._jobs.put(None)
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            batch_code, po_num = job
+            try:
+                self._prefetch(batch_code, po_num)
+            except Exception as err:
+                # Prefetching is best effort; scans fall back to normal lookups
+                self.last_error = str(err)
+
+    def _prefetch(self, batch_code: str, po_num: str):
+        sizes = self.db_manager.get_po_summary(po_num)
+        self.queries += 1
+        chosen = self.choose(batch_code, sizes)
+        if not chosen:
+            return
+        batches = self.db_manager.get_serials_in_batches(chosen)
+        self.queries += 1
+        for code, rows in batches.items():
+            if rows:
+                self.db_manager.cache.put(code, rows, prefetched=True)
+                self.rows_fetched += len(rows)
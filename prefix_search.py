@@ -0,0 +1,166 @@
+"""
+Prefix suggestions for the Batch Code Scanner
+
+Damaged labels often leave only the beginning of a serial or batch code.
+PrefixSuggester looks up the values starting with what has been typed
+(DatabaseManager.search_prefix) on a background thread without flooding
+the database while the operator types:
+
+- only the newest request counts: a request not yet sent is replaced by
+  the next one, and results of superseded requests are dropped
+- recent prefix results are kept in a small LRU cache for ttl seconds;
+  a longer prefix is answered from a shorter cached one when that result
+  was complete (fewer values than the limit), so narrowing a prefix needs
+  no query. Expired results are queried again, so newly added units show
+  up within ttl seconds
+
+The GUI debounces keystrokes before calling request() and collects
+results with poll() from its root.after() loop.
+"""
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# search(prefix, by, limit) -> matching values in index order
+Search = Callable[[str, str, int], List[str]]
+
+
+class PrefixSuggester:
+    """Latest-request-wins prefix lookups with an LRU of recent results"""
+
+    def __init__(self, search: Search, limit: int = 10, cache_size: int = 64, ttl: float = 30.0):
+        """
+        Args:
+            search: Prefix query, e.g. DatabaseManager.search_prefix
+            limit: Maximum suggestions per prefix
+            cache_size: Prefix results kept for reuse
+            ttl: Seconds a cached prefix result is reused
+        """
+        self.search = search
+        self.limit = limit
+        self.cache_size = cache_size
+        self.ttl = ttl
+
+        # (by, casefolded prefix) -> (values, time stored)
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[List[str], float]]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._pending: Optional[Tuple[int, str, str]] = None
+        self._closed = False
+        self._results: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="prefix-search", daemon=True)
+        self._thread.start()
+
+        self.queries = 0
+        self.cache_hits = 0
+        self.dropped = 0
+
+    def request(self, by: str, prefix: str) -> int:
+        """
+        Ask for suggestions, superseding any earlier request
+
+        Returns:
+            Generation number of the request (see poll)
+        """
+        with self._cond:
+            self._generation += 1
+            generation = self._generation
+            values = self._cached(by, prefix)
+            if values is not None:
+                self.cache_hits += 1
+                self._pending = None
+                self._results.put(self._result(generation, by, prefix, values))
+            else:
+                self._pending = (generation, by, prefix)
+                self._cond.notify()
+        return generation
+
+    def cancel(self):
+        """Forget the current request (its result will not be reported)"""
+        with self._cond:
+            self._generation += 1
+            self._pending = None
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """
+        Newest result for the current request, without blocking
+
+        Returns:
+            Dictionary with generation, by, prefix and values (or error),
+            or None if nothing new arrived for the current request
+        """
+        latest = None
+        while True:
+            try:
+                result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if result["generation"] == self._generation:
+                latest = result
+        return latest
+
+    def stats(self) -> Dict[str, int]:
+        return {"queries": self.queries, "cache_hits": self.cache_hits, "dropped": self.dropped}
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=1)
+
+    def _cached(self, by: str, prefix: str) -> Optional[List[str]]:
+        key = prefix.casefold()
+        values = self._fresh((by, key))
+        if values is not None:
+            self._cache.move_to_end((by, key))
+            return values
+        # A complete result for a shorter prefix holds every match of this one
+        for length in range(len(key) - 1, 0, -1):
+            shorter = self._fresh((by, key[:length]))
+            if shorter is not None and len(shorter) < self.limit:
+                return [value for value in shorter if value.casefold().startswith(key)]
+        return None
+
+    def _fresh(self, key: Tuple[str, str]) -> Optional[List[str]]:
+        """Cached values for key, dropping them once older than the TTL"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        values, stored = entry
+        if time.monotonic() - stored > self.ttl:
+            del self._cache[key]
+            return None
+        return values
+
+    @staticmethod
+    def _result(generation: int, by: str, prefix: str, values: List[str]) -> Dict[str, Any]:
+        return {"generation": generation, "by": by, "prefix": prefix, "values": values}
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                generation, by, prefix = self._pending
+                self._pending = None
+            try:
+                self.queries += 1
+                values = self.search(prefix, by, self.limit)
+                result = self._result(generation, by, prefix, values)
+            except Exception as err:
+                values = None
+                result = {"generation": generation, "by": by, "prefix": prefix, "error": err}
+            with self._cond:
+                if values is not None:
+                    self._cache[(by, prefix.casefold())] = (values, time.monotonic())
+                    self._cache.move_to_end((by, prefix.casefold()))
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+                if generation != self._generation:
+                    self.dropped += 1
+                    continue
+            self._results.put(result)
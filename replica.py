@@ -0,0 +1,302 @@
+"""
+Local SQLite replica of faceware_assembly1 for the Batch Code Scanner
+
+The replica mirrors serial_num, batch_code and po_num into an indexed
+on-disk SQLite file. Synchronisation is chunk-checksum based with one
+chunk per batch_code: the server computes a row count and an XOR of
+per-row CRC32s per batch in a GROUP BY, and only batches whose checksum
+differs from the local copy are re-downloaded. The first sync of an
+empty replica streams the whole table instead.
+
+Checksumming the whole table is a full scan on the shared server, so
+most syncs only checksum the newest batches (batch codes from the
+recent_batches-th highest local one upwards, an index range scan);
+new batches always sort there as batch codes count up. Changes to
+older batches are picked up by a full checksum every full_interval
+seconds.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, List, Dict
+
+from batch_rows import BatchRows
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assembly (
+    serial_num TEXT COLLATE NOCASE,
+    batch_code TEXT COLLATE NOCASE,
+    po_num TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_assembly_serial ON assembly (serial_num);
+CREATE INDEX IF NOT EXISTS idx_assembly_batch ON assembly (batch_code, serial_num);
+CREATE TABLE IF NOT EXISTS batch_checksums (
+    batch_code TEXT PRIMARY KEY COLLATE NOCASE,
+    row_count INTEGER NOT NULL,
+    checksum INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+CHECKSUM_QUERY = """
+    SELECT batch_code,
+           COUNT(*) AS row_count,
+           BIT_XOR(CRC32(CONCAT_WS('|', serial_num, po_num))) AS checksum
+    FROM faceware_assembly1
+    WHERE {where}
+    GROUP BY batch_code
+"""
+
+
+class LocalReplica:
+    """Serves batch lookups from a local SQLite copy of faceware_assembly1"""
+
+    def __init__(self, path: str, pool, chunk_size: int = 5000, batch_chunk: int = 200,
+                 recent_batches: int = 50, full_interval: float = 6 * 3600.0):
+        """
+        Args:
+            path: SQLite file to create or reuse
+            pool: ConnectionPool for the MySQL source
+            chunk_size: Rows fetched and inserted per chunk while syncing
+            batch_chunk: Changed batches re-downloaded per query
+            recent_batches: Newest local batches checksummed by a regular sync
+            full_interval: Seconds between checksums of the whole table
+        """
+        self.path = path
+        self.pool = pool
+        self.chunk_size = chunk_size
+        self.batch_chunk = batch_chunk
+        self.recent_batches = recent_batches
+        self.full_interval = full_interval
+        self.last_error: Optional[str] = None
+        self._local = threading.local()
+        self._sync_lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(SCHEMA)
+        self._last_sync = self._read_state("last_sync")
+        self._last_full_sync = self._read_state("last_full_sync")
+
+    def _db(self) -> sqlite3.Connection:
+        """SQLite connection for the calling thread"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            # Used by this thread only, but closed by close() on another one
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.row_factory = sqlite3.Row
+            self._local.db = db
+            with self._connections_lock:
+                self._connections.append(db)
+        return db
+
+    def close(self):
+        """Close the SQLite connections of every thread that used the replica"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for db in connections:
+            db.close()
+
+    def _read_state(self, key: str) -> Optional[float]:
+        row = self._db().execute(
+            "SELECT value FROM sync_state WHERE key = ?", (key,)
+        ).fetchone()
+        return float(row["value"]) if row else None
+
+    @property
+    def ready(self) -> bool:
+        """True once at least one sync has completed"""
+        return self._last_sync is not None
+
+    def lag(self) -> Optional[float]:
+        """Seconds since the last successful sync, or None if never synced"""
+        if self._last_sync is None:
+            return None
+        return max(0.0, time.time() - self._last_sync)
+
+    def get_batch_rows(self, value: str, by: str) -> BatchRows:
+        """Local equivalent of DatabaseManager._fetch_batch_rows"""
+        if by == "serial":
+            where = """batch_code = (
+                           SELECT batch_code FROM assembly
+                           WHERE serial_num = ? LIMIT 1)"""
+        elif by == "batch":
+            where = "batch_code = ?"
+        else:
+            raise ValueError(f"Unknown lookup type: {by}")
+        cursor = self._db().execute(
+            f"""SELECT serial_num, batch_code, po_num
+                FROM assembly
+                WHERE {where}
+                ORDER BY serial_num""",
+            (value,)
+        )
+        return BatchRows.from_tuples(cursor.fetchall())
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Bring the replica up to date with the server
+
+        Returns:
+            Dictionary with the number of batches refreshed and removed,
+            the number of rows written and full (True if the whole table
+            was checksummed)
+        """
+        with self._sync_lock:
+            db = self._db()
+            local = {
+                row["batch_code"]: (row["row_count"], row["checksum"])
+                for row in db.execute("SELECT batch_code, row_count, checksum FROM batch_checksums")
+            }
+            full = (not local or self._last_full_sync is None
+                    or time.time() - self._last_full_sync >= self.full_interval)
+            since = None
+            if not full:
+                codes = sorted(local, key=str.casefold)
+                since = codes[-min(len(codes), self.recent_batches)]
+                local = {code: sig for code, sig in local.items() if code.casefold() >= since.casefold()}
+            started = time.time()
+            remote = self._remote_checksums(since)
+
+            if not local and full:
+                written = self._bulk_load(db)
+                changed, removed = list(remote), []
+            else:
+                changed = [code for code, sig in remote.items() if local.get(code) != sig]
+                removed = [code for code in local if code not in remote]
+                written = self._refresh_batches(db, changed, removed)
+
+            now = time.time()
+            with db:
+                if removed:
+                    db.execute(
+                        "DELETE FROM batch_checksums WHERE batch_code IN (%s)" % ",".join("?" * len(removed)),
+                        removed
+                    )
+                db.executemany(
+                    "INSERT OR REPLACE INTO batch_checksums (batch_code, row_count, checksum) VALUES (?, ?, ?)",
+                    [(code, remote[code][0], remote[code][1]) for code in changed]
+                )
+                db.execute(
+                    "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('last_sync', ?)",
+                    (repr(now),)
+                )
+                if full:
+                    db.execute(
+                        "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('last_full_sync', ?)",
+                        (repr(started),)
+                    )
+            self._last_sync = now
+            if full:
+                self._last_full_sync = started
+            self.last_error = None
+            return {"changed": len(changed), "removed": len(removed), "rows": written, "full": full}
+
+    def _remote_checksums(self, since: Optional[str] = None) -> Dict[str, tuple]:
+        """Row count and checksum per batch (only batch codes >= since if given)"""
+        with self.pool.connection() as conn:
+            with conn.cursor() as cursor:
+                if since is None:
+                    cursor.execute(CHECKSUM_QUERY.format(where="batch_code IS NOT NULL"))
+                else:
+                    cursor.execute(CHECKSUM_QUERY.format(where="batch_code >= %s"), (since,))
+                return {
+                    row["batch_code"]: (int(row["row_count"]), int(row["checksum"]))
+                    for row in cursor.fetchall()
+                }
+
+    def _bulk_load(self, db: sqlite3.Connection) -> int:
+        """Stream the whole table into an empty replica"""
+        import pymysql
+        written = 0
+        with self.pool.connection() as conn:
+            with conn.cursor(pymysql.cursors.SSCursor) as cursor:
+                cursor.execute(
+                    """SELECT serial_num, batch_code, po_num
+                       FROM faceware_assembly1
+                       WHERE batch_code IS NOT NULL"""
+                )
+                with db:
+                    db.execute("DELETE FROM assembly")
+                    while True:
+                        rows = cursor.fetchmany(self.chunk_size)
+                        if not rows:
+                            break
+                        db.executemany(
+                            "INSERT INTO assembly (serial_num, batch_code, po_num) VALUES (?, ?, ?)",
+                            rows
+                        )
+                        written += len(rows)
+        return written
+
+    def _refresh_batches(self, db: sqlite3.Connection, changed: List[str], removed: List[str]) -> int:
+        """Replace the rows of changed batches and drop removed ones"""
+        import pymysql
+        written = 0
+        for start in range(0, len(removed), self.batch_chunk):
+            codes = removed[start:start + self.batch_chunk]
+            with db:
+                db.execute(
+                    "DELETE FROM assembly WHERE batch_code IN (%s)" % ",".join("?" * len(codes)),
+                    codes
+                )
+        for start in range(0, len(changed), self.batch_chunk):
+            codes = changed[start:start + self.batch_chunk]
+            with self.pool.connection() as conn:
+                with conn.cursor(pymysql.cursors.Cursor) as cursor:
+                    cursor.execute(
+                        """SELECT serial_num, batch_code, po_num
+                           FROM faceware_assembly1
+                           WHERE batch_code IN %s""",
+                        (codes,)
+                    )
+                    rows = cursor.fetchall()
+            with db:
+                db.execute(
+                    "DELETE FROM assembly WHERE batch_code IN (%s)" % ",".join("?" * len(codes)),
+                    codes
+                )
+                db.executemany(
+                    "INSERT INTO assembly (serial_num, batch_code, po_num) VALUES (?, ?, ?)",
+                    rows
+                )
+            written += len(rows)
+        return written
+
+
+class ReplicaSyncer:
+    """Keeps a LocalReplica up to date from a background thread"""
+
+    def __init__(self, replica: LocalReplica, interval: float = 60.0):
+        self.replica = replica
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="replica-sync", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop syncing, waiting up to timeout seconds for a running sync"""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.replica.sync()
+            except Exception as err:
+                # Keep serving the last good copy; lag keeps growing
+                self.replica.last_error = str(err)
+            self._stop.wait(self.interval)
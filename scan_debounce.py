@@ -0,0 +1,85 @@
+"""
+Scan input debouncing for the Batch Code Scanner
+
+Handheld scanners double-fire and operators rescan the unit in their
+hand. ScanDebouncer remembers recently accepted scans keyed by
+(mode, value) for a short window; a repeat inside the window is
+suppressed (no query, table rebuild or export) and the GUI shows the
+result it already has instead.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+class ScanDebouncer:
+    """Time-windowed duplicate-scan filter"""
+
+    def __init__(self, window: float = 2.0):
+        """
+        Args:
+            window: Seconds during which a repeated (mode, value) is suppressed
+        """
+        self.window = window
+        self._recent: "OrderedDict[Tuple[str, str], list]" = OrderedDict()
+        self._last_accept = float("-inf")
+        self.suppressed = 0
+
+    @staticmethod
+    def key(by: str, value: str) -> Tuple[str, str]:
+        # Lookups are case-insensitive, so SN1 and sn1 are the same scan
+        return (by, value.strip().casefold())
+
+    def accept(self, by: str, value: str, now: Optional[float] = None) -> bool:
+        """
+        Decide whether a scan should be submitted
+
+        Returns:
+            True for a new scan (remembered from now on), False for a
+            repeat inside the window (counted as suppressed)
+        """
+        now = time.monotonic() if now is None else now
+        self._prune(now)
+        key = self.key(by, value)
+        entry = self._recent.get(key)
+        if entry is not None:
+            self.suppressed += 1
+            return False
+        self._recent[key] = [now, None]
+        self._last_accept = now
+        return True
+
+    def remember(self, by: str, value: str, result: Any):
+        """Attach the resolved result to a recent scan (for showing it again)"""
+        entry = self._recent.get(self.key(by, value))
+        if entry is not None:
+            entry[1] = result
+
+    def recent_result(self, by: str, value: str) -> Any:
+        """Result of a recent scan, or None while it is still being resolved"""
+        entry = self._recent.get(self.key(by, value))
+        return entry[1] if entry is not None else None
+
+    def forget(self, by: str, value: str):
+        """Drop a scan, e.g. after it failed, so retrying it is not suppressed"""
+        self._recent.pop(self.key(by, value), None)
+
+    def empty_repeat(self, now: Optional[float] = None) -> bool:
+        """
+        True for an empty submit right after an accepted scan
+
+        A double-fired Enter finds the entry already cleared; it is
+        counted as suppressed instead of asking for input.
+        """
+        now = time.monotonic() if now is None else now
+        if now - self._last_accept <= self.window:
+            self.suppressed += 1
+            return True
+        return False
+
+    def _prune(self, now: float):
+        while self._recent:
+            key, (seen, _) = next(iter(self._recent.items()))
+            if now - seen <= self.window:
+                break
+            del self._recent[key]
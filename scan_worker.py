@@ -0,0 +1,104 @@
+"""
+Background scan pipeline for the Batch Code Scanner
+
+Scans are queued from the Tk thread and resolved by worker threads; the
+GUI collects finished results with poll() from a root.after() loop, so
+no database work ever runs inside a Tk callback.
+"""
+import itertools
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Any
+
+from instrumentation import INSTRUMENTATION
+
+
+class ScanWorker:
+    """Resolves queued scans on background threads"""
+
+    def __init__(self, resolve: Callable[[str, str], Any], workers: int = 2):
+        """
+        Args:
+            resolve: Function called as resolve(value, by) on a worker thread
+            workers: Number of worker threads
+        """
+        self._resolve = resolve
+        self._jobs: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._results: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(
+                target=self._run, name=f"scan-worker-{i + 1}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, value: str, by: str) -> int:
+        """
+        Queue a scan and return immediately
+
+        Returns:
+            Sequence number of the scan (increases with submission order)
+        """
+        seq = next(self._seq)
+        self._jobs.put({
+            "seq": seq,
+            "value": value,
+            "by": by,
+            "submitted": time.monotonic()
+        })
+        return seq
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """
+        Collect finished scans without blocking
+
+        Each result is the job dictionary plus "result" (return value of
+        resolve) or "error" (the exception it raised), and "timings"
+        (ScanTimings, None while instrumentation is off).
+        """
+        finished = []
+        while True:
+            try:
+                finished.append(self._results.get_nowait())
+            except queue.Empty:
+                return finished
+
+    @property
+    def queued(self) -> int:
+        """Number of scans waiting for a worker"""
+        return self._jobs.qsize()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of scans currently being resolved"""
+        with self._lock:
+            return self._in_flight
+
+    def close(self):
+        """Stop the worker threads once queued scans are drained"""
+        for _ in self._threads:
+            self._jobs.put(None)
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            with self._lock:
+                self._in_flight += 1
+            try:
+                with INSTRUMENTATION.scan(f'{job["by"]}:{job["value"]}') as timings:
+                    job["timings"] = timings
+                    job["result"] = self._resolve(job["value"], job["by"])
+            except Exception as err:
+                job["error"] = err
+            finally:
+                job["elapsed"] = time.monotonic() - job["submitted"]
+                with self._lock:
+                    self._in_flight -= 1
+                self._results.put(job)
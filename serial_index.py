@@ -0,0 +1,89 @@
+"""
+In-table serial search for the Batch Code Scanner
+
+SerialIndex is built once per loaded batch: the case-folded serials in
+sorted order (prefix search with two bisects) plus a dictionary from
+case-folded serial to row index (exact match). A prefix filter then
+costs O(log n) whatever the batch size, and FilteredRows presents the
+matching rows to VirtualTable without copying them - only the visible
+window is ever materialized.
+
+Batches arrive ordered by serial_num, so the sorted order usually is the
+row order and a match is a contiguous range of rows. Otherwise the
+matching row indexes are collected and put back into row order.
+"""
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+# Sorts after any character a serial can contain
+_PREFIX_END = "\U0010ffff"
+
+
+class SerialIndex:
+    """Sorted and hashed serial numbers of one batch"""
+
+    def __init__(self, serials: Sequence[str]):
+        """
+        Args:
+            serials: Serial numbers in row order
+        """
+        keys = [serial.casefold() for serial in serials]
+        self.size = len(keys)
+        self._exact: Dict[str, int] = {}
+        for i, key in enumerate(keys):
+            self._exact.setdefault(key, i)
+        # Row order is already sorted for batches ordered by serial_num
+        if all(keys[i] <= keys[i + 1] for i in range(len(keys) - 1)):
+            self._keys = keys
+            self._order: Optional[List[int]] = None
+        else:
+            self._order = sorted(range(len(keys)), key=keys.__getitem__)
+            self._keys = [keys[i] for i in self._order]
+
+    def find(self, serial: str) -> Optional[int]:
+        """Row index of a serial (exact, case-insensitive), or None"""
+        return self._exact.get(serial.strip().casefold())
+
+    def __contains__(self, serial: str) -> bool:
+        return self.find(serial) is not None
+
+    def prefix(self, prefix: str) -> Union[range, List[int]]:
+        """Row indexes of serials starting with prefix (case-insensitive), in row order"""
+        key = prefix.strip().casefold()
+        lo = bisect_left(self._keys, key)
+        hi = bisect_left(self._keys, key + _PREFIX_END, lo)
+        if self._order is None:
+            return range(lo, hi)
+        if hi - lo == self.size:
+            return range(self.size)
+        return sorted(self._order[lo:hi])
+
+
+class FilteredRows(Sequence):
+    """Read-only view of the rows at some indexes of a row sequence"""
+
+    def __init__(self, rows: Sequence[Any], indexes: Union[range, List[int]]):
+        self.rows = rows
+        self.indexes = indexes
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            picked = self.indexes[key]
+            if isinstance(picked, range) and picked.step == 1:
+                # Contiguous: one slice of the underlying rows
+                return list(self.rows[picked.start:picked.stop])
+            return [self.rows[i] for i in picked]
+        return self.rows[self.indexes[key]]
+
+    def __iter__(self):
+        indexes = self.indexes
+        if isinstance(indexes, range) and indexes.step == 1:
+            return iter(self.rows[indexes.start:indexes.stop])
+        return (self.rows[i] for i in indexes)
+
+    def source_index(self, index: int) -> int:
+        """Index in the underlying rows of the row at index"""
+        return self.indexes[index]
@@ -0,0 +1,43 @@
+"""
+Reading lists of serial numbers / batch codes from text and CSV input
+"""
+import csv
+import os
+from typing import Iterable, List
+
+
+def parse_values(lines: Iterable[str], csv_format: bool = False) -> List[str]:
+    """
+    Extract values from lines of text
+
+    Plain text takes one value per line; CSV takes the first column.
+    Blank lines and a leading header row (e.g. "Serial Number") are skipped.
+
+    Args:
+        lines: Lines of input (file object, sys.stdin or list)
+        csv_format: Parse the lines as CSV
+
+    Returns:
+        List of values in input order
+    """
+    if csv_format:
+        cells = (row[0] if row else "" for row in csv.reader(lines))
+    else:
+        cells = lines
+    values = []
+    for cell in cells:
+        value = cell.strip()
+        if not value:
+            continue
+        if not values and value.lower().replace("_", " ") in ("serial number", "serial num", "serial",
+                                                               "batch code", "batch"):
+            continue
+        values.append(value)
+    return values
+
+
+def read_value_file(path: str) -> List[str]:
+    """Read values from a .txt (one per line) or .csv (first column) file"""
+    csv_format = os.path.splitext(path)[1].lower() == ".csv"
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return parse_values(f, csv_format=csv_format)
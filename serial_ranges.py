@@ -0,0 +1,156 @@
+"""
+Serial-range compression for the Batch Code Scanner
+
+Units are labelled in sequence, so a batch is usually a few runs of
+consecutive serials sharing a prefix (SN00100000, SN00100001, ...). A
+SerialRange stores such a run as prefix + zero-padded start/end numbers;
+SerialRanges holds a batch as (range, batch_code, po_num) rows. That
+drives the collapsed table view ("SN00100000 - SN00103999, 4000 units"),
+the "ranges" export format and a membership check that bisects the runs
+instead of scanning every serial.
+
+A run continues while the next serial is the previous number plus one
+with the same prefix, width, batch_code and po_num; anything else starts
+a new range, so compressing and expanding is lossless for any input.
+"""
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Sequence, Tuple
+
+from batch_rows import Row
+
+# Trailing digits of a serial: the part that counts up
+_NUMBER_TAIL = re.compile(r"(\d+)$")
+
+
+class SerialRange(NamedTuple):
+    """Consecutive serials prefix + number, number from start to end"""
+    prefix: str
+    start: int
+    end: int
+    width: int  # digits of the zero-padded number (0: serial without a number)
+
+    def serial(self, number: int) -> str:
+        return self.prefix + str(number).zfill(self.width) if self.width else self.prefix
+
+    @property
+    def first(self) -> str:
+        return self.serial(self.start)
+
+    @property
+    def last(self) -> str:
+        return self.serial(self.end)
+
+    @property
+    def count(self) -> int:
+        return self.end - self.start + 1
+
+    def serials(self) -> Iterator[str]:
+        return (self.serial(number) for number in range(self.start, self.end + 1))
+
+    def label(self) -> str:
+        """Display text, e.g. "SN00100000 - SN00103999" """
+        return self.first if self.count == 1 else f"{self.first} - {self.last}"
+
+
+# (range, batch_code, po_num), the collapsed counterpart of a Row
+RangeRow = Tuple[SerialRange, str, str]
+
+
+def parse_serial(serial: str) -> Tuple[str, int, int]:
+    """Split a serial into (prefix, number, width); width 0 if it has no number"""
+    match = _NUMBER_TAIL.search(serial)
+    if match is None:
+        return serial, 0, 0
+    digits = match.group(1)
+    return serial[:match.start()], int(digits), len(digits)
+
+
+def iter_ranges(rows: Iterable[Row]) -> Iterator[RangeRow]:
+    """Compress (serial_num, batch_code, po_num) rows, in order, into range rows"""
+    prefix, first, number, width = "", 0, 0, 0
+    batch = po = None
+    started = False
+    expected = None
+    for serial, batch_code, po_num in rows:
+        if serial == expected and batch_code == batch and po_num == po:
+            number += 1
+        else:
+            if started:
+                yield (SerialRange(prefix, first, number, width), batch, po)
+            started = True
+            prefix, number, width = parse_serial(serial)
+            first, batch, po = number, batch_code, po_num
+            if not width:
+                expected = None
+                continue
+        # Serial that would continue the run (none once the number outgrows its width)
+        following = str(number + 1)
+        expected = prefix + following.zfill(width) if len(following) <= width else None
+    if started:
+        yield (SerialRange(prefix, first, number, width), batch, po)
+
+
+def expand(range_rows: Iterable[RangeRow]) -> Iterator[Row]:
+    """Turn range rows back into (serial_num, batch_code, po_num) rows"""
+    for serial_range, batch_code, po_num in range_rows:
+        for serial in serial_range.serials():
+            yield (serial, batch_code, po_num)
+
+
+class SerialRanges(Sequence):
+    """A batch (or any row list) as range rows, with fast membership"""
+
+    def __init__(self, range_rows: List[RangeRow]):
+        """
+        Args:
+            range_rows: (SerialRange, batch_code, po_num) rows in row order
+        """
+        self.rows = range_rows
+        # Row index of the first serial of every range
+        self._offsets = [0] + list(accumulate(r[0].count for r in range_rows))
+        self._runs: Dict[Tuple[str, int], List[SerialRange]] = {}
+        for serial_range, _, _ in range_rows:
+            self._runs.setdefault((serial_range.prefix.casefold(), serial_range.width), []).append(serial_range)
+        self._starts: Dict[Tuple[str, int], List[int]] = {}
+        for key, runs in self._runs.items():
+            runs.sort(key=lambda r: r.start)
+            self._starts[key] = [r.start for r in runs]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Row]) -> "SerialRanges":
+        return cls(list(iter_ranges(rows)))
+
+    @property
+    def units(self) -> int:
+        """Number of serials covered"""
+        return self._offsets[-1]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def __iter__(self) -> Iterator[RangeRow]:
+        return iter(self.rows)
+
+    def __contains__(self, serial) -> bool:
+        """True if a serial (case-insensitive) falls into one of the ranges"""
+        if not isinstance(serial, str):
+            return False
+        prefix, number, width = parse_serial(serial.strip())
+        key = (prefix.casefold(), width)
+        starts = self._starts.get(key)
+        if not starts:
+            return False
+        i = bisect_right(starts, number) - 1
+        return i >= 0 and number <= self._runs[key][i].end
+
+    def range_index(self, position: int) -> int:
+        """Index of the range holding the serial at row index position"""
+        return bisect_right(self._offsets, position) - 1
+
+    def expand(self) -> Iterator[Row]:
+        return expand(self.rows)
@@ -0,0 +1,64 @@
+"""
+Startup timing for the Batch Code Scanner
+
+STARTUP is created when this module is first imported (main.py imports
+it before anything else) and collects named marks while the application
+starts, e.g. imports done, window built, window mapped, database
+connection pre-warmed. The report shows where start-up time goes.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from config import STARTUP_LOG_PATH
+
+
+class StartupTimer:
+    """Records named marks relative to process start-up"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def mark(self, name: str):
+        """Record that a start-up step finished now"""
+        with self._lock:
+            self.marks.append((name, (time.perf_counter() - self.start) * 1000.0))
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000.0
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Per-mark time since start and since the previous mark"""
+        with self._lock:
+            marks = list(self.marks)
+        report, previous = {}, 0.0
+        for name, at in marks:
+            report[name] = {"at_ms": round(at, 1), "step_ms": round(at - previous, 1)}
+            previous = at
+        return report
+
+    def summary(self) -> str:
+        """One line, e.g. "imports 85ms / window 40ms / mapped 120ms" """
+        return " / ".join(f"{name} {step['step_ms']:.0f}ms" for name, step in self.report().items())
+
+    def write_report(self):
+        """Append the report to STARTUP_LOG_PATH (and stderr when there is a console)"""
+        entry = {"ts": round(time.time(), 3), "marks": self.report()}
+        if sys.stderr is not None:
+            print(f"startup: {self.summary()}", file=sys.stderr)
+        if not STARTUP_LOG_PATH:
+            return
+        try:
+            os.makedirs(os.path.dirname(STARTUP_LOG_PATH), exist_ok=True)
+            with open(STARTUP_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError:
+            pass
+
+
+STARTUP = StartupTimer()
@@ -0,0 +1,60 @@
+"""
+Shared fixtures for the Batch Code Scanner tests
+
+Tests run against the SQLite stand-in for faceware_assembly1 from
+benchmarks/fake_mysql.py, so no MySQL server is needed.
+"""
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [REPO_ROOT, os.path.join(REPO_ROOT, "benchmarks")]
+
+from database import DatabaseManager  # noqa: E402
+from fake_mysql import FakeMySQL, seed_database  # noqa: E402
+
+
+@pytest.fixture
+def fake_db(tmp_path):
+    """Stand-in database with 2000 rows in batches of about 500"""
+    path = str(tmp_path / "faceware.sqlite3")
+    seed_database(path, 2000, batch_size=500)
+    return FakeMySQL(path)
+
+
+@pytest.fixture
+def db_manager(fake_db):
+    manager = DatabaseManager(config={}, connector=fake_db.connect)
+    yield manager
+    manager.close()
+
+
+class Station:
+    """Another station writing to the stand-in database behind DatabaseManager's back"""
+
+    def __init__(self, fake_db):
+        self.fake_db = fake_db
+
+    def execute(self, query: str, args=None):
+        conn = self.fake_db.connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(query, args)
+        finally:
+            conn.close()
+
+    def insert(self, serial_num: str, batch_code: str, po_num: str):
+        self.execute(
+            "INSERT INTO faceware_assembly1 (serial_num, batch_code, po_num) VALUES (%s, %s, %s)",
+            (serial_num, batch_code, po_num)
+        )
+
+    def delete(self, serial_num: str):
+        self.execute("DELETE FROM faceware_assembly1 WHERE serial_num = %s", (serial_num,))
+
+
+@pytest.fixture
+def station(fake_db):
+    return Station(fake_db)
@@ -0,0 +1,60 @@
+"""Tests for the headless command-line entry point"""
+import os
+
+import pymysql
+import pytest
+
+import cli
+from database import DatabaseManager
+from fake_mysql import FakeCursor
+
+
+@pytest.fixture(autouse=True)
+def stand_in_database(fake_db, monkeypatch):
+    monkeypatch.setattr(cli, "DatabaseManager", lambda: DatabaseManager(config={}, connector=fake_db.connect))
+
+
+def test_serial_lookup_writes_csv(tmp_path):
+    output = tmp_path / "out.csv"
+    assert cli.main(["SN00100000", "SN00100001", "-o", str(output)]) == 0
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3
+    assert lines[1].startswith("SN00100000,B000001,")
+
+
+def test_missing_values_exit_with_1(tmp_path, capsys):
+    output = tmp_path / "out.csv"
+    assert cli.main(["SN00100000", "NOPE", "-o", str(output)]) == 1
+    assert "NOPE" in capsys.readouterr().err
+
+
+def test_non_utf8_file_is_a_usage_error(tmp_path, capsys):
+    values = tmp_path / "values.txt"
+    values.write_bytes(b"SN00100000\n\xff\xfe\xfa\n")
+    assert cli.main(["--file", str(values), "-o", str(tmp_path / "out.csv")]) == 2
+    assert "not a UTF-8 text file" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("option", ["--chunk-size", "--workers"])
+def test_counts_below_one_are_rejected(option, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main([option, "0", "SN00100000"])
+    assert exit_info.value.code == 2
+    assert "must be at least 1" in capsys.readouterr().err
+
+
+def test_database_error_removes_partial_output(tmp_path, monkeypatch):
+    output = tmp_path / "out.csv"
+    execute = FakeCursor.execute
+    calls = []
+
+    def failing_execute(self, query, args=None):
+        calls.append(query)
+        if len(calls) > 1:
+            raise pymysql.err.OperationalError(2013, "Lost connection to MySQL server during query")
+        return execute(self, query, args)
+
+    monkeypatch.setattr(FakeCursor, "execute", failing_execute)
+    serials = [f"SN{n:08d}" for n in range(100000, 100010)]
+    assert cli.main(serials + ["--chunk-size", "2", "--workers", "1", "-o", str(output)]) == 2
+    assert not os.path.exists(output)
@@ -0,0 +1,102 @@
+"""Tests for DatabaseManager and ConnectionPool against the stand-in database"""
+import pymysql
+import pytest
+
+from batch_cache import BatchCache
+from fake_mysql import FakeCursor
+
+
+@pytest.fixture
+def dead_connections(monkeypatch):
+    """Connections in this set fail every query as if the server dropped them"""
+    dead = set()
+    execute = FakeCursor.execute
+
+    def failing_execute(self, query, args=None):
+        if id(self.connection) in dead:
+            raise pymysql.err.OperationalError(2013, "Lost connection to MySQL server during query")
+        return execute(self, query, args)
+
+    monkeypatch.setattr(FakeCursor, "execute", failing_execute)
+    return dead
+
+
+def test_stale_idle_connection_is_retried_on_a_fresh_one(db_manager, fake_db, dead_connections):
+    batch_code = db_manager.get_batch_info_by_batch("B000001")["batch_code"]
+    idle = [conn for conn, _ in db_manager.pool._idle]
+    assert idle
+    dead_connections.update(id(conn) for conn in idle)
+    connects = fake_db.connects
+
+    result = db_manager.get_batch_with_serials("B000001", by="batch")
+
+    assert result["batch_code"] == batch_code
+    assert fake_db.connects == connects + 1
+    assert db_manager.pool.stats()["idle"] == 1
+
+
+def test_lost_fresh_connection_raises_connection_error(db_manager, fake_db, dead_connections):
+    connect = fake_db.connect
+
+    def connect_dead(**kwargs):
+        conn = connect(**kwargs)
+        dead_connections.add(id(conn))
+        return conn
+
+    db_manager.connector = connect_dead
+    with pytest.raises(ConnectionError):
+        db_manager.get_batch_info("SN00100000")
+    assert db_manager.pool.stats()["idle"] == 0
+
+
+def test_query_errors_are_not_connection_errors(db_manager, monkeypatch):
+    def broken_execute(self, query, args=None):
+        raise pymysql.err.ProgrammingError(1064, "syntax error")
+
+    monkeypatch.setattr(FakeCursor, "execute", broken_execute)
+    with pytest.raises(pymysql.err.ProgrammingError):
+        db_manager.get_batch_info("SN00100000")
+
+
+def test_batch_signature_matches_the_server(db_manager, station):
+    rows = db_manager.get_all_serials_in_batch("B000001")
+    assert db_manager.get_batch_signature("B000001") == BatchCache.signature(rows)
+
+    # One serial swapped for another: same row count and max serial
+    station.delete(rows.serials[10])
+    station.insert(rows.serials[10] + "X", "B000001", rows.po_num)
+    probe = db_manager.get_batch_signature("B000001")
+    assert probe[:2] == BatchCache.signature(rows)[:2]
+    assert probe != BatchCache.signature(rows)
+    assert probe == BatchCache.signature(db_manager.get_all_serials_in_batch("B000001"))
+
+
+def test_stale_cache_entry_is_revalidated(db_manager, station):
+    db_manager.cache.ttl = 0
+    rows = db_manager.get_batch_with_serials("B000001", by="batch")["serials"]
+    station.delete(rows.serials[3])
+    station.insert(rows.serials[3] + "X", "B000001", rows.po_num)
+
+    refreshed = db_manager.get_batch_with_serials("B000001", by="batch")["serials"]
+
+    assert rows.serials[3] not in refreshed.serials
+    assert rows.serials[3] + "X" in refreshed.serials
+
+
+def test_bulk_resolve_retries_with_iterator_input(db_manager, dead_connections):
+    serials = [f"SN{n:08d}" for n in range(100000, 100010)] + ["NOPE"]
+    calls = []
+
+    def progress(done, total):
+        calls.append((done, total))
+        # The connection dies between chunks
+        dead_connections.update(id(conn) for conn, _ in db_manager.pool._idle)
+
+    db_manager.get_batch_info(serials[0])
+    dead_connections.update(id(conn) for conn, _ in db_manager.pool._idle)
+    rows, not_found = db_manager.bulk_resolve(iter(serials), chunk_size=4, progress=progress)
+
+    assert [row[0] for row in rows] == serials
+    assert all(row[1] for row in rows[:-1])
+    assert not_found == ["NOPE"]
+    assert calls == [(4, 11), (8, 11), (11, 11)]
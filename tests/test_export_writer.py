@@ -0,0 +1,111 @@
+"""Tests for background exports and their deduplication"""
+import os
+
+import pytest
+
+from batch_rows import BatchRows
+from csv_exporter import CSVExporter
+from export_writer import ExportWriter
+
+
+@pytest.fixture
+def exporter(tmp_path, monkeypatch):
+    exporter = CSVExporter("csv")
+    monkeypatch.setattr(exporter, "get_downloads_path", lambda: str(tmp_path))
+    return exporter
+
+
+def _batch(count, batch_code="B000001"):
+    return BatchRows(batch_code, "PO00001", [f"SN{n:08d}" for n in range(count)])
+
+
+def _export(writer, rows, batch_code="B000001"):
+    writer.submit(rows, batch_code)
+    writer.close()
+    result, = writer.poll()
+    assert "error" not in result
+    return result
+
+
+def _files(tmp_path):
+    return sorted(name for name in os.listdir(tmp_path) if name.endswith(".csv"))
+
+
+def test_unchanged_batch_is_not_rewritten(exporter, tmp_path):
+    index_path = str(tmp_path / "index.json")
+    first = _export(ExportWriter(exporter, index_path=index_path), _batch(50))
+    # A new writer remembers the export through the index file
+    again = _export(ExportWriter(exporter, index_path=index_path), lambda: iter(_batch(50)))
+
+    assert first["reused"] is False
+    assert again["reused"] is True
+    assert again["path"] == first["path"]
+    assert _files(tmp_path) == [os.path.basename(first["path"])]
+
+
+def test_changed_batch_is_written_again(exporter, tmp_path):
+    writer = ExportWriter(exporter)
+    writer.submit(_batch(50), "B000001")
+    writer.submit(_batch(51), "B000001")
+    writer.close()
+    first, second = writer.poll()
+
+    assert (first["reused"], second["reused"]) == (False, False)
+    assert writer.written == 2
+    with open(second["path"], encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 52  # header + rows
+
+
+def test_incremental_export_appends_new_rows(exporter, tmp_path):
+    writer = ExportWriter(exporter, incremental=True)
+    for count in (50, 50, 60):
+        writer.submit(_batch(count), "B000001")
+    writer.close()
+    written, reused, appended = writer.poll()
+
+    assert written["appended"] is None
+    assert (reused["reused"], reused["appended"]) == (True, 0)
+    assert appended["appended"] == 10
+    with open(appended["path"], encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 61
+    assert lines[-1].startswith("SN00000059")
+
+
+def test_unchanged_signature_skips_the_stream(exporter, tmp_path):
+    opened = []
+
+    def stream():
+        opened.append(True)
+        return iter(_batch(50))
+
+    signature = lambda: (50, "SN00000049", 1234)
+    writer = ExportWriter(exporter)
+    writer.submit(stream, "B000001", signature=signature)
+    writer.submit(stream, "B000001", signature=signature)
+    writer.submit(stream, "B000001", signature=lambda: (50, "SN00000049", 4321))
+    writer.close()
+    first, skipped, changed = writer.poll()
+
+    assert len(opened) == 2
+    assert (skipped["reused"], skipped["path"], skipped["rows"]) == (True, first["path"], 50)
+    # Changed signature, identical rows: read again but not rewritten
+    assert changed["reused"] is True
+    assert _files(tmp_path) == [os.path.basename(first["path"])]
+
+
+def test_unchanged_signature_skips_incremental_export(exporter, tmp_path):
+    opened = []
+
+    def stream():
+        opened.append(True)
+        return iter(_batch(50))
+
+    writer = ExportWriter(exporter, incremental=True)
+    for _ in range(2):
+        writer.submit(stream, "B000001", signature=lambda: (50, "SN00000049", 1234))
+    writer.close()
+    written, skipped = writer.poll()
+
+    assert len(opened) == 1
+    assert (skipped["reused"], skipped["appended"], skipped["rows"]) == (True, 0, 50)
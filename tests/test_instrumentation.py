@@ -0,0 +1,33 @@
+"""Tests for scan timing instrumentation"""
+import database
+from instrumentation import Instrumentation
+
+
+def test_phases_outside_a_scan_are_not_recorded():
+    instrumentation = Instrumentation()
+    with instrumentation.phase("query"):
+        pass
+    assert instrumentation.report() == {}
+
+
+def test_phases_inside_a_scan_are_recorded():
+    instrumentation = Instrumentation()
+    with instrumentation.scan("serial:SN1") as timings:
+        with instrumentation.phase("query"):
+            pass
+    with instrumentation.phase("export", timings):
+        pass
+    instrumentation.finish(timings)
+
+    assert set(timings.phases) == {"query", "export"}
+    assert {name: h["count"] for name, h in instrumentation.report().items()} == {
+        "query": 1, "export": 1, "total": 1
+    }
+
+
+def test_background_queries_do_not_reach_the_scan_histograms(db_manager, monkeypatch):
+    instrumentation = Instrumentation()
+    monkeypatch.setattr(database, "INSTRUMENTATION", instrumentation)
+    db_manager.get_po_summary("PO00001")
+    db_manager.get_batch_with_serials("B000001", by="batch")
+    assert instrumentation.report() == {}
@@ -0,0 +1,86 @@
+"""Tests for live refresh of the displayed batch"""
+import pytest
+
+from batch_cache import BatchCache
+from live_refresh import LiveRefresher
+from paged_rows import PagedRows
+
+
+@pytest.fixture
+def refresher(db_manager):
+    refresher = LiveRefresher(db_manager, interval=3600)
+    yield refresher
+    refresher.close()
+
+
+def _apply(rows, update):
+    """Replay an update's diff on the displayed serials"""
+    removed = set(update["removed"])
+    kept = [serial for i, serial in enumerate(rows) if i not in removed]
+    for i in update["inserted"]:
+        kept.insert(i, update["rows"].serials[i])
+    return kept
+
+
+def test_appended_rows_are_fetched_after_the_last_serial(db_manager, refresher, station):
+    rows = db_manager.get_all_serials_in_batch("B000001")
+    assert refresher.check("B000001", rows) is None
+
+    station.insert("SN99999999", "B000001", rows.po_num)
+    update = refresher.check("B000001", rows)
+
+    assert update["removed"] == []
+    assert update["inserted"] == [len(rows)]
+    assert update["fetched"] == 1
+
+
+def test_swap_with_same_count_and_max_is_detected(db_manager, refresher, station):
+    rows = db_manager.get_all_serials_in_batch("B000001")
+    station.delete(rows.serials[10])
+    station.insert(rows.serials[10] + "X", "B000001", rows.po_num)
+
+    update = refresher.check("B000001", rows)
+
+    assert update["removed"] == [10]
+    assert update["inserted"] == [10]
+    assert _apply(rows.serials, update) == update["rows"].serials
+
+
+def _paged(db_manager, page_size=100):
+    batch = db_manager.open_batch("B000001", by="batch", page_size=page_size)
+    assert isinstance(batch["serials"], PagedRows)
+    assert not batch["serials"].complete
+    return batch["serials"]
+
+
+def test_paged_batch_picks_up_appended_rows(db_manager, refresher, station):
+    rows = _paged(db_manager)
+    shown = len(rows)
+    assert refresher.check("B000001", rows) is None
+
+    station.insert("SN99999999", "B000001", "PO00001")
+    update = refresher.check("B000001", rows)
+
+    assert update is not None
+    assert update["removed"] == []
+    assert update["inserted"] == [shown]
+    assert len(update["rows"]) == shown + 1
+    assert update["rows"].last_serial == "SN99999999"
+    assert BatchCache.signature(update["rows"]) == db_manager.get_batch_signature("B000001")
+    # The next probe compares against the complete rows
+    assert refresher.check("B000001", update["rows"]) is None
+
+
+def test_paged_batch_change_in_loaded_rows(db_manager, refresher, station):
+    rows = _paged(db_manager)
+    shown = len(rows)
+    assert refresher.check("B000001", rows) is None
+    loaded, _ = rows.snapshot()
+
+    station.delete(loaded.serials[5])
+    update = refresher.check("B000001", rows)
+
+    assert update["rows"].serials == db_manager.get_all_serials_in_batch("B000001").serials
+    assert len(update["rows"]) == shown - 1
+    displayed = loaded.serials + [None] * (shown - len(loaded))
+    assert _apply(displayed, update) == update["rows"].serials
@@ -0,0 +1,84 @@
+"""Tests for the shared lookup service and its client"""
+import socket
+import threading
+import time
+
+import pytest
+
+from lookup_service import LookupService, RemoteDatabaseManager
+
+
+@pytest.fixture
+def service(db_manager):
+    service = LookupService(db_manager, "127.0.0.1", 0)
+    service.start()
+    yield service
+    service.shutdown()
+
+
+def test_client_matches_the_database(service, db_manager):
+    client = RemoteDatabaseManager(service.url)
+    assert client.get_batch_signature("B000001") == db_manager.get_batch_signature("B000001")
+    batch = client.get_batch_with_serials("SN00100000")
+    assert batch["serials"].serials == db_manager.get_all_serials_in_batch("B000001").serials
+    client.close()
+
+
+class _RawServer:
+    """Accepts connections and hands each to handle(sock) on its own thread"""
+
+    def __init__(self, handle):
+        self.handle = handle
+        self.accepted = 0
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%d" % self.sock.getsockname()[1]
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.accepted += 1
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def close(self):
+        self.sock.close()
+
+
+def _answer_once(conn):
+    """Answer one request with keep-alive, then drop the connection"""
+    conn.recv(65536)
+    body = b"[1, \"SN1\", 7]"
+    conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                 b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+    time.sleep(0.05)
+    conn.close()
+
+
+def test_closed_keepalive_connection_is_retried():
+    server = _RawServer(_answer_once)
+    client = RemoteDatabaseManager(server.url, timeout=2)
+    assert client.get_batch_signature("B1") == (1, "SN1", 7)
+    time.sleep(0.1)
+    assert client.get_batch_signature("B1") == (1, "SN1", 7)
+    assert server.accepted == 2
+    server.close()
+
+
+def test_timeout_is_not_retried():
+    stalled = []
+    server = _RawServer(stalled.append)
+    client = RemoteDatabaseManager(server.url, timeout=0.3)
+    started = time.monotonic()
+    with pytest.raises(ConnectionError):
+        client.get_batch_signature("B1")
+    assert time.monotonic() - started < 0.55
+    assert server.accepted == 1
+    server.close()
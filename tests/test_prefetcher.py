@@ -0,0 +1,31 @@
+"""Tests for the sibling-batch prefetcher"""
+import time
+
+from prefetcher import BatchPrefetcher
+
+
+def test_prefetch_warms_sibling_batches(db_manager):
+    prefetcher = BatchPrefetcher(db_manager, max_batches=2, repeat_after=60)
+    prefetcher.on_scan("B000001", "PO00001")
+    prefetcher.close()
+    prefetcher._thread.join(5)
+
+    assert db_manager.cache.contains("B000002")
+    assert db_manager.cache.contains("B000003")
+    assert prefetcher.queries == 2
+
+
+def test_recent_pos_are_pruned(db_manager, monkeypatch):
+    prefetcher = BatchPrefetcher(db_manager, repeat_after=30)
+    prefetcher.close()
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+
+    for i in range(100):
+        prefetcher.on_scan("B000001", f"PO{i:05d}")
+        now[0] += 1
+    assert len(prefetcher._recent) == 30
+
+    queued = prefetcher._jobs.qsize()
+    prefetcher.on_scan("B000001", "PO00099")  # still within repeat_after
+    assert prefetcher._jobs.qsize() == queued
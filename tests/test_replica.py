@@ -0,0 +1,53 @@
+"""Tests for the local SQLite replica"""
+import sqlite3
+import threading
+
+import pytest
+
+from replica import LocalReplica
+
+
+@pytest.fixture
+def replica(db_manager, tmp_path):
+    replica = LocalReplica(str(tmp_path / "replica.sqlite3"), db_manager.pool, recent_batches=2)
+    yield replica
+    replica.close()
+
+
+def _serials(replica, batch_code):
+    return replica.get_batch_rows(batch_code, "batch").serials
+
+
+def test_incremental_sync_checksums_only_recent_batches(replica, db_manager, station):
+    first = replica.sync()
+    assert first["full"] is True
+    assert _serials(replica, "B000001") == db_manager.get_all_serials_in_batch("B000001").serials
+
+    station.insert("SN99999999", "B999999", "PO99999")   # new batch
+    station.delete(_serials(replica, "B000001")[0])      # old batch
+    second = replica.sync()
+
+    assert second["full"] is False
+    assert _serials(replica, "B999999") == ["SN99999999"]
+    # Outside the recent window until the next full checksum
+    assert len(_serials(replica, "B000001")) == len(db_manager.get_all_serials_in_batch("B000001")) + 1
+
+    replica.full_interval = 0
+    third = replica.sync()
+    assert third["full"] is True
+    assert _serials(replica, "B000001") == db_manager.get_all_serials_in_batch("B000001").serials
+
+
+def test_close_closes_every_thread_connection(replica):
+    replica.sync()
+    worker = threading.Thread(target=replica.get_batch_rows, args=("B000001", "batch"))
+    worker.start()
+    worker.join()
+    connections = list(replica._connections)
+    assert len(connections) == 2
+
+    replica.close()
+
+    for db in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            db.execute("SELECT 1")
@@ -0,0 +1,44 @@
+"""Tests for serial-range compression"""
+from serial_ranges import SerialRange, SerialRanges, parse_serial
+
+
+def _rows(serials, batch_code="B1", po_num="PO1"):
+    return [(serial, batch_code, po_num) for serial in serials]
+
+
+def test_consecutive_serials_collapse_into_one_range():
+    rows = _rows(f"SN{n:08d}" for n in range(100000, 104000))
+    ranges = SerialRanges.from_rows(rows)
+    assert len(ranges) == 1
+    assert ranges[0] == (SerialRange("SN", 100000, 103999, 8), "B1", "PO1")
+    assert ranges[0][0].label() == "SN00100000 - SN00103999"
+    assert ranges.units == 4000
+
+
+def test_round_trip_is_lossless():
+    rows = (
+        _rows(["SN0098", "SN0099", "SN0100", "SN0102"])      # gap
+        + _rows(["SN0103"], po_num="PO2")                     # other PO
+        + _rows(["SN99", "SN100"])                            # number outgrows its width
+        + _rows(["LABEL", "LABEL", "X7", "x8", "SN0104"])     # no number, case change
+    )
+    ranges = SerialRanges.from_rows(rows)
+    assert list(ranges.expand()) == rows
+    assert ranges.units == len(rows)
+    assert [r[0].count for r in ranges] == [3, 1, 1, 1, 1, 1, 1, 1, 1, 1]
+
+
+def test_membership_and_range_index():
+    rows = _rows([f"SN{n:04d}" for n in range(10, 20)] + [f"SN{n:04d}" for n in range(50, 55)])
+    ranges = SerialRanges.from_rows(rows)
+    assert "SN0015" in ranges
+    assert "sn0052" in ranges
+    assert "SN0020" not in ranges
+    assert "SN015" not in ranges  # different width
+    assert ranges.range_index(9) == 0
+    assert ranges.range_index(10) == 1
+
+
+def test_parse_serial():
+    assert parse_serial("SN00100000") == ("SN", 100000, 8)
+    assert parse_serial("LABEL") == ("LABEL", 0, 0)
@@ -0,0 +1,209 @@
+"""
+Virtualized Treeview for the Batch Code Scanner
+
+A ttk.Treeview holds one Tk item per inserted row, so filling it with a
+large batch costs time and memory proportional to the batch. VirtualTable
+keeps the rows in a Python list instead and only materializes the rows
+in the viewport (plus a small overscan), rewriting those items in place
+as the user scrolls. Redraw cost depends on the viewport, not the batch.
+"""
+import tkinter as tk
+from bisect import bisect_left
+from tkinter import ttk
+from typing import Callable, Optional, Sequence, Tuple, Any
+
+
+class VirtualTable:
+    """Shows a window of a row list in a Treeview driven by our own scrolling"""
+
+    def __init__(self, tree: ttk.Treeview, scrollbar: ttk.Scrollbar,
+                 row_values: Callable[[Any], Tuple], overscan: int = 3):
+        """
+        Args:
+            tree: Treeview to render into (its own scrolling is bypassed)
+            scrollbar: Vertical scrollbar to drive the table
+            row_values: Converts a row to the tuple of column values
+            overscan: Extra rows materialized below the viewport
+        """
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_values = row_values
+        self.overscan = overscan
+
+        self.rows: Sequence[Any] = []
+        self.offset = 0
+        self.visible = int(tree.cget("height")) or 15
+        self.selected_index: Optional[int] = None
+        self._items = []
+
+        scrollbar.configure(command=self.yview)
+        tree.configure(yscrollcommand=lambda first, last: None)
+        tree.bind("<Configure>", self._on_configure)
+        tree.bind("<MouseWheel>", self._on_mousewheel)
+        tree.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        tree.bind("<Button-5>", lambda e: self._scroll_by(3))
+        tree.bind("<Up>", lambda e: self._move_selection(-1))
+        tree.bind("<Down>", lambda e: self._move_selection(1))
+        tree.bind("<Prior>", lambda e: self._move_selection(-self.visible))
+        tree.bind("<Next>", lambda e: self._move_selection(self.visible))
+        tree.bind("<Home>", lambda e: self._move_selection(-len(self.rows)))
+        tree.bind("<End>", lambda e: self._move_selection(len(self.rows)))
+        tree.bind("<<TreeviewSelect>>", self._on_select)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def set_rows(self, rows: Sequence[Any]):
+        """Replace the table contents and scroll to the top"""
+        self.rows = rows
+        self.offset = 0
+        self.selected_index = None
+        self.render()
+
+    def apply_diff(self, rows: Sequence[Any], removed: Sequence[int], inserted: Sequence[int]):
+        """
+        Swap in an updated row list, keeping the scroll position and selection
+
+        The top visible row and the selected row stay on the same data
+        rows as before; only the materialized window is rewritten.
+
+        Args:
+            rows: The updated rows
+            removed: Ascending indexes (in the old rows) of rows that are gone
+            inserted: Ascending indexes (in rows) of rows that are new
+        """
+        def moved(index: int) -> int:
+            index -= bisect_left(removed, index)
+            for position in inserted:
+                if position > index:
+                    break
+                index += 1
+            return index
+
+        if self.selected_index is not None:
+            i = bisect_left(removed, self.selected_index)
+            gone = i < len(removed) and removed[i] == self.selected_index
+            self.selected_index = None if gone else moved(self.selected_index)
+        self.offset = moved(self.offset)
+        self.rows = rows
+        self.render()
+
+    def set_columns(self, columns: Sequence[str], row_values: Callable[[Any], Tuple],
+                    width: int = 200):
+        """
+        Switch the table to a different set of columns
+
+        Args:
+            columns: Column headings (also used as column ids)
+            row_values: Converts a row to the tuple of column values
+            width: Initial width of every column
+        """
+        if tuple(self.tree.cget("columns")) == tuple(columns) and self.row_values == row_values:
+            return
+        for iid in self._items:
+            self.tree.delete(iid)
+        self._items = []
+        self.row_values = row_values
+        self.tree.configure(columns=tuple(columns))
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, anchor=tk.CENTER, width=width)
+
+    def row_at(self, y: int) -> Optional[int]:
+        """Index of the row under a y coordinate of the tree (None if none)"""
+        iid = self.tree.identify_row(y)
+        if iid in self._items:
+            return self.offset + self._items.index(iid)
+        return None
+
+    def render(self):
+        """Rewrite the materialized items for the current scroll offset"""
+        self.offset = max(0, min(self.offset, len(self.rows) - self.visible))
+        window = self.rows[self.offset:self.offset + self.visible + self.overscan]
+
+        # Keep exactly as many Tk items as the window needs
+        while len(self._items) > len(window):
+            self.tree.delete(self._items.pop())
+        while len(self._items) < len(window):
+            self._items.append(self.tree.insert("", tk.END, values=()))
+
+        for iid, row in zip(self._items, window):
+            self.tree.item(iid, values=self.row_values(row))
+
+        selected = []
+        if self.selected_index is not None:
+            position = self.selected_index - self.offset
+            if 0 <= position < len(self._items):
+                selected = [self._items[position]]
+        self.tree.selection_set(selected)
+        self._update_scrollbar()
+
+    def yview(self, *args):
+        """Scrollbar command (moveto / scroll units / scroll pages)"""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self.offset += step * (self.visible if args[2] == "pages" else 1)
+        self.render()
+
+    def see(self, index: int):
+        """Scroll so that the row at index is visible"""
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + self.visible:
+            self.offset = index - self.visible + 1
+        self.render()
+
+    def _update_scrollbar(self):
+        total = len(self.rows)
+        if total <= self.visible:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + self.visible) / total)
+
+    def _scroll_by(self, rows: int):
+        self.offset += rows
+        self.render()
+        return "break"
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120 per notch
+        return self._scroll_by(-3 * int(event.delta / 120) if event.delta else 0)
+
+    def _on_configure(self, event):
+        row_height = self._row_height()
+        header = 0
+        if self._items:
+            bbox = self.tree.bbox(self._items[0])
+            if bbox:
+                header = bbox[1]
+        visible = max(1, (event.height - header) // row_height)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+
+    def _row_height(self) -> int:
+        if self._items:
+            bbox = self.tree.bbox(self._items[0])
+            if bbox:
+                return bbox[3]
+        try:
+            return int(ttk.Style().lookup("Treeview", "rowheight")) or 20
+        except (ValueError, tk.TclError):
+            return 20
+
+    def _on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection and selection[0] in self._items:
+            self.selected_index = self.offset + self._items.index(selection[0])
+
+    def _move_selection(self, delta: int):
+        if not self.rows:
+            return "break"
+        current = self.selected_index if self.selected_index is not None else self.offset - 1
+        self.selected_index = max(0, min(len(self.rows) - 1, current + delta))
+        self.see(self.selected_index)
+        return "break"